@@ -67,7 +67,8 @@ CREATE TABLE scores (
     judge_id INT REFERENCES users(id) ON DELETE CASCADE,
     criterion_id INT REFERENCES criteria(id) ON DELETE CASCADE,
     score INT,
-    heat_id INT REFERENCES heats(id)
+    heat_id INT REFERENCES heats(id),
+    CONSTRAINT uq_score_judge_criterion UNIQUE (round_id, participant_id, judge_id, criterion_id)
 );
 
 CREATE TABLE final_places (
@@ -78,6 +79,28 @@ CREATE TABLE final_places (
     sum_places INT
 );
 
+CREATE TABLE notification_outbox (
+    id SERIAL PRIMARY KEY,
+    chat_id BIGINT NOT NULL,
+    text TEXT NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_error VARCHAR(255),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX ix_notification_outbox_due ON notification_outbox (status, next_attempt_at);
+
+-- Hot-path indexes (migration 2, built CONCURRENTLY on live databases)
+CREATE INDEX ix_scores_heat_id ON scores (heat_id);
+CREATE INDEX ix_scores_participant_round ON scores (participant_id, round_id);
+CREATE INDEX ix_participants_category_id ON participants (category_id);
+CREATE INDEX ix_participants_event_id ON participants (event_id);
+CREATE INDEX ix_heats_round_id ON heats (round_id);
+CREATE INDEX ix_rounds_event_id ON rounds (event_id);
+CREATE INDEX ix_categories_event_id ON categories (event_id);
+CREATE INDEX ix_criteria_category_id ON criteria (category_id);
+
 -- FUNCTION: calculate final places for pro/master categories
 CREATE OR REPLACE FUNCTION calc_final_places(p_round_id INT) RETURNS VOID AS $$
 BEGIN
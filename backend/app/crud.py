@@ -1,11 +1,30 @@
 from typing import Iterable, List
 
 from fastapi import HTTPException
-from sqlalchemy import delete, select
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from . import models
+from .pagination import Page, SortKey, paginate, split_page
+
+# Column order matches the read schemas, so rows dump to the same JSON as the models would.
+USER_COLUMNS = ("first_name", "last_name", "role", "email", "id", "telegram_id")
+PARTICIPANT_COLUMNS = ("id", "first_name", "last_name", "number", "role", "gender")
+COMPETITION_FIELDS = ("title", "date", "location", "id", "categories")
+
+# List orders; each ends in the primary key so keyset cursors are unambiguous.
+USER_ORDER = (SortKey(models.User.last_name), SortKey(models.User.id))
+PARTICIPANT_ORDER = (
+    SortKey(models.Participant.number, nulls_first=True),
+    SortKey(models.Participant.last_name),
+    SortKey(models.Participant.id),
+)
+COMPETITION_ORDER = (
+    SortKey(models.Event.date, descending=True, nulls_first=True),
+    SortKey(models.Event.id, descending=True),
+)
 
 
 async def get_or_404(session: AsyncSession, stmt, message: str = "Entity not found"):
@@ -37,9 +56,11 @@ async def create_user(
     return user
 
 
-async def get_users(db: AsyncSession) -> List[models.User]:
-    result = await db.execute(select(models.User).order_by(models.User.last_name))
-    return result.scalars().all()
+async def get_users(
+    db: AsyncSession, fields: tuple[str, ...] = USER_COLUMNS, cursor: str | None = None, limit: int | None = None
+) -> Page:
+    stmt = paginate(select(*(getattr(models.User, name) for name in fields)), USER_ORDER, cursor, limit)
+    return split_page(await db.execute(stmt), fields, USER_ORDER, limit)
 
 
 async def get_user_by_telegram(db: AsyncSession, telegram_id: int) -> models.User | None:
@@ -55,23 +76,65 @@ async def create_competition(db: AsyncSession, title: str, date=None, location=N
     return event
 
 
-async def list_competitions(db: AsyncSession) -> List[models.Event]:
-    stmt = (
-        select(models.Event)
-        .options(selectinload(models.Event.categories).selectinload(models.Category.criteria))
-        .order_by(models.Event.date.desc())
-    )
-    result = await db.execute(stmt)
-    return result.scalars().all()
-
-
-async def get_competition(db: AsyncSession, event_id: int) -> models.Event:
-    stmt = (
-        select(models.Event)
-        .options(selectinload(models.Event.categories).selectinload(models.Category.criteria))
-        .filter(models.Event.id == event_id)
-    )
-    return await get_or_404(db, stmt, "Competition not found")
+async def list_competition_trees(
+    db: AsyncSession,
+    event_id: int | None = None,
+    fields: tuple[str, ...] = COMPETITION_FIELDS,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> Page:
+    """Events with their categories and criteria as dicts in ``CompetitionRead`` order.
+
+    One statement for the events, plus two for categories and criteria when ``categories`` is requested.
+    """
+    # ``id`` is always selected to attach categories and is dropped afterwards when not requested.
+    columns = tuple(name for name in COMPETITION_FIELDS[:-1] if name in fields or name == "id")
+    stmt = select(*(getattr(models.Event, name) for name in columns))
+    if event_id is not None:
+        stmt = stmt.filter(models.Event.id == event_id)
+    page = split_page(await db.execute(paginate(stmt, COMPETITION_ORDER, cursor, limit)), columns, COMPETITION_ORDER, limit)
+    events = {event["id"]: event for event in page.items}
+    for event in page.items:
+        if "date" in event:
+            event["date"] = str(event["date"]) if event["date"] else None
+        if "categories" in fields:
+            event["categories"] = []
+
+    if "categories" in fields and events:
+        category_stmt = select(models.Category.id, models.Category.name, models.Category.type, models.Category.event_id)
+        criterion_stmt = select(
+            models.Criterion.id,
+            models.Criterion.name,
+            models.Criterion.scale_min,
+            models.Criterion.scale_max,
+            models.Criterion.category_id,
+        ).join(models.Category)
+        if event_id is not None:
+            scope = models.Category.event_id == event_id
+        elif cursor or limit:
+            scope = models.Category.event_id.in_(list(events))
+        else:
+            scope = None
+        if scope is not None:
+            category_stmt = category_stmt.filter(scope)
+            criterion_stmt = criterion_stmt.filter(scope)
+
+        categories = {}
+        for id_, name, type_, category_event_id in await db.execute(category_stmt.order_by(models.Category.id)):
+            category = categories[id_] = {"id": id_, "name": name, "type": type_, "criteria": []}
+            events[category_event_id]["categories"].append(category)
+        if categories:
+            for id_, name, scale_min, scale_max, category_id in await db.execute(
+                criterion_stmt.order_by(models.Criterion.id)
+            ):
+                categories[category_id]["criteria"].append(
+                    {"id": id_, "name": name, "scale_min": scale_min, "scale_max": scale_max}
+                )
+
+    if "id" not in fields:
+        for event in page.items:
+            del event["id"]
+    return page
 
 
 async def create_category(db: AsyncSession, event_id: int, name: str, type: str, criteria: Iterable[str]) -> models.Category:
@@ -125,26 +188,33 @@ async def create_participant(
     return participant
 
 
-async def list_participants(db: AsyncSession, category_id: int) -> List[models.Participant]:
-    stmt = (
-        select(models.Participant)
-        .filter(models.Participant.category_id == category_id)
-        .order_by(models.Participant.number.asc().nullsfirst(), models.Participant.last_name)
+async def list_participants(
+    db: AsyncSession,
+    category_id: int,
+    fields: tuple[str, ...] = PARTICIPANT_COLUMNS,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> Page:
+    stmt = select(*(getattr(models.Participant, name) for name in fields)).filter(
+        models.Participant.category_id == category_id
     )
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    return split_page(await db.execute(paginate(stmt, PARTICIPANT_ORDER, cursor, limit)), fields, PARTICIPANT_ORDER, limit)
 
 
-async def list_all_participants_by_event(db: AsyncSession, event_id: int) -> List[models.Participant]:
+async def list_all_participants_by_event(
+    db: AsyncSession,
+    event_id: int,
+    fields: tuple[str, ...] = PARTICIPANT_COLUMNS,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> Page:
     """Get all participants for a competition across all categories."""
     stmt = (
-        select(models.Participant)
+        select(*(getattr(models.Participant, name) for name in fields))
         .join(models.Category)
         .filter(models.Category.event_id == event_id)
-        .order_by(models.Participant.number.asc().nullsfirst(), models.Participant.last_name)
     )
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    return split_page(await db.execute(paginate(stmt, PARTICIPANT_ORDER, cursor, limit)), fields, PARTICIPANT_ORDER, limit)
 
 
 async def get_participant(
@@ -210,47 +280,111 @@ async def upsert_score(
     heat_id: int | None,
     criterion_id: int | None,
     value: float,
-) -> models.Score:
-    stmt = (
-        select(models.Score)
-        .filter(
-            models.Score.participant_id == participant_id,
-            models.Score.judge_id == judge_id,
-            models.Score.round_id == round_id,
-            (models.Score.criterion_id.is_(None) if criterion_id is None else models.Score.criterion_id == criterion_id),
-        )
-        .limit(1)
+) -> tuple[models.Score, int]:
+    """Store one mark and return it with the round's new ``scores_version``."""
+    version = await bump_scores_version(db, round_id)
+    stmt = pg_insert(models.Score).values(
+        participant_id=participant_id,
+        judge_id=judge_id,
+        round_id=round_id,
+        heat_id=heat_id,
+        criterion_id=criterion_id,
+        score=value,
     )
-    result = await db.execute(stmt)
-    score = result.scalar_one_or_none()
-    if score:
-        score.score = value
-        score.heat_id = heat_id
-    else:
-        score = models.Score(
-            participant_id=participant_id,
-            judge_id=judge_id,
-            round_id=round_id,
-            heat_id=heat_id,
-            criterion_id=criterion_id,
-            score=value,
-        )
-        db.add(score)
+    stmt = stmt.on_conflict_do_update(
+        **_score_conflict_target(criterion_id),
+        set_={"score": stmt.excluded.score, "heat_id": stmt.excluded.heat_id},
+    ).returning(models.Score)
+    result = await db.scalars(stmt, execution_options={"populate_existing": True})
+    score = result.one()
     await db.commit()
-    await db.refresh(score)
-    return score
+    return score, version
 
 
-async def get_scores_by_heat(db: AsyncSession, heat_id: int) -> List[models.Score]:
-    result = await db.execute(
-        select(models.Score)
-        .filter(models.Score.heat_id == heat_id)
-        .order_by(models.Score.participant_id)
+async def bump_scores_version(db: AsyncSession, round_id: int) -> int:
+    """Bump ``rounds.scores_version`` inside the caller's score transaction.
+
+    The row lock taken here also orders concurrent score writes to the round, so
+    the versions follow the commit order.
+    """
+    version = await db.scalar(
+        update(models.Round)
+        .where(models.Round.id == round_id)
+        .values(scores_version=models.Round.scores_version + 1)
+        .returning(models.Round.scores_version)
     )
-    return result.scalars().all()
+    if version is None:
+        raise HTTPException(status_code=404, detail="Round not found")
+    return version
+
+
+def _score_conflict_target(criterion_id: int | None) -> dict:
+    """Arbiter index for a score upsert.
+
+    ``uq_score_judge_criterion`` never conflicts on a NULL criterion, so a score without
+    a criterion is matched on the partial ``uq_score_judge_no_criterion`` index instead.
+    """
+    if criterion_id is None:
+        return {
+            "index_elements": [models.Score.round_id, models.Score.participant_id, models.Score.judge_id],
+            "index_where": models.Score.criterion_id.is_(None),
+        }
+    return {
+        "index_elements": [
+            models.Score.round_id,
+            models.Score.participant_id,
+            models.Score.judge_id,
+            models.Score.criterion_id,
+        ]
+    }
+
+
+async def upsert_scores(
+    db: AsyncSession,
+    *,
+    judge_id: int,
+    round_id: int,
+    heat_id: int,
+    entries: Iterable[tuple[int, int, float]],
+) -> tuple[List[models.Score], int]:
+    """Store a judge's score sheet with a single multi-row INSERT ... ON CONFLICT DO UPDATE.
+
+    ``entries`` are ``(participant_id, criterion_id, value)`` tuples and must not repeat
+    a participant/criterion pair, otherwise PostgreSQL rejects the statement. Returns
+    the stored scores and the round's new ``scores_version`` (0 when nothing was written).
+    """
+    rows = [
+        {
+            "participant_id": participant_id,
+            "judge_id": judge_id,
+            "round_id": round_id,
+            "heat_id": heat_id,
+            "criterion_id": criterion_id,
+            "score": value,
+        }
+        for participant_id, criterion_id, value in entries
+    ]
+    if not rows:
+        return [], 0
+
+    version = await bump_scores_version(db, round_id)
+    stmt = pg_insert(models.Score).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            models.Score.round_id,
+            models.Score.participant_id,
+            models.Score.judge_id,
+            models.Score.criterion_id,
+        ],
+        set_={"score": stmt.excluded.score, "heat_id": stmt.excluded.heat_id},
+    ).returning(models.Score)
+    result = await db.scalars(stmt, execution_options={"populate_existing": True})
+    scores = result.all()
+    await db.commit()
+    return sorted(scores, key=lambda score: (score.participant_id, score.criterion_id)), version
 
 
-async def update_heat_status(db: AsyncSession, heat_id: int, status: str) -> models.Heat:
+async def get_heat_with_round(db: AsyncSession, heat_id: int) -> models.Heat:
     stmt = (
         select(models.Heat)
         .options(
@@ -259,11 +393,4 @@ async def update_heat_status(db: AsyncSession, heat_id: int, status: str) -> mod
         )
         .filter(models.Heat.id == heat_id)
     )
-    heat = await get_or_404(db, stmt, "Heat not found")
-    heat.status = status
-    await db.commit()
-    await db.refresh(
-        heat,
-        attribute_names=["round"],
-    )
-    return heat
+    return await get_or_404(db, stmt, "Heat not found")
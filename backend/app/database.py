@@ -1,12 +1,101 @@
+import time
+from dataclasses import dataclass, field
 from typing import AsyncGenerator
+from uuid import uuid4
 
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from .config import settings
 
 
-engine = create_async_engine(str(settings.database_url), future=True, echo=False)
+@dataclass
+class DurationStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+@dataclass
+class PoolMetrics:
+    """Connection pool counters fed by pool events and :func:`get_db`.
+
+    ``checkout_wait`` is the time spent getting a connection from the pool
+    (including opening a new one), ``connection_hold`` the time between checkout
+    and checkin, ``session_lifetime`` the lifetime of a request's ``AsyncSession``.
+    """
+
+    connects: int = 0
+    invalidations: int = 0
+    timeouts: int = 0
+    checkout_wait: DurationStats = field(default_factory=DurationStats)
+    connection_hold: DurationStats = field(default_factory=DurationStats)
+    session_lifetime: DurationStats = field(default_factory=DurationStats)
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.checkout_wait.observe(time.perf_counter() - started)
+
+
+def engine_options() -> dict:
+    """Keyword arguments for :func:`create_async_engine` built from the ``DB_*`` settings.
+
+    In PgBouncer mode (``DB_PGBOUNCER=true``, transaction pooling) the application
+    keeps no pool of its own, so several uvicorn workers share PgBouncer's
+    connections. Server-side prepared statements are disabled or uniquely named,
+    because consecutive transactions may land on different server connections.
+    ``statement_timeout`` is then not sent as a startup parameter, since PgBouncer
+    rejects those; set it on the database role instead
+    (``ALTER ROLE battle SET statement_timeout = '15s'``).
+    """
+    connect_args: dict = {}
+    options: dict = {"future": True, "echo": False, "pool_pre_ping": settings.db_pool_pre_ping}
+
+    if settings.db_pgbouncer:
+        options["poolclass"] = NullPool
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+    else:
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+        connect_args["prepared_statement_cache_size"] = settings.db_prepared_statement_cache_size
+        if settings.db_statement_timeout_ms:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+
+    options["connect_args"] = connect_args
+    return options
+
+
+engine = create_async_engine(str(settings.database_url), **engine_options())
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     expire_on_commit=False,
@@ -17,7 +106,46 @@ AsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+@event.listens_for(engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.connects += 1
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checked_out_at"] = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    checked_out_at = connection_record.info.pop("checked_out_at", None)
+    if checked_out_at is not None:
+        pool_metrics.connection_hold.observe(time.perf_counter() - checked_out_at)
+
+
+@event.listens_for(engine.sync_engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.invalidations += 1
+
+
+def pool_status() -> dict:
+    """Current pool occupancy; zeros in PgBouncer mode where the app keeps no pool."""
+    pool = engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {"size": 0, "checked_out": 0, "idle": 0, "overflow": 0}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Provide a transactional async session."""
+    started = time.perf_counter()
     async with AsyncSessionLocal() as session:
-        yield session
+        try:
+            yield session
+        finally:
+            pool_metrics.session_lifetime.observe(time.perf_counter() - started)
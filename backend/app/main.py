@@ -1,14 +1,26 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import func, select, text
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from . import models
-from .database import AsyncSessionLocal, Base, engine
+from . import migrations, models
+from .metrics import MetricsMiddleware
+from .pagination import NEXT_CURSOR_HEADER
+from .query_budget import QueryBudgetMiddleware
+from .request_log import RequestLogMiddleware, request_log
+from .config import settings
+from .database import AsyncSessionLocal
+from .services import jobs as jobs_service
+from .services import events as events_service
+from .services import notifications, reports
 from .routers import (
     competitions,
+    events,
+    export,
     health,
     heats,
+    jobs,
+    judges,
     participant_stats,
     participants,
     rounds,
@@ -24,7 +36,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_credentials=True,
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+if settings.query_budget_mode != "off":
+    app.add_middleware(QueryBudgetMiddleware)
+if request_log is not None:
+    app.add_middleware(RequestLogMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(health.router)
 app.include_router(competitions.router)
@@ -34,6 +52,10 @@ app.include_router(rounds.router)
 app.include_router(heats.router)
 app.include_router(scores.router)
 app.include_router(users.router)
+app.include_router(judges.router)
+app.include_router(jobs.router)
+app.include_router(events.router)
+app.include_router(export.router)
 
 
 async def seed_default_judge(async_session: AsyncSession) -> None:
@@ -53,10 +75,27 @@ async def seed_default_judge(async_session: AsyncSession) -> None:
 
 
 @app.on_event("startup")
-async def create_tables() -> None:
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        await conn.execute(text("ALTER TABLE participants ADD COLUMN IF NOT EXISTS gender VARCHAR(16)"))
+async def prepare_database() -> None:
+    if settings.schema_startup_mode == "check":
+        await migrations.check()
+    else:
+        await migrations.upgrade()
 
     async with AsyncSessionLocal() as session:
         await seed_default_judge(session)
+
+    await events_service.bridge.start()
+    if request_log is not None:
+        await request_log.start()
+    await notifications.worker.start()
+    await jobs_service.runner.start()
+
+
+@app.on_event("shutdown")
+async def stop_workers() -> None:
+    await notifications.worker.stop()
+    await jobs_service.runner.stop()
+    await events_service.bridge.stop()
+    reports.renderer.shutdown()
+    if request_log is not None:
+        await request_log.stop()
@@ -0,0 +1,251 @@
+"""In-process Prometheus metrics: request latency per route, in-flight requests and DB statements per request.
+
+:class:`MetricsMiddleware` is a plain ASGI middleware. It labels requests with
+the matched route template (``/heats/{heat_id}``), so a label stays bounded no
+matter how many ids are requested. Cursor events on the engine attribute every
+statement to the current request through a context variable. The counters are
+plain Python numbers touched only from the event loop thread, so the hot path
+costs a few additions and a ``bisect``. ``GET /metrics`` renders them in the
+Prometheus text format.
+"""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from .database import engine, pool_metrics, pool_status
+from .services import catalog, reports
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+@dataclass
+class RequestQueries:
+    """Statements executed while serving one request (or inside :func:`query_budget.count_queries`).
+
+    ``statements`` is only kept when a collector asks for the SQL text.
+    """
+
+    count: int = 0
+    seconds: float = 0.0
+    statements: list[str] | None = field(default=None, repr=False)
+
+
+# Every active collector receives each statement, so nested collectors (a test around a request) both count it.
+current_queries: ContextVar[tuple[RequestQueries, ...]] = ContextVar("current_queries", default=())
+
+
+class RouteMetrics:
+    __slots__ = ("latency", "queries", "query_seconds", "statuses")
+
+    def __init__(self) -> None:
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.query_seconds = 0.0
+        self.statuses: dict[int, int] = {}
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+        self.statements = 0
+        self.statement_seconds = 0.0
+
+    def record(self, method: str, route: str, status: int, seconds: float, queries: RequestQueries) -> None:
+        key = (method, route)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        metrics.latency.observe(seconds)
+        metrics.queries.observe(queries.count)
+        metrics.query_seconds += queries.seconds
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def render(self) -> str:
+        lines: list[str] = []
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Finished requests by route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        routes = sorted(self.routes.items())
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f"http_requests_total{{{_labels(method, route)},status=\"{status}\"}} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency by route template.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), metrics in routes:
+            lines += _histogram_lines("http_request_duration_seconds", _labels(method, route), metrics.latency)
+
+        lines += [
+            "# HELP db_queries_per_request Database statements executed per request.",
+            "# TYPE db_queries_per_request histogram",
+        ]
+        for (method, route), metrics in routes:
+            lines += _histogram_lines("db_queries_per_request", _labels(method, route), metrics.queries)
+
+        lines += [
+            "# HELP db_query_seconds_total Time spent in database statements per route template.",
+            "# TYPE db_query_seconds_total counter",
+        ]
+        for (method, route), metrics in routes:
+            lines.append(f"db_query_seconds_total{{{_labels(method, route)}}} {metrics.query_seconds:.6f}")
+
+        lines += [
+            "# HELP db_statements_total Database statements executed, including background work.",
+            "# TYPE db_statements_total counter",
+            f"db_statements_total {self.statements}",
+            "# HELP db_statement_seconds_total Time spent in database statements, including background work.",
+            "# TYPE db_statement_seconds_total counter",
+            f"db_statement_seconds_total {self.statement_seconds:.6f}",
+        ]
+
+        status = pool_status()
+        lines += [
+            "# HELP db_pool_connections Connections in the pool by state.",
+            "# TYPE db_pool_connections gauge",
+            f'db_pool_connections{{state="checked_out"}} {status["checked_out"]}',
+            f'db_pool_connections{{state="idle"}} {status["idle"]}',
+            f'db_pool_connections{{state="overflow"}} {status["overflow"]}',
+            "# HELP db_pool_timeouts_total Checkouts that timed out waiting for a connection.",
+            "# TYPE db_pool_timeouts_total counter",
+            f"db_pool_timeouts_total {pool_metrics.timeouts}",
+        ]
+        for name, stats in (
+            ("db_pool_checkout_wait_seconds", pool_metrics.checkout_wait),
+            ("db_pool_connection_hold_seconds", pool_metrics.connection_hold),
+            ("db_session_lifetime_seconds", pool_metrics.session_lifetime),
+        ):
+            lines += [
+                f"# TYPE {name} summary",
+                f"{name}_count {stats.count}",
+                f"{name}_sum {stats.total_seconds:.6f}",
+            ]
+
+        cache = catalog.competition_cache.stats()
+        lines += [
+            "# HELP competition_cache_requests_total Competition tree cache lookups by result.",
+            "# TYPE competition_cache_requests_total counter",
+            f'competition_cache_requests_total{{result="hit"}} {cache.hits}',
+            f'competition_cache_requests_total{{result="miss"}} {cache.misses}',
+        ]
+
+        renders = reports.renderer.stats()
+        lines += [
+            "# HELP report_render_queue_depth Report renders in flight, waiting for or running in a worker process.",
+            "# TYPE report_render_queue_depth gauge",
+            f"report_render_queue_depth {renders.queue_depth}",
+            "# HELP report_requests_total Report downloads by how they were served.",
+            "# TYPE report_requests_total counter",
+            f'report_requests_total{{result="rendered"}} {renders.rendered}',
+            f'report_requests_total{{result="cached"}} {renders.cache_hits}',
+            f'report_requests_total{{result="deduplicated"}} {renders.deduplicated}',
+            f'report_requests_total{{result="rejected"}} {renders.rejected}',
+            f'report_requests_total{{result="failed"}} {renders.failed}',
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _labels(method: str, route: str) -> str:
+    return f'method="{method}",route="{_escape(route)}"'
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        queries = RequestQueries()
+        token = current_queries.set(current_queries.get() + (queries,))
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.in_flight -= 1
+            current_queries.reset(token)
+            route = scope.get("route")
+            registry.record(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                elapsed,
+                queries,
+            )
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    registry.statements += 1
+    registry.statement_seconds += elapsed
+    for queries in current_queries.get():
+        queries.count += 1
+        queries.seconds += elapsed
+        if queries.statements is not None:
+            queries.statements.append(statement)
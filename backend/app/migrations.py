@@ -0,0 +1,206 @@
+"""Versioned schema migrations.
+
+Applied versions are recorded in ``schema_migrations``. Regular migrations run in a
+transaction together with their bookkeeping row; index-only migrations are built
+with ``CREATE INDEX CONCURRENTLY`` on an autocommit connection, so they do not
+block writes to a live competition. A session advisory lock keeps several API
+workers from migrating at the same time.
+
+Usage: ``python -m app.migrations [upgrade|status]``
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from .database import Base, engine
+
+ADVISORY_LOCK_KEY = 0x62617474  # "batt"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[AsyncConnection], Awaitable[None]] | None = None
+    concurrent_indexes: tuple[tuple[str, str], ...] = ()
+
+
+async def _baseline(conn: AsyncConnection) -> None:
+    """Schema that used to be created by ``create_all`` and the ad-hoc startup DDL."""
+    from . import models  # noqa: F401  (registers the tables on Base.metadata)
+
+    await conn.run_sync(Base.metadata.create_all)
+    await conn.execute(text("ALTER TABLE participants ADD COLUMN IF NOT EXISTS gender VARCHAR(16)"))
+    await _dedupe_scores(conn, "s.criterion_id = d.criterion_id")
+    await conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_score_judge_criterion "
+            "ON scores (round_id, participant_id, judge_id, criterion_id)"
+        )
+    )
+
+
+async def _dedupe_scores(conn: AsyncConnection, criterion_match: str) -> None:
+    """Keep only the newest score per judge mark before a unique index is built over them.
+
+    The old read-then-insert upsert could race and store the same mark twice; the later
+    row is the one the judge saw confirmed, so the older duplicates are dropped.
+    """
+    await conn.execute(
+        text(
+            "DELETE FROM scores s USING scores d "
+            "WHERE s.round_id = d.round_id AND s.participant_id = d.participant_id "
+            f"AND s.judge_id = d.judge_id AND {criterion_match} AND s.id < d.id"
+        )
+    )
+
+
+async def _jobs(conn: AsyncConnection) -> None:
+    from . import models
+
+    # A database created by a newer baseline (``create_all``) already has the table.
+    await conn.run_sync(lambda sync_conn: models.Job.__table__.create(sync_conn, checkfirst=True))
+
+
+async def _event_versions(conn: AsyncConnection) -> None:
+    await conn.execute(text("ALTER TABLE events ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0"))
+
+
+async def _score_null_criterion_key(conn: AsyncConnection) -> None:
+    # The four-column key treats NULL criteria as distinct, so marks without a criterion
+    # need their own partial index to be upserted.
+    await _dedupe_scores(conn, "s.criterion_id IS NULL AND d.criterion_id IS NULL")
+    await conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_score_judge_no_criterion "
+            "ON scores (round_id, participant_id, judge_id) WHERE criterion_id IS NULL"
+        )
+    )
+
+
+async def _round_score_versions(conn: AsyncConnection) -> None:
+    await conn.execute(
+        text("ALTER TABLE rounds ADD COLUMN IF NOT EXISTS scores_version INTEGER NOT NULL DEFAULT 0")
+    )
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "baseline", apply=_baseline),
+    Migration(
+        2,
+        "hot_path_indexes",
+        concurrent_indexes=(
+            ("ix_scores_heat_id", "ON scores (heat_id)"),
+            ("ix_scores_participant_round", "ON scores (participant_id, round_id)"),
+            ("ix_participants_category_id", "ON participants (category_id)"),
+            ("ix_participants_event_id", "ON participants (event_id)"),
+            ("ix_heats_round_id", "ON heats (round_id)"),
+            ("ix_rounds_event_id", "ON rounds (event_id)"),
+            ("ix_categories_event_id", "ON categories (event_id)"),
+            ("ix_criteria_category_id", "ON criteria (category_id)"),
+        ),
+    ),
+    Migration(3, "jobs", apply=_jobs),
+    Migration(4, "event_versions", apply=_event_versions),
+    Migration(5, "score_null_criterion_key", apply=_score_null_criterion_key),
+    Migration(6, "round_score_versions", apply=_round_score_versions),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    if await conn.scalar(text("SELECT to_regclass('schema_migrations')")) is None:
+        return 0
+    return await conn.scalar(text("SELECT coalesce(max(version), 0) FROM schema_migrations"))
+
+
+async def check(db_engine: AsyncEngine = engine) -> int:
+    """Fail when the database is behind :data:`LATEST_VERSION`; does not change anything."""
+    async with db_engine.connect() as conn:
+        version = await current_version(conn)
+    if version < LATEST_VERSION:
+        raise SchemaVersionError(
+            f"Database schema is at version {version}, the application expects {LATEST_VERSION}. "
+            "Run `python -m app.migrations upgrade`."
+        )
+    return version
+
+
+async def upgrade(db_engine: AsyncEngine = engine) -> list[int]:
+    """Apply pending migrations in order and return the versions that were applied."""
+    async with db_engine.connect() as conn:
+        if await current_version(conn) >= LATEST_VERSION:
+            return []
+
+    applied_now: list[int] = []
+    async with db_engine.connect() as conn:
+        lock_conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        try:
+            await lock_conn.execute(
+                text(
+                    "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                    "version INT PRIMARY KEY, name TEXT NOT NULL, "
+                    "applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+                )
+            )
+            applied = set((await lock_conn.scalars(text("SELECT version FROM schema_migrations"))).all())
+            for migration in MIGRATIONS:
+                if migration.version in applied:
+                    continue
+                for index_name, definition in migration.concurrent_indexes:
+                    await _create_index_concurrently(lock_conn, index_name, definition)
+                async with db_engine.begin() as tx:
+                    if migration.apply is not None:
+                        await migration.apply(tx)
+                    await tx.execute(
+                        text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                        {"version": migration.version, "name": migration.name},
+                    )
+                applied_now.append(migration.version)
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+    return applied_now
+
+
+async def _create_index_concurrently(conn: AsyncConnection, index_name: str, definition: str) -> None:
+    # An interrupted concurrent build leaves an INVALID index behind that IF NOT EXISTS would keep.
+    valid = await conn.scalar(
+        text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name"
+        ),
+        {"name": index_name},
+    )
+    if valid is False:
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+    await conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} {definition}"))
+
+
+async def _main(command: str) -> None:
+    if command == "upgrade":
+        applied = await upgrade()
+        print(f"Applied migrations: {applied}" if applied else f"Schema is up to date (version {LATEST_VERSION}).")
+    elif command == "status":
+        async with engine.connect() as conn:
+            version = await current_version(conn)
+        print(f"Database version {version}, latest {LATEST_VERSION}.")
+    else:
+        raise SystemExit(f"Unknown command {command!r}; use 'upgrade' or 'status'.")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "upgrade"))
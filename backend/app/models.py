@@ -1,17 +1,24 @@
-from datetime import date
+from datetime import date, datetime
 from typing import List
 
 from sqlalchemy import (
     BigInteger,
+    Boolean,
     CheckConstraint,
     Column,
     Date,
+    DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     String,
+    Text,
     UniqueConstraint,
+    func,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -38,6 +45,8 @@ class Event(Base):
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     date: Mapped[date | None] = mapped_column(Date, nullable=True)
     location: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Bumped by every write to the competition tree; keys the snapshot, cache and report versions.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     categories: Mapped[List["Category"]] = relationship("Category", back_populates="event")
     rounds: Mapped[List["Round"]] = relationship("Round", back_populates="event")
@@ -48,7 +57,7 @@ class Category(Base):
     __tablename__ = "categories"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
     name: Mapped[str] = mapped_column(String(128), nullable=False)
     type: Mapped[str] = mapped_column(String(32), nullable=False)
 
@@ -62,8 +71,10 @@ class Participant(Base):
     __tablename__ = "participants"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
-    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
+    category_id: Mapped[int] = mapped_column(
+        ForeignKey("categories.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     first_name: Mapped[str] = mapped_column(String(64), nullable=False)
     last_name: Mapped[str] = mapped_column(String(64), nullable=False)
     number: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -80,10 +91,12 @@ class Round(Base):
     __tablename__ = "rounds"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
     category_id: Mapped[int] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
     round_type: Mapped[str] = mapped_column(String(32), nullable=False)
     stage_format: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    # Bumped in the same transaction as every score write; keys the in-memory leaderboards.
+    scores_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     event: Mapped["Event"] = relationship("Event", back_populates="rounds")
     category: Mapped["Category"] = relationship("Category", back_populates="rounds")
@@ -96,7 +109,7 @@ class Heat(Base):
     __tablename__ = "heats"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    round_id: Mapped[int] = mapped_column(ForeignKey("rounds.id", ondelete="CASCADE"), nullable=False)
+    round_id: Mapped[int] = mapped_column(ForeignKey("rounds.id", ondelete="CASCADE"), nullable=False, index=True)
     heat_number: Mapped[int] = mapped_column(Integer, nullable=False)
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="waiting")
 
@@ -129,7 +142,9 @@ class Criterion(Base):
     __tablename__ = "criteria"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    category_id: Mapped[int] = mapped_column(
+        ForeignKey("categories.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     name: Mapped[str] = mapped_column(String(64), nullable=False)
     scale_min: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     scale_max: Mapped[int] = mapped_column(Integer, nullable=False, default=10)
@@ -141,6 +156,18 @@ class Score(Base):
     __tablename__ = "scores"
     __table_args__ = (
         CheckConstraint("score >= 0", name="ck_score_non_negative"),
+        UniqueConstraint(
+            "round_id", "participant_id", "judge_id", "criterion_id", name="uq_score_judge_criterion"
+        ),
+        Index(
+            "uq_score_judge_no_criterion",
+            "round_id",
+            "participant_id",
+            "judge_id",
+            unique=True,
+            postgresql_where=text("criterion_id IS NULL"),
+        ),
+        Index("ix_scores_participant_round", "participant_id", "round_id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -149,7 +176,7 @@ class Score(Base):
     judge_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     criterion_id: Mapped[int | None] = mapped_column(ForeignKey("criteria.id", ondelete="SET NULL"), nullable=True)
     score: Mapped[float] = mapped_column(Float, nullable=False)
-    heat_id: Mapped[int | None] = mapped_column(ForeignKey("heats.id", ondelete="SET NULL"), nullable=True)
+    heat_id: Mapped[int | None] = mapped_column(ForeignKey("heats.id", ondelete="SET NULL"), nullable=True, index=True)
 
     round: Mapped["Round"] = relationship("Round", back_populates="scores")
     participant: Mapped["Participant"] = relationship("Participant", back_populates="scores")
@@ -170,3 +197,50 @@ class FinalPlace(Base):
     __table_args__ = (
         UniqueConstraint("round_id", "participant_id", name="uq_round_participant_final"),
     )
+
+
+class NotificationOutbox(Base):
+    """Telegram messages waiting to be delivered by the notification worker."""
+
+    __tablename__ = "notification_outbox"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending", server_default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    last_error: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_notification_outbox_due", "status", "next_attempt_at"),
+    )
+
+
+class Job(Base):
+    """A long admin operation run in the background by :class:`app.services.jobs.JobRunner`."""
+
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    type: Mapped[str] = mapped_column(String(32), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="queued", server_default="queued")
+    event_id: Mapped[int | None] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=True)
+    params: Mapped[dict] = mapped_column(JSON, nullable=False)
+    result: Mapped[dict | list | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    idempotency_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default="false")
+    lease_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("type", "idempotency_key", name="uq_jobs_idempotency_key"),
+        Index("ix_jobs_due", "type", "status", "id"),
+    )
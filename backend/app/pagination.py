@@ -0,0 +1,145 @@
+"""Keyset pagination and ``fields=`` projections for list endpoints.
+
+A list is ordered by its :class:`SortKey` columns, ending in a unique id. With
+``limit`` the statement fetches one extra row. If that row exists, the sort key
+values of the last returned row become an opaque cursor, sent back in the
+``X-Next-Cursor`` header. The next request passes it as ``cursor`` and continues
+strictly after that row, so pages stay stable while rows are inserted. The body
+stays a plain JSON list, so clients that send neither parameter are unaffected.
+"""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Sequence
+
+import orjson
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Date, and_, false, or_, true
+from sqlalchemy.sql import ColumnElement, Select
+
+from .serialization import dumps, json_response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_LIMIT = 1000
+
+LimitQuery = Query(None, ge=1, le=MAX_LIMIT, description="Размер страницы; без параметра — весь список")
+CursorQuery = Query(None, description=f"Значение заголовка {NEXT_CURSOR_HEADER} предыдущей страницы")
+FieldsQuery = Query(
+    None, description="Поля ответа через запятую, например id,title; остальных полей в объектах не будет"
+)
+# ``response_model`` documents whole objects; a ``fields=`` projection returns only some of their keys.
+LIST_RESPONSES = {
+    200: {
+        "description": "Список объектов. С параметром fields каждый объект содержит только запрошенные поля.",
+        "headers": {
+            NEXT_CURSOR_HEADER: {
+                "description": "Курсор следующей страницы; отсутствует на последней",
+                "schema": {"type": "string"},
+            }
+        },
+    }
+}
+
+
+@dataclass(frozen=True)
+class SortKey:
+    column: ColumnElement
+    descending: bool = False
+    nulls_first: bool = False
+
+    @property
+    def nullable(self) -> bool:
+        return getattr(self.column, "nullable", True)
+
+    def order_by(self):
+        expr = self.column.desc() if self.descending else self.column.asc()
+        if not self.nullable:
+            return expr  # no NULLS clause, so a primary key index can still serve the order
+        return expr.nulls_first() if self.nulls_first else expr.nulls_last()
+
+    def after(self, value):
+        """Rows strictly after ``value`` in this key's order."""
+        if value is None:
+            return self.column.is_not(None) if self.nulls_first else false()
+        beyond = self.column < value if self.descending else self.column > value
+        if self.nulls_first or not self.nullable:
+            return beyond
+        return or_(beyond, self.column.is_(None))
+
+    def same(self, value):
+        return self.column.is_(None) if value is None else self.column == value
+
+
+@dataclass
+class Page:
+    items: list[dict]
+    next_cursor: str | None = None
+
+
+def parse_fields(fields: str | None, allowed: Sequence[str]) -> tuple[str, ...]:
+    """Requested fields in schema order; all of ``allowed`` when ``fields`` is empty."""
+    if not fields:
+        return tuple(allowed)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные поля: {', '.join(sorted(unknown))}")
+    return tuple(name for name in allowed if name in requested)
+
+
+def encode_cursor(values: Iterable) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(list(values))).decode()
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> list:
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, orjson.JSONDecodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    try:
+        return [
+            date.fromisoformat(value) if value is not None and isinstance(key.column.type, Date) else value
+            for key, value in zip(keys, values)
+        ]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+def paginate(stmt: Select, keys: Sequence[SortKey], cursor: str | None, limit: int | None) -> Select:
+    """Order by ``keys``, continue after ``cursor`` and fetch ``limit + 1`` rows.
+
+    The key columns are appended to the selected columns, so the rows end with the cursor values.
+    """
+    stmt = stmt.add_columns(*(key.column.label(f"_sort_{idx}") for idx, key in enumerate(keys)))
+    stmt = stmt.order_by(*(key.order_by() for key in keys))
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        clauses = []
+        for idx, key in enumerate(keys):
+            prefix = [previous.same(value) for previous, value in zip(keys[:idx], values)]
+            clauses.append(and_(true(), *prefix, key.after(values[idx])))
+        stmt = stmt.filter(or_(*clauses))
+    if limit:
+        stmt = stmt.limit(limit + 1)
+    return stmt
+
+
+def split_page(rows: Iterable[Sequence], fields: Sequence[str], keys: Sequence[SortKey], limit: int | None) -> Page:
+    """Rows of a :func:`paginate` statement as dicts of ``fields`` plus the next cursor."""
+    rows = list(rows)
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][-len(keys) :])
+    # zip stops at the last field, dropping the appended sort key columns.
+    return Page(items=[dict(zip(fields, row)) for row in rows], next_cursor=next_cursor)
+
+
+def page_response(page: Page) -> Response:
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None
+    return json_response(dumps(page.items), headers=headers)
@@ -0,0 +1,103 @@
+"""Query budgets and N+1 detection.
+
+Routes declare how many statements they may run with :func:`query_budget`.
+With ``QUERY_BUDGET_MODE=warn`` or ``raise``, :class:`QueryBudgetMiddleware`
+records every statement of a request. It reports requests that exceed their
+route's budget, or that repeat one statement shape ``QUERY_REPEAT_THRESHOLD``
+or more times (the usual N+1 pattern: a lazy load or a query inside a loop).
+``raise`` lets the error escape the ASGI app, so a test client fails the test.
+``warn`` only logs. The default ``off`` does not install the middleware.
+
+In tests or scripts, :func:`count_queries` collects statements around any block::
+
+    with count_queries() as queries:
+        await client.get("/heats/1")
+    assert queries.count <= 8, repeated_statements(queries.statements)
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Iterator, TypeVar
+
+from .config import settings
+from .metrics import RequestQueries, current_queries
+
+logger = logging.getLogger(__name__)
+
+Endpoint = TypeVar("Endpoint", bound=Callable)
+
+_IN_LIST = re.compile(r"\(\s*\$\d+(?:\s*,\s*\$\d+)*\s*\)")
+_NUMBERED_PARAM = re.compile(r"\$\d+")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def query_budget(limit: int) -> Callable[[Endpoint], Endpoint]:
+    """Declare the maximum number of statements a route may execute per request."""
+
+    def decorator(endpoint: Endpoint) -> Endpoint:
+        endpoint.query_budget = limit
+        return endpoint
+
+    return decorator
+
+
+@contextmanager
+def count_queries() -> Iterator[RequestQueries]:
+    queries = RequestQueries(statements=[])
+    token = current_queries.set(current_queries.get() + (queries,))
+    try:
+        yield queries
+    finally:
+        current_queries.reset(token)
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with expanded ``IN`` lists collapsed, so ``IN ($1, $2)`` and ``IN ($1)`` match."""
+    return _NUMBERED_PARAM.sub("?", _IN_LIST.sub("(?)", " ".join(statement.split())))
+
+
+def repeated_statements(statements: list[str], threshold: int | None = None) -> dict[str, int]:
+    """Statement shapes executed at least ``threshold`` times."""
+    threshold = threshold or settings.query_repeat_threshold
+    counts = Counter(statement_shape(statement) for statement in statements)
+    return {shape: count for shape, count in counts.items() if count >= threshold}
+
+
+def budget_problems(queries: RequestQueries, budget: int | None) -> list[str]:
+    problems = []
+    if budget is not None and queries.count > budget:
+        problems.append(f"{queries.count} statements, budget {budget}")
+    for shape, count in repeated_statements(queries.statements or []).items():
+        problems.append(f"{count}× {shape[:200]}")
+    return problems
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, app, mode: str | None = None) -> None:
+        self.app = app
+        self.mode = mode or settings.query_budget_mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as queries:
+            await self.app(scope, receive, send)
+
+        route = scope.get("route")
+        budget = getattr(getattr(route, "endpoint", None), "query_budget", None)
+        problems = budget_problems(queries, budget)
+        if not problems:
+            return
+        where = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+        if self.mode == "raise":
+            raise QueryBudgetExceeded(f"{where}: " + "; ".join(problems))
+        logger.warning("Query budget: %s: %s", where, "; ".join(problems))
@@ -0,0 +1,111 @@
+"""Read path for the endpoints judges refresh most: Core selects straight into response dicts.
+
+No ORM objects are hydrated. Each helper selects only the columns its response
+needs, over the indexed foreign keys. It returns dicts in the key order of the
+response schema, ready for :func:`serialization.dumps`.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .serialization import as_dicts
+
+SCORE_COLUMNS = ("participant_id", "judge_id", "round_id", "heat_id", "criterion_id", "score", "id")
+
+
+def _participant_rows(stmt):
+    return (
+        stmt.add_columns(models.Participant.first_name, models.Participant.last_name)
+        .join(models.Participant, models.Participant.id == models.HeatParticipant.participant_id)
+        .order_by(models.HeatParticipant.participant_id)
+    )
+
+
+async def heat_detail(db: AsyncSession, heat_id: int) -> dict:
+    """``HeatDetailRead`` for one heat in three statements: heat header, participants, criteria."""
+    header = (
+        await db.execute(
+            select(
+                models.Heat.id,
+                models.Heat.heat_number,
+                models.Heat.status,
+                models.Round.id,
+                models.Round.round_type,
+                models.Event.id,
+                models.Event.title,
+                models.Category.id,
+                models.Category.name,
+            )
+            .join(models.Round, models.Round.id == models.Heat.round_id)
+            .join(models.Event, models.Event.id == models.Round.event_id)
+            .join(models.Category, models.Category.id == models.Round.category_id)
+            .filter(models.Heat.id == heat_id)
+        )
+    ).one_or_none()
+    if header is None:
+        raise HTTPException(status_code=404, detail="Heat not found")
+    id_, heat_number, status, round_id, round_type, event_id, event_title, category_id, category_name = header
+
+    participants = await db.execute(
+        _participant_rows(select(models.HeatParticipant.participant_id)).filter(models.HeatParticipant.heat_id == heat_id)
+    )
+    criteria = await db.execute(
+        select(models.Criterion.id, models.Criterion.name, models.Criterion.scale_min, models.Criterion.scale_max)
+        .filter(models.Criterion.category_id == category_id)
+        .order_by(models.Criterion.id)
+    )
+    return {
+        "id": id_,
+        "heat_number": heat_number,
+        "status": status,
+        "participants": [
+            {"participant_id": participant_id, "participant_name": f"{first_name} {last_name}"}
+            for participant_id, first_name, last_name in participants
+        ],
+        "round_id": round_id,
+        "round_type": round_type,
+        "event_id": event_id,
+        "event_title": event_title,
+        "category_id": category_id,
+        "category_name": category_name,
+        "criteria": as_dicts(criteria, ("id", "name", "scale_min", "scale_max")),
+    }
+
+
+async def round_heats(db: AsyncSession, round_id: int) -> List[dict]:
+    """``HeatRead`` for every heat of a round, in two statements."""
+    heats = {
+        id_: {"id": id_, "heat_number": heat_number, "status": status, "participants": []}
+        for id_, heat_number, status in await db.execute(
+            select(models.Heat.id, models.Heat.heat_number, models.Heat.status)
+            .filter(models.Heat.round_id == round_id)
+            .order_by(models.Heat.heat_number)
+        )
+    }
+    if not heats:
+        return []
+    participants = await db.execute(
+        _participant_rows(select(models.HeatParticipant.heat_id, models.HeatParticipant.participant_id))
+        .join(models.Heat, models.Heat.id == models.HeatParticipant.heat_id)
+        .filter(models.Heat.round_id == round_id)
+    )
+    for heat_id, participant_id, first_name, last_name in participants:
+        heats[heat_id]["participants"].append(
+            {"participant_id": participant_id, "participant_name": f"{first_name} {last_name}"}
+        )
+    return list(heats.values())
+
+
+async def heat_scores(db: AsyncSession, heat_id: int) -> List[dict]:
+    """``ScoreRead`` rows of a heat."""
+    columns = [getattr(models.Score, name) for name in SCORE_COLUMNS]
+    result = await db.execute(
+        select(*columns).filter(models.Score.heat_id == heat_id).order_by(models.Score.participant_id)
+    )
+    return as_dicts(result, SCORE_COLUMNS)
@@ -0,0 +1,200 @@
+"""Optional request log for replaying a live competition (``REQUEST_LOG_PATH``).
+
+Each API request becomes one JSON line:
+
+``{"t": 1718000000.123, "m": "POST", "r": "/heats/{heat_id}/scores:batch", "p": {"heat_id": "5"},
+"q": "", "b": {...}, "s": 200, "ms": 12.3, "ids": {...}}``
+
+``t`` is the arrival time, ``r`` the route template, ``p`` the raw path
+parameters, ``q`` the raw query string, ``b`` the JSON body, ``s`` the status and
+``ms`` the latency. A body that is not JSON, such as the multipart upload of a
+participant import, is kept as ``"raw": {"ct": <content type>, "data": <base64>}``
+instead. ``ids`` holds the ids a successful create returned (``id``, the
+category's ``criteria`` ids, an import's ``participant_ids``, distribute's
+``heat_ids``, also found in the ``result`` of a finished job polled with
+``GET /jobs/{job_id}``). With them, ``benchmarks/replay.py`` can map recorded ids
+to the ones a scratch database assigns. Lines are buffered and appended in
+batches by a single writer thread, so the file I/O stays off the event loop and
+batches keep their order. A background task started with the app hands off the
+buffer every ``flush_seconds`` even when no further request arrives.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from .config import settings
+
+SKIPPED_PREFIXES = ("/metrics", "/health", "/events", "/docs", "/redoc", "/openapi.json")
+MAX_CAPTURED_RESPONSE = 64 * 1024
+MAX_CAPTURED_UPLOAD = 8 * 1024 * 1024
+
+
+class RequestLog:
+    def __init__(self, path: str, flush_every: int = 200, flush_seconds: float = 1.0) -> None:
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._buffer: list[str] = []
+        self._flushed_at = time.monotonic()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="request-log")
+        self._last_write: Future | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            if time.monotonic() - self._flushed_at >= self.flush_seconds:
+                self._hand_off()
+
+    def append(self, entry: dict) -> None:
+        self._buffer.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+        if len(self._buffer) >= self.flush_every or time.monotonic() - self._flushed_at >= self.flush_seconds:
+            self._hand_off()
+
+    def _hand_off(self) -> None:
+        self._flushed_at = time.monotonic()
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        self._last_write = self._writer.submit(self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+
+    async def flush(self) -> None:
+        """Hand off the buffered lines and wait until every batch is on disk."""
+        self._hand_off()
+        if self._last_write is not None:
+            # The writer runs batches in order, so the last one finishing means all have.
+            await asyncio.wrap_future(self._last_write)
+
+
+request_log = RequestLog(settings.request_log_path) if settings.request_log_path else None
+
+
+def _decode(body: bytes):
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def _raw_body(body: bytes, headers: list[tuple[bytes, bytes]]) -> dict | None:
+    """A non-JSON request body (a file upload) with its content type, for replaying it as is."""
+    if len(body) > MAX_CAPTURED_UPLOAD:
+        return None
+    content_type = next((value.decode("latin-1") for name, value in headers if name == b"content-type"), "")
+    return {"ct": content_type, "data": base64.b64encode(body).decode("ascii")}
+
+
+def created_ids(body: bytes) -> dict | None:
+    """Ids returned by a create endpoint; list responses (score sheets) are not inspected."""
+    if not body.startswith(b"{"):
+        return None
+    payload = _decode(body)
+    if not isinstance(payload, dict):
+        return None
+    ids = {}
+    if isinstance(payload.get("id"), int):
+        ids["id"] = payload["id"]
+    if isinstance(payload.get("criteria"), list):
+        ids["criteria"] = [criterion["id"] for criterion in payload["criteria"] if isinstance(criterion, dict)]
+    if isinstance(payload.get("participant_ids"), list):
+        ids["participant_ids"] = payload["participant_ids"]
+    heat_ids = result_heat_ids(payload)
+    if heat_ids is not None:
+        ids["heat_ids"] = heat_ids
+    return ids or None
+
+
+def result_heat_ids(payload: dict) -> list | None:
+    """``heat_ids`` of a distribution, returned directly or as the result of a ``distribute_heats`` job."""
+    result = payload.get("result")
+    if isinstance(result, dict):
+        payload = result
+    heat_ids = payload.get("heat_ids")
+    return heat_ids if isinstance(heat_ids, list) else None
+
+
+class RequestLogMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or request_log is None or scope["path"].startswith(SKIPPED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        request_body: list[bytes] = []
+        response_body: list[bytes] = []
+        captured = 0
+        status_code = 500
+        # Creates, and job polls, whose result may carry the ids of the heats a job created.
+        capture_response = scope["method"] == "POST" or scope["path"].startswith("/jobs/")
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                request_body.append(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status_code, captured
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and capture_response and captured < MAX_CAPTURED_RESPONSE:
+                chunk = message.get("body", b"")
+                response_body.append(chunk)
+                captured += len(chunk)
+            await send(message)
+
+        arrived = time.time()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                body = b"".join(request_body)
+                entry = {
+                    "t": round(arrived, 4),
+                    "m": scope["method"],
+                    "r": route.path,
+                    "p": scope.get("path_params", {}),
+                    "q": scope.get("query_string", b"").decode("latin-1"),
+                    "b": _decode(body),
+                    "s": status_code,
+                    "ms": round((time.perf_counter() - started) * 1000, 2),
+                }
+                if body and entry["b"] is None:
+                    raw = _raw_body(body, scope.get("headers", []))
+                    if raw is not None:
+                        entry["raw"] = raw
+                if capture_response and status_code < 300 and captured < MAX_CAPTURED_RESPONSE:
+                    ids = created_ids(b"".join(response_body))
+                    if ids:
+                        entry["ids"] = ids
+                request_log.append(entry)
@@ -1,12 +1,24 @@
 from datetime import date
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import crud, models
 from ..database import get_db
-from ..schemas import CategoryCreate, CategoryRead, CompetitionCreate, CompetitionRead, CriterionRead, ParticipantRead
+from ..pagination import LIST_RESPONSES, CursorQuery, FieldsQuery, LimitQuery, page_response, parse_fields
+from ..query_budget import query_budget
+from ..schemas import (
+    CategoryCreate,
+    CategoryRead,
+    CompetitionCreate,
+    CompetitionRead,
+    CompetitionSnapshot,
+    CriterionRead,
+    ParticipantRead,
+)
+from ..serialization import dumps, json_response
+from ..services import catalog, snapshots
 
 router = APIRouter(prefix="/competitions", tags=["competitions"])
 
@@ -37,6 +49,8 @@ async def create_competition(payload: CompetitionCreate, db: AsyncSession = Depe
         except ValueError:
             raise HTTPException(status_code=400, detail="Некорректный формат даты. Используйте YYYY-MM-DD.")
     event = await crud.create_competition(db, title=payload.title, date=event_date, location=payload.location)
+    await snapshots.versions.bump(db, event.id)
+    catalog.invalidate_competition(event.id)
     return CompetitionRead(
         id=event.id,
         title=event.title,
@@ -46,39 +60,78 @@ async def create_competition(payload: CompetitionCreate, db: AsyncSession = Depe
     )
 
 
-@router.get("", response_model=List[CompetitionRead])
-async def list_competitions(db: AsyncSession = Depends(get_db)):
-    events = await crud.list_competitions(db)
-    return [
-        CompetitionRead(
-            id=event.id,
-            title=event.title,
-            date=str(event.date) if event.date else None,
-            location=event.location,
-            categories=[build_category_response(cat) for cat in sorted(event.categories, key=lambda c: c.id)],
-        )
-        for event in events
-    ]
+@router.get("", response_model=List[CompetitionRead], responses=LIST_RESPONSES)
+@query_budget(3)
+async def list_competitions(
+    limit: int | None = LimitQuery,
+    cursor: str | None = CursorQuery,
+    fields: str | None = FieldsQuery,
+    db: AsyncSession = Depends(get_db),
+):
+    selected = parse_fields(fields, crud.COMPETITION_FIELDS)
+    if limit or cursor or fields:
+        # Pages and projections are cheap to query and are not cached; only the full list is.
+        return page_response(await crud.list_competition_trees(db, fields=selected, cursor=cursor, limit=limit))
+
+    async def load() -> bytes:
+        return dumps((await crud.list_competition_trees(db)).items)
+
+    return json_response(await catalog.competition_cache.get_or_load(catalog.COMPETITION_LIST, load))
 
 
 @router.get("/{competition_id}", response_model=CompetitionRead)
+@query_budget(3)
 async def get_competition(competition_id: int, db: AsyncSession = Depends(get_db)):
-    event = await crud.get_competition(db, competition_id)
-    categories = [build_category_response(cat) for cat in sorted(event.categories, key=lambda c: c.id)]
-    return CompetitionRead(
-        id=event.id,
-        title=event.title,
-        date=str(event.date) if event.date else None,
-        location=event.location,
-        categories=categories,
+    async def load() -> bytes:
+        page = await crud.list_competition_trees(db, competition_id)
+        if not page.items:
+            raise HTTPException(status_code=404, detail="Competition not found")
+        return dumps(page.items[0])
+
+    return json_response(await catalog.competition_cache.get_or_load(catalog.competition_key(competition_id), load))
+
+
+@router.get("/{competition_id}/snapshot", response_model=CompetitionSnapshot)
+async def get_competition_snapshot(
+    competition_id: int,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Whole event tree in one document with a strong ETag; ``304`` when unchanged."""
+    version = await snapshots.versions.get(db, competition_id)
+    etag = snapshots.make_etag(competition_id, version)
+    if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    snapshot = await snapshots.get_snapshot(db, competition_id, version)
+    return Response(
+        content=snapshot.body,
+        media_type="application/json",
+        headers={"ETag": snapshot.etag, "Cache-Control": "no-cache"},
     )
 
 
-@router.get("/{competition_id}/all-participants", response_model=List[ParticipantRead])
-async def get_all_participants(competition_id: int, db: AsyncSession = Depends(get_db)):
+@router.get("/{competition_id}/all-participants", response_model=List[ParticipantRead], responses=LIST_RESPONSES)
+async def get_all_participants(
+    competition_id: int,
+    limit: int | None = LimitQuery,
+    cursor: str | None = CursorQuery,
+    fields: str | None = FieldsQuery,
+    db: AsyncSession = Depends(get_db),
+):
     """Get all participants for a competition across all categories."""
-    participants = await crud.list_all_participants_by_event(db, competition_id)
-    return [ParticipantRead.from_orm(p) for p in participants]
+    selected = parse_fields(fields, crud.PARTICIPANT_COLUMNS)
+    if limit or cursor or fields:
+        page = await crud.list_all_participants_by_event(
+            db, competition_id, fields=selected, cursor=cursor, limit=limit
+        )
+        return page_response(page)
+
+    async def load() -> bytes:
+        return dumps((await crud.list_all_participants_by_event(db, competition_id)).items)
+
+    return json_response(
+        await catalog.competition_cache.get_or_load(catalog.participants_key(competition_id), load)
+    )
 
 
 @router.post("/{competition_id}/categories", response_model=CategoryRead)
@@ -92,4 +145,6 @@ async def create_category(competition_id: int, payload: CategoryCreate, db: Asyn
         type=payload.type,
         criteria=payload.criteria,
     )
+    await snapshots.versions.bump(db, competition_id)
+    catalog.invalidate_competition(competition_id)
     return build_category_response(category)
@@ -0,0 +1,113 @@
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..services.events import Subscription, competition_topic, heat_topic, hub, job_topic, round_topic
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+def build_topics(
+    competition_id: int | None, round_id: int | None, heat_id: int | None, job_id: int | None = None
+) -> list[str]:
+    topics = []
+    if competition_id is not None:
+        topics.append(competition_topic(competition_id))
+    if round_id is not None:
+        topics.append(round_topic(round_id))
+    if heat_id is not None:
+        topics.append(heat_topic(heat_id))
+    if job_id is not None:
+        topics.append(job_topic(job_id))
+    return topics
+
+
+async def stream_events(request: Request, subscription: Subscription) -> AsyncIterator[bytes]:
+    try:
+        yield b"retry: 2000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=settings.events_keepalive_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+            yield event.sse
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def event_stream(
+    request: Request,
+    competition_id: int | None = None,
+    round_id: int | None = None,
+    heat_id: int | None = None,
+    job_id: int | None = None,
+):
+    """Server-Sent Events stream of heat status, score, leaderboard and job status deltas."""
+    topics = build_topics(competition_id, round_id, heat_id, job_id)
+    if not topics:
+        raise HTTPException(status_code=400, detail="Укажите competition_id, round_id, heat_id или job_id")
+    subscription = hub.subscribe(topics)
+    return StreamingResponse(
+        stream_events(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def event_socket(
+    websocket: WebSocket,
+    competition_id: int | None = None,
+    round_id: int | None = None,
+    heat_id: int | None = None,
+    job_id: int | None = None,
+):
+    """WebSocket variant of :func:`event_stream`; messages are the same JSON payloads."""
+    topics = build_topics(competition_id, round_id, heat_id, job_id)
+    if not topics:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    subscription = hub.subscribe(topics)
+    receiver = asyncio.create_task(receive_until_closed(websocket))
+    try:
+        while True:
+            getter = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {getter, receiver}, timeout=settings.events_keepalive_seconds, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receiver in done:
+                getter.cancel()
+                return
+            if getter not in done:
+                getter.cancel()
+                await websocket.send_text('{"type":"keepalive"}')
+                continue
+            event = getter.result()
+            if event is None:
+                await websocket.close(code=1013)
+                return
+            await websocket.send_text(event.data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(subscription)
+
+
+async def receive_until_closed(websocket: WebSocket) -> None:
+    """Read and discard client messages so the close handshake is noticed right away."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
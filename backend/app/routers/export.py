@@ -0,0 +1,61 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..services import protocol_export, reports
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+REPORT_MEDIA_TYPES = {"xlsx": XLSX_MEDIA_TYPE, "html": "text/html; charset=utf-8"}
+
+
+async def ensure_competition(db: AsyncSession, competition_id: int) -> None:
+    # The stream opens its own session: the request's one is closed before the body is sent.
+    if not await protocol_export.event_exists(db, competition_id):
+        raise HTTPException(status_code=404, detail="Competition not found")
+
+
+def attachment(filename: str) -> dict[str, str]:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+@router.get("/competition/{competition_id}/excel")
+async def export_excel(competition_id: int, db: AsyncSession = Depends(get_db)):
+    await ensure_competition(db, competition_id)
+    return StreamingResponse(
+        protocol_export.xlsx_chunks(competition_id),
+        media_type=XLSX_MEDIA_TYPE,
+        headers=attachment(f"protocol-{competition_id}.xlsx"),
+    )
+
+
+@router.get("/competition/{competition_id}/csv")
+async def export_csv(competition_id: int, db: AsyncSession = Depends(get_db)):
+    await ensure_competition(db, competition_id)
+    return StreamingResponse(
+        protocol_export.csv_chunks(competition_id),
+        media_type="text/csv; charset=utf-8",
+        headers=attachment(f"protocol-{competition_id}.csv"),
+    )
+
+
+@router.get("/competition/{competition_id}/results")
+async def export_results(
+    competition_id: int,
+    report_format: Literal["html", "xlsx"] = Query("html", alias="format"),
+):
+    """Result sheet: final places and per-criterion sums by round, rendered in a worker process.
+
+    ``html`` is a printable page (print to PDF from the browser), ``xlsx`` a formatted workbook.
+    """
+    path = await reports.renderer.get(competition_id, report_format)
+    return FileResponse(
+        path,
+        media_type=REPORT_MEDIA_TYPES[report_format],
+        filename=f"results-{competition_id}.{report_format}",
+        content_disposition_type="inline" if report_format == "html" else "attachment",
+    )
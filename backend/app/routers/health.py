@@ -1,6 +1,16 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
-from ..schemas import HealthResponse
+from .. import metrics
+from ..database import pool_metrics, pool_status
+from ..schemas import (
+    CacheStatsRead,
+    DatabasePoolStats,
+    DurationStatsRead,
+    HealthResponse,
+    ReportRendererStatsRead,
+)
+from ..services import catalog, reports
 
 router = APIRouter()
 
@@ -9,3 +19,35 @@ router = APIRouter()
 def health_check():
     """Simple health check for uptime monitoring."""
     return HealthResponse()
+
+
+@router.get("/health/cache", response_model=CacheStatsRead, tags=["health"])
+def competition_cache_stats():
+    """Hit/miss counters of the competition tree cache."""
+    return CacheStatsRead.from_orm(catalog.competition_cache.stats())
+
+
+@router.get("/health/reports", response_model=ReportRendererStatsRead, tags=["health"])
+def report_renderer_stats():
+    """Report render queue depth and cache/deduplication counters since startup."""
+    return ReportRendererStatsRead.from_orm(reports.renderer.stats())
+
+
+@router.get("/health/db", response_model=DatabasePoolStats, tags=["health"])
+def database_pool_stats():
+    """Connection pool occupancy and checkout/session timings since startup."""
+    return DatabasePoolStats(
+        **pool_status(),
+        connects=pool_metrics.connects,
+        invalidations=pool_metrics.invalidations,
+        timeouts=pool_metrics.timeouts,
+        checkout_wait=DurationStatsRead.from_orm(pool_metrics.checkout_wait),
+        connection_hold=DurationStatsRead.from_orm(pool_metrics.connection_hold),
+        session_lifetime=DurationStatsRead.from_orm(pool_metrics.session_lifetime),
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, tags=["health"])
+def prometheus_metrics():
+    """Request, database and cache metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
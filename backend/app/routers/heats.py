@@ -1,69 +1,102 @@
-from fastapi import APIRouter, Depends
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from .. import crud, models
+from .. import crud, models, reads
 from ..crud import get_or_404
 from ..database import get_db
-from ..schemas import HeatDetailRead, HeatParticipantRead, CriterionRead, HeatStatusRead, HeatStatusUpdate
-from ..services import notifications
+from ..query_budget import query_budget
+from ..schemas import (
+    HeatDetailRead,
+    HeatStatusRead,
+    HeatStatusUpdate,
+    ScoreRead,
+    ScoreSheetCreate,
+)
+from ..serialization import dumps, json_response
+from ..services import events, notifications, snapshots
+from ..services import heats as heats_service
+from ..services.results import leaderboards
 
 router = APIRouter(prefix="/heats", tags=["heats"])
 
 
 @router.get("/{heat_id}", response_model=HeatDetailRead)
+@query_budget(3)
 async def get_heat_detail(heat_id: int, db: AsyncSession = Depends(get_db)):
-    stmt = (
-        select(models.Heat)
-        .options(
-            selectinload(models.Heat.participants).selectinload(models.HeatParticipant.participant),
-            selectinload(models.Heat.round).selectinload(models.Round.event),
-            selectinload(models.Heat.round)
-            .selectinload(models.Round.category)
-            .selectinload(models.Category.criteria),
-        )
-        .filter(models.Heat.id == heat_id)
-    )
-    heat = await get_or_404(db, stmt, "Heat not found")
-
-    category = heat.round.category
-    event = heat.round.event
-
-    return HeatDetailRead(
-        id=heat.id,
-        heat_number=heat.heat_number,
-        status=heat.status,
-        participants=[
-            HeatParticipantRead(
-                participant_id=hp.participant_id,
-                participant_name=f"{hp.participant.first_name} {hp.participant.last_name}",
-            )
-            for hp in sorted(heat.participants, key=lambda participant: participant.participant_id)
-        ],
-        round_id=heat.round.id,
-        round_type=heat.round.round_type,
-        event_id=event.id,
-        event_title=event.title,
-        category_id=category.id,
-        category_name=category.name,
-        criteria=[
-            CriterionRead(
-                id=crit.id,
-                name=crit.name,
-                scale_min=crit.scale_min,
-                scale_max=crit.scale_max,
-            )
-            for crit in sorted(category.criteria, key=lambda criterion: criterion.id)
-        ],
-    )
+    return json_response(dumps(await reads.heat_detail(db, heat_id)))
 
 
 @router.patch("/{heat_id}/status", response_model=HeatStatusRead)
+@query_budget(11)
 async def update_heat_status(
     heat_id: int, payload: HeatStatusUpdate, db: AsyncSession = Depends(get_db)
 ) -> HeatStatusRead:
-    heat = await crud.update_heat_status(db, heat_id=heat_id, status=payload.status)
+    heat = await heats_service.update_heat_status(db, heat_id=heat_id, status=payload.status)
+    await snapshots.versions.bump(db, heat.round.event_id)
+    events.publish_heat_status(heat)
     if payload.status == "finished":
-        await notifications.notify_heat_finished(db, heat)
+        notifications.worker.wake()
     return HeatStatusRead(id=heat.id, status=heat.status)
+
+
+@router.post("/{heat_id}/scores:batch", response_model=List[ScoreRead])
+@query_budget(10)
+async def submit_score_sheet(heat_id: int, payload: ScoreSheetCreate, db: AsyncSession = Depends(get_db)):
+    """Store a judge's whole score sheet for a heat in one transaction."""
+    stmt_heat = (
+        select(models.Heat.round_id, models.Round.category_id)
+        .join(models.Round, models.Round.id == models.Heat.round_id)
+        .filter(models.Heat.id == heat_id)
+    )
+    heat_row = (await db.execute(stmt_heat)).one_or_none()
+    if heat_row is None:
+        raise HTTPException(status_code=404, detail="Heat not found")
+    round_id, category_id = heat_row
+
+    await get_or_404(db, select(models.User.id).filter(models.User.id == payload.judge_id), "Judge not found")
+
+    criteria_result = await db.execute(
+        select(models.Criterion.id, models.Criterion.scale_min, models.Criterion.scale_max).filter(
+            models.Criterion.category_id == category_id
+        )
+    )
+    scales = {criterion_id: (scale_min, scale_max) for criterion_id, scale_min, scale_max in criteria_result.all()}
+    participants_result = await db.execute(
+        select(models.HeatParticipant.participant_id).filter(models.HeatParticipant.heat_id == heat_id)
+    )
+    heat_participants = set(participants_result.scalars().all())
+
+    errors: list[dict] = []
+    seen: set[tuple[int, int]] = set()
+    for idx, entry in enumerate(payload.scores):
+        loc = ["body", "scores", idx]
+        key = (entry.participant_id, entry.criterion_id)
+        if entry.participant_id not in heat_participants:
+            errors.append({"loc": loc + ["participant_id"], "msg": "Участник не состоит в этом заходе"})
+        if entry.criterion_id not in scales:
+            errors.append({"loc": loc + ["criterion_id"], "msg": "Критерий не относится к категории захода"})
+        else:
+            scale_min, scale_max = scales[entry.criterion_id]
+            if not scale_min <= entry.score <= scale_max:
+                errors.append(
+                    {"loc": loc + ["score"], "msg": f"Оценка должна быть в диапазоне {scale_min}–{scale_max}"}
+                )
+        if key in seen:
+            errors.append({"loc": loc, "msg": "Повторная оценка участника по тому же критерию"})
+        seen.add(key)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    scores, version = await crud.upsert_scores(
+        db,
+        judge_id=payload.judge_id,
+        round_id=round_id,
+        heat_id=heat_id,
+        entries=[(entry.participant_id, entry.criterion_id, entry.score) for entry in payload.scores],
+    )
+    changes = await leaderboards.record(db, round_id, version, scores)
+    events.publish_scores(scores, changes)
+    return [ScoreRead.from_orm(score) for score in scores]
@@ -0,0 +1,36 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..schemas import JobCreate, JobRead
+from ..services import jobs
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post("", response_model=JobRead, status_code=202)
+async def submit_job(
+    payload: JobCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=64),
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue a long admin operation; poll ``GET /jobs/{id}`` or listen on ``/events/stream?job_id=``.
+
+    ``params`` are those of the synchronous endpoint plus ``round_id`` (``distribute_heats``,
+    ``final_places``) or ``event_id`` (``results_report``). A repeated ``Idempotency-Key``
+    returns the job created by the first request.
+    """
+    job = await jobs.submit_job(db, payload.type, payload.params, idempotency_key)
+    return JobRead.from_orm(job)
+
+
+@router.get("/{job_id}", response_model=JobRead)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    return JobRead.from_orm(await jobs.get_job(db, job_id))
+
+
+@router.post("/{job_id}/cancel", response_model=JobRead)
+async def cancel_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    return JobRead.from_orm(await jobs.cancel_job(db, job_id))
@@ -0,0 +1,111 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..crud import get_or_404
+from ..database import get_db
+from ..query_budget import query_budget
+from ..schemas import DashboardCompetition, DashboardRound, HeatParticipantRead, HeatRead, JudgeDashboard
+
+router = APIRouter(prefix="/judges", tags=["judges"])
+
+
+@router.get("/{judge_id}/dashboard", response_model=JudgeDashboard)
+@query_budget(3)
+async def get_judge_dashboard(judge_id: int, db: AsyncSession = Depends(get_db)):
+    """Every active competition → round → heat with participant names.
+
+    A competition is active while at least one of its heats is not finished. The tree
+    is built from two projected queries: heats with their round and competition, and
+    the participants of those heats.
+    """
+    await get_or_404(db, select(models.User.id).filter(models.User.id == judge_id), "Judge not found")
+
+    active_events = (
+        select(models.Round.event_id)
+        .join(models.Heat, models.Heat.round_id == models.Round.id)
+        .filter(models.Heat.status != "finished")
+    )
+    stmt_heats = (
+        select(
+            models.Event.id,
+            models.Event.title,
+            models.Event.date,
+            models.Event.location,
+            models.Round.id,
+            models.Round.category_id,
+            models.Round.round_type,
+            models.Round.stage_format,
+            models.Heat.id,
+            models.Heat.heat_number,
+            models.Heat.status,
+        )
+        .join(models.Round, models.Round.event_id == models.Event.id)
+        .join(models.Heat, models.Heat.round_id == models.Round.id)
+        .filter(models.Event.id.in_(active_events))
+        .order_by(
+            models.Event.date.desc(),
+            models.Event.id,
+            models.Round.stage_format,
+            models.Round.round_type,
+            models.Round.id,
+            models.Heat.heat_number,
+        )
+    )
+    heat_rows = (await db.execute(stmt_heats)).all()
+
+    competitions: dict[int, DashboardCompetition] = {}
+    rounds: dict[int, DashboardRound] = {}
+    heats: dict[int, HeatRead] = {}
+    for (
+        event_id,
+        title,
+        event_date,
+        location,
+        round_id,
+        category_id,
+        round_type,
+        stage_format,
+        heat_id,
+        heat_number,
+        status,
+    ) in heat_rows:
+        competition = competitions.get(event_id)
+        if competition is None:
+            competition = competitions[event_id] = DashboardCompetition(
+                id=event_id,
+                title=title,
+                date=str(event_date) if event_date else None,
+                location=location,
+            )
+        round_ = rounds.get(round_id)
+        if round_ is None:
+            round_ = rounds[round_id] = DashboardRound(
+                id=round_id,
+                category_id=category_id,
+                round_type=round_type,
+                stage_format=stage_format,
+            )
+            competition.rounds.append(round_)
+        heat = heats[heat_id] = HeatRead(id=heat_id, heat_number=heat_number, status=status)
+        round_.heats.append(heat)
+
+    if heats:
+        stmt_participants = (
+            select(
+                models.HeatParticipant.heat_id,
+                models.HeatParticipant.participant_id,
+                models.Participant.first_name,
+                models.Participant.last_name,
+            )
+            .join(models.Participant, models.Participant.id == models.HeatParticipant.participant_id)
+            .filter(models.HeatParticipant.heat_id.in_(list(heats)))
+            .order_by(models.HeatParticipant.heat_id, models.HeatParticipant.participant_id)
+        )
+        for heat_id, participant_id, first_name, last_name in (await db.execute(stmt_participants)).all():
+            heats[heat_id].participants.append(
+                HeatParticipantRead(participant_id=participant_id, participant_name=f"{first_name} {last_name}")
+            )
+
+    return JudgeDashboard(judge_id=judge_id, competitions=list(competitions.values()))
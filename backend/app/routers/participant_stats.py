@@ -2,12 +2,14 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import JSON, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from .. import models
 from ..database import get_db
+from ..query_budget import query_budget
+from ..serialization import json_response
 
 router = APIRouter(prefix="/participants", tags=["participant_stats"])
 
@@ -38,6 +40,27 @@ class HeatDetail(BaseModel):
         from_attributes = True
 
 
+class CriterionStats(BaseModel):
+    criterion_id: int | None
+    criterion_name: str | None
+    total_score: float
+    average_score: float
+    score_count: int
+
+
+class RoundStats(BaseModel):
+    round_id: int
+    round_type: str
+    stage_format: str | None
+    category_name: str
+    total_score: float
+    average_score: float
+    score_count: int
+    rank: int
+    ranked_participants: int
+    criteria: List[CriterionStats]
+
+
 class ParticipantStats(BaseModel):
     id: int
     first_name: str
@@ -53,83 +76,211 @@ class ParticipantStats(BaseModel):
     event_location: str | None
     scores: List[ScoreDetail]
     heats: List[HeatDetail]
+    rounds: List[RoundStats]
 
     class Config:
         from_attributes = True
 
 
-@router.get("/{participant_id}", response_model=ParticipantStats)
-async def get_participant_stats(participant_id: int, db: AsyncSession = Depends(get_db)):
-    stmt = (
-        select(models.Participant)
-        .options(
-            selectinload(models.Participant.category).selectinload(models.Category.event),
-            selectinload(models.Participant.scores)
-            .selectinload(models.Score.judge),
-            selectinload(models.Participant.heats)
-            .selectinload(models.HeatParticipant.heat)
-            .selectinload(models.Heat.round)
-            .selectinload(models.Round.category),
-            selectinload(models.Participant.heats)
-            .selectinload(models.HeatParticipant.heat)
-            .selectinload(models.Heat.round)
-            .selectinload(models.Round.event),
+EMPTY_JSON = literal_column("'[]'::json")
+
+
+def _json_list(fields: dict, order_by):
+    """``json_agg`` of one object per row, ``[]`` when there are no rows."""
+    pairs = [item for name, column in fields.items() for item in (name, column)]
+    return func.coalesce(func.json_agg(aggregate_order_by(func.json_build_object(*pairs), order_by)), EMPTY_JSON, type_=JSON)
+
+
+def participant_stats_statement(participant_id: int):
+    """The whole participant page in one statement; nested lists are built with ``json_agg``.
+
+    Round totals rank the participant among everyone scored in the same round
+    (competition ranking, as in the live leaderboard).
+    """
+    Score, Round = models.Score, models.Round
+    # Aliases keep the nested lists from correlating with the participant's own category and event.
+    round_category = models.Category.__table__.alias("round_category")
+    round_event = models.Event.__table__.alias("round_event")
+    participant_rounds = select(Score.round_id).filter(Score.participant_id == participant_id)
+    totals = (
+        select(
+            Score.round_id,
+            Score.participant_id,
+            func.sum(Score.score).label("total"),
+            func.avg(Score.score).label("average"),
+            func.count().label("count"),
+        )
+        .filter(Score.round_id.in_(participant_rounds))
+        .group_by(Score.round_id, Score.participant_id)
+        .cte("round_totals")
+    )
+    ranked = select(
+        totals,
+        func.rank().over(partition_by=totals.c.round_id, order_by=totals.c.total.desc()).label("rank"),
+        func.count().over(partition_by=totals.c.round_id).label("ranked"),
+    ).cte("ranked_totals")
+    criterion_totals = (
+        select(
+            Score.round_id,
+            Score.criterion_id,
+            models.Criterion.name,
+            func.sum(Score.score).label("total"),
+            func.avg(Score.score).label("average"),
+            func.count().label("count"),
         )
+        .outerjoin(models.Criterion, models.Criterion.id == Score.criterion_id)
+        .filter(Score.participant_id == participant_id)
+        .group_by(Score.round_id, Score.criterion_id, models.Criterion.name)
+        .cte("criterion_totals")
+    )
+
+    round_criteria = (
+        select(
+            _json_list(
+                {
+                    "criterion_id": criterion_totals.c.criterion_id,
+                    "criterion_name": criterion_totals.c.name,
+                    "total_score": criterion_totals.c.total,
+                    "average_score": criterion_totals.c.average,
+                    "score_count": criterion_totals.c.count,
+                },
+                criterion_totals.c.criterion_id.asc().nulls_last(),
+            )
+        )
+        .filter(criterion_totals.c.round_id == ranked.c.round_id)
+        .scalar_subquery()
+    )
+    rounds = (
+        select(
+            _json_list(
+                {
+                    "round_id": ranked.c.round_id,
+                    "round_type": Round.round_type,
+                    "stage_format": Round.stage_format,
+                    "category_name": round_category.c.name,
+                    "total_score": ranked.c.total,
+                    "average_score": ranked.c.average,
+                    "score_count": ranked.c.count,
+                    "rank": ranked.c.rank,
+                    "ranked_participants": ranked.c.ranked,
+                    "criteria": round_criteria,
+                },
+                ranked.c.round_id,
+            )
+        )
+        .select_from(ranked)
+        .join(Round, Round.id == ranked.c.round_id)
+        .join(round_category, round_category.c.id == Round.category_id)
+        .filter(ranked.c.participant_id == participant_id)
+        .scalar_subquery()
+    )
+    scores = (
+        select(
+            _json_list(
+                {
+                    "id": Score.id,
+                    "score": Score.score,
+                    "judge_name": models.User.first_name + " " + models.User.last_name,
+                    "criterion_name": models.Criterion.name,
+                    "round_id": Score.round_id,
+                    "heat_id": Score.heat_id,
+                },
+                Score.id,
+            )
+        )
+        .join(models.User, models.User.id == Score.judge_id)
+        .outerjoin(models.Criterion, models.Criterion.id == Score.criterion_id)
+        .filter(Score.participant_id == participant_id)
+        .scalar_subquery()
+    )
+    heats = (
+        select(
+            _json_list(
+                {
+                    "id": models.Heat.id,
+                    "heat_number": models.Heat.heat_number,
+                    "status": models.Heat.status,
+                    "round_id": Round.id,
+                    "round_type": Round.round_type,
+                    "stage_format": Round.stage_format,
+                    "category_name": round_category.c.name,
+                    "event_title": round_event.c.title,
+                },
+                models.Heat.id,
+            )
+        )
+        .select_from(models.HeatParticipant)
+        .join(models.Heat, models.Heat.id == models.HeatParticipant.heat_id)
+        .join(Round, Round.id == models.Heat.round_id)
+        .join(round_category, round_category.c.id == Round.category_id)
+        .join(round_event, round_event.c.id == Round.event_id)
+        .filter(models.HeatParticipant.participant_id == participant_id)
+        .scalar_subquery()
+    )
+
+    return (
+        select(
+            models.Participant.id,
+            models.Participant.first_name,
+            models.Participant.last_name,
+            models.Participant.number,
+            models.Participant.role,
+            models.Participant.gender,
+            models.Participant.category_id,
+            models.Category.name,
+            models.Participant.event_id,
+            models.Event.title,
+            models.Event.date,
+            models.Event.location,
+            scores,
+            heats,
+            rounds,
+        )
+        .join(models.Category, models.Category.id == models.Participant.category_id)
+        .join(models.Event, models.Event.id == models.Participant.event_id)
         .filter(models.Participant.id == participant_id)
     )
 
-    result = await db.execute(stmt)
-    participant = result.scalar_one_or_none()
 
-    if participant is None:
+@router.get("/{participant_id}", response_model=ParticipantStats)
+@query_budget(2)
+async def get_participant_stats(participant_id: int, db: AsyncSession = Depends(get_db)):
+    row = (await db.execute(participant_stats_statement(participant_id))).one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Участник не найден")
 
-    # Get criteria names for scores
-    criteria_stmt = select(models.Criterion).filter(
-        models.Criterion.id.in_([score.criterion_id for score in participant.scores if score.criterion_id])
-    )
-    criteria_result = await db.execute(criteria_stmt)
-    criteria = {crit.id: crit.name for crit in criteria_result.scalars().all()}
-
-    scores = [
-        ScoreDetail(
-            id=score.id,
-            score=score.score,
-            judge_name=f"{score.judge.first_name} {score.judge.last_name}",
-            criterion_name=criteria.get(score.criterion_id) if score.criterion_id else None,
-            round_id=score.round_id,
-            heat_id=score.heat_id,
-        )
-        for score in participant.scores
-    ]
-
-    heats = [
-        HeatDetail(
-            id=hp.heat.id,
-            heat_number=hp.heat.heat_number,
-            status=hp.heat.status,
-            round_id=hp.heat.round.id,
-            round_type=hp.heat.round.round_type,
-            stage_format=hp.heat.round.stage_format,
-            category_name=hp.heat.round.category.name,
-            event_title=hp.heat.round.event.title,
-        )
-        for hp in participant.heats
-    ]
-
-    return ParticipantStats(
-        id=participant.id,
-        first_name=participant.first_name,
-        last_name=participant.last_name,
-        number=participant.number,
-        role=participant.role,
-        gender=participant.gender,
-        category_id=participant.category_id,
-        category_name=participant.category.name,
-        event_id=participant.event_id,
-        event_title=participant.event.title,
-        event_date=participant.event.date.isoformat() if participant.event.date else None,
-        event_location=participant.event.location,
+    (
+        id_,
+        first_name,
+        last_name,
+        number,
+        role,
+        gender,
+        category_id,
+        category_name,
+        event_id,
+        event_title,
+        event_date,
+        event_location,
+        scores,
+        heats,
+        rounds,
+    ) = row
+    stats = ParticipantStats(
+        id=id_,
+        first_name=first_name,
+        last_name=last_name,
+        number=number,
+        role=role,
+        gender=gender,
+        category_id=category_id,
+        category_name=category_name,
+        event_id=event_id,
+        event_title=event_title,
+        event_date=event_date.isoformat() if event_date else None,
+        event_location=event_location,
         scores=scores,
         heats=heats,
+        rounds=rounds,
     )
+    return json_response(stats.model_dump_json().encode())
@@ -1,13 +1,16 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from .. import crud, models
 from ..database import get_db
-from ..schemas import ParticipantCreate, ParticipantRead, ParticipantUpdate
+from ..pagination import LIST_RESPONSES, CursorQuery, FieldsQuery, LimitQuery, page_response, parse_fields
+from ..schemas import ParticipantCreate, ParticipantImportReport, ParticipantRead, ParticipantUpdate
+from ..services import catalog, participant_import, snapshots
+from ..services.results import leaderboards
 
 router = APIRouter(prefix="/competitions/{competition_id}/participants", tags=["participants"])
 
@@ -18,26 +21,52 @@ async def create_participant(
     payload: ParticipantCreate,
     db: AsyncSession = Depends(get_db),
 ):
-    parts = payload.full_name.strip().split()
-    if len(parts) < 2:
+    names = participant_import.split_full_name(payload.full_name)
+    if names is None:
         raise HTTPException(status_code=400, detail="Укажите имя и фамилию через пробел.")
     participant = await crud.create_participant(
         db,
         event_id=competition_id,
         category_id=payload.category_id,
-        first_name=" ".join(parts[:-1]),
-        last_name=parts[-1],
+        first_name=names[0],
+        last_name=names[1],
         number=payload.number,
         role=payload.role,
         gender=payload.gender,
     )
+    await snapshots.versions.bump(db, competition_id)
+    catalog.invalidate_participants(competition_id)
     return ParticipantRead.from_orm(participant)
 
 
-@router.get("", response_model=List[ParticipantRead])
-async def list_participants(competition_id: int, category_id: int, db: AsyncSession = Depends(get_db)):
-    participants = await crud.list_participants(db, category_id=category_id)
-    return [ParticipantRead.from_orm(participant) for participant in participants]
+@router.post(":import", response_model=ParticipantImportReport)
+async def import_participants(
+    competition_id: int,
+    file: UploadFile = File(..., description="CSV или XLSX: full_name, number, gender, category, role"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Register a whole entry list in one transaction; with any invalid row nothing is imported."""
+    records = participant_import.read_records(file.file, file.filename or "")
+    report = await participant_import.import_participants(db, competition_id, records)
+    if report.imported:
+        await snapshots.versions.bump(db, competition_id)
+        catalog.invalidate_participants(competition_id)
+    return report
+
+
+@router.get("", response_model=List[ParticipantRead], responses=LIST_RESPONSES)
+async def list_participants(
+    competition_id: int,
+    category_id: int,
+    limit: int | None = LimitQuery,
+    cursor: str | None = CursorQuery,
+    fields: str | None = FieldsQuery,
+    db: AsyncSession = Depends(get_db),
+):
+    page = await crud.list_participants(
+        db, category_id=category_id, fields=parse_fields(fields, crud.PARTICIPANT_COLUMNS), cursor=cursor, limit=limit
+    )
+    return page_response(page)
 
 
 @router.patch("/{participant_id}", response_model=ParticipantRead)
@@ -49,11 +78,10 @@ async def update_participant(
 ):
     updates = {}
     if payload.full_name:
-        parts = payload.full_name.strip().split()
-        if len(parts) < 2:
+        names = participant_import.split_full_name(payload.full_name)
+        if names is None:
             raise HTTPException(status_code=400, detail="Укажите имя и фамилию через пробел.")
-        updates["first_name"] = " ".join(parts[:-1])
-        updates["last_name"] = parts[-1]
+        updates["first_name"], updates["last_name"] = names
 
     if payload.number is not None:
         updates["number"] = payload.number
@@ -68,4 +96,7 @@ async def update_participant(
         raise HTTPException(status_code=400, detail="Нет данных для обновления.")
 
     participant = await crud.update_participant(db, participant_id, competition_id, updates)
+    await snapshots.versions.bump(db, competition_id)
+    catalog.invalidate_participants(competition_id)
+    leaderboards.rename_participant(participant.id, f"{participant.first_name} {participant.last_name}")
     return ParticipantRead.from_orm(participant)
@@ -5,9 +5,13 @@ from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from .. import crud, models
+from .. import crud, models, reads
 from ..database import get_db
+from ..query_budget import query_budget
 from ..schemas import (
+    CategoryRoundResult,
+    FinalPlaceRead,
+    FinalPlacesRequest,
     HeatDistributionRequest,
     HeatDistributionResponse,
     HeatParticipantRead,
@@ -15,8 +19,16 @@ from ..schemas import (
     ManualHeatCreate,
     RoundCreate,
     RoundRead,
+    SkatingDanceRow,
+    SkatingDanceSheet,
+    SkatingSheet,
+    SkatingSummaryRow,
 )
+from ..serialization import dumps, json_response
+from ..services import final_places as final_places_service
 from ..services import heats as heats_service
+from ..services import snapshots
+from ..services.results import leaderboards
 
 router = APIRouter(prefix="/rounds", tags=["rounds"])
 
@@ -52,6 +64,7 @@ async def create_round(payload: RoundCreate, db: AsyncSession = Depends(get_db))
         round_type=payload.round_type,
         stage_format=payload.stage_format,
     )
+    await snapshots.versions.bump(db, new_round.event_id)
     return RoundRead.from_orm(new_round)
 
 
@@ -61,21 +74,128 @@ async def list_rounds(event_id: int, db: AsyncSession = Depends(get_db)):
     return [RoundRead.from_orm(round_) for round_ in rounds]
 
 
+@router.get("/{round_id}/results", response_model=CategoryRoundResult)
+async def get_round_results(round_id: int, db: AsyncSession = Depends(get_db)):
+    """Live leaderboard of the round, served from the in-memory results engine."""
+    board = await leaderboards.get(db, round_id)
+    return board.result()
+
+
+@router.post("/{round_id}/final-places", response_model=List[FinalPlaceRead])
+async def calculate_final_places(round_id: int, payload: FinalPlacesRequest, db: AsyncSession = Depends(get_db)):
+    """Rank a final and store the result in final_places.
+
+    Rounds with ``stage_format = "skating"`` are ranked by the skating system, others by
+    the sum of judge places with the requested tie-breaks.
+    """
+    round_obj = await crud.get_round(db, round_id=round_id)
+    ranking = await final_places_service.calculate_final_places(
+        db,
+        round_obj,
+        tie_breaks=payload.tie_breaks,
+        penalty_from=payload.penalty_from,
+        head_judge_order=payload.head_judge_order,
+    )
+    return await final_places_service.final_place_rows(db, ranking)
+
+
+@router.get("/{round_id}/skating", response_model=SkatingSheet)
+async def get_skating_sheet(round_id: int, db: AsyncSession = Depends(get_db)):
+    """Full skating-system tabulation of a final (per-dance columns and rules 9–11)."""
+    round_obj = await crud.get_round(db, round_id=round_id)
+    matrix = await final_places_service.load_place_matrix(db, round_id)
+    result = final_places_service.skate_matrix(matrix)
+
+    participant_ids = matrix.participant_ids.tolist()
+    names = await final_places_service.load_participant_names(db, participant_ids)
+    criteria_result = await db.execute(
+        select(models.Criterion.id, models.Criterion.name).filter(models.Criterion.category_id == round_obj.category_id)
+    )
+    dance_names = dict(criteria_result.all())
+    judge_ids = matrix.judge_ids.tolist()
+
+    dances = [
+        SkatingDanceSheet(
+            dance_id=dance_id,
+            dance_name=dance_names.get(dance_id),
+            judge_ids=judge_ids,
+            rows=[
+                SkatingDanceRow(
+                    participant_id=participant_id,
+                    marks=tabulation.marks[:, idx].tolist(),
+                    counts=tabulation.counts[idx].tolist(),
+                    sums=tabulation.sums[idx].tolist(),
+                    place=tabulation.places[idx],
+                )
+                for idx, participant_id in enumerate(participant_ids)
+            ],
+        )
+        for dance_id, tabulation in zip(matrix.tour_ids.tolist(), result.dances)
+    ]
+    summary = [
+        SkatingSummaryRow(
+            participant_id=participant_id,
+            participant_name=names.get(participant_id, ""),
+            dance_places=result.dance_places[:, idx].tolist(),
+            total=result.totals[idx],
+            place=result.places[idx],
+            rule=result.rules[idx],
+        )
+        for idx, participant_id in enumerate(participant_ids)
+    ]
+    return SkatingSheet(
+        round_id=round_id,
+        dances=dances,
+        summary=sorted(summary, key=lambda row: (row.place, row.participant_id)),
+    )
+
+
+@router.get("/{round_id}/final-places", response_model=List[FinalPlaceRead])
+async def get_final_places(round_id: int, db: AsyncSession = Depends(get_db)):
+    stmt = (
+        select(
+            models.FinalPlace.participant_id,
+            models.Participant.first_name,
+            models.Participant.last_name,
+            models.FinalPlace.place,
+            models.FinalPlace.sum_places,
+        )
+        .join(models.Participant, models.Participant.id == models.FinalPlace.participant_id)
+        .filter(models.FinalPlace.round_id == round_id)
+        .order_by(models.FinalPlace.place, models.FinalPlace.participant_id)
+    )
+    result = await db.execute(stmt)
+    return [
+        FinalPlaceRead(
+            participant_id=participant_id,
+            participant_name=f"{first_name} {last_name}",
+            place=place,
+            sum_places=sum_places,
+        )
+        for participant_id, first_name, last_name, place, sum_places in result.all()
+    ]
+
+
 @router.post("/{round_id}/distribute", response_model=HeatDistributionResponse)
 async def distribute_heats(round_id: int, payload: HeatDistributionRequest, db: AsyncSession = Depends(get_db)):
-    heats_created = await heats_service.distribute_heats(
-        db, round_id=round_id, max_in_heat=payload.max_in_heat
+    heat_ids = await heats_service.distribute_heats(
+        db,
+        round_id=round_id,
+        max_in_heat=payload.max_in_heat,
+        strategy=payload.strategy,
+        seed_round_id=payload.seed_round_id,
     )
-    return HeatDistributionResponse(round_id=round_id, heats_created=heats_created)
+    return HeatDistributionResponse(round_id=round_id, heats_created=len(heat_ids), heat_ids=heat_ids)
 
 
 @router.get("/{round_id}/heats", response_model=List[HeatRead])
+@query_budget(2)
 async def get_heats(round_id: int, db: AsyncSession = Depends(get_db)):
-    heats = await heats_service.get_heats_with_participants(db, round_id=round_id)
-    return [build_heat_response(heat) for heat in heats]
+    return json_response(dumps(await reads.round_heats(db, round_id)))
 
 
 @router.post("/{round_id}/heats", response_model=HeatRead)
+@query_budget(11)
 async def create_manual_heat(
     round_id: int,
     payload: ManualHeatCreate,
@@ -112,6 +232,7 @@ async def create_manual_heat(
     for participant_id in payload.participant_ids:
         db.add(models.HeatParticipant(heat_id=heat.id, participant_id=participant_id))
     await db.commit()
+    await snapshots.versions.bump(db, round_obj.event_id)
 
     stmt_heat = (
         select(models.Heat)
@@ -158,6 +279,7 @@ async def update_manual_heat(
     for participant_id in payload.participant_ids:
         db.add(models.HeatParticipant(heat_id=heat_id, participant_id=participant_id))
     await db.commit()
+    await snapshots.versions.bump(db, round_obj.event_id)
 
     stmt_heat = (
         select(models.Heat)
@@ -172,11 +294,13 @@ async def update_manual_heat(
 async def delete_heat(round_id: int, heat_id: int, db: AsyncSession = Depends(get_db)):
     stmt = (
         select(models.Heat)
-        .options(selectinload(models.Heat.participants))
+        .options(selectinload(models.Heat.participants), selectinload(models.Heat.round))
         .filter(models.Heat.id == heat_id, models.Heat.round_id == round_id)
     )
     heat = (await db.execute(stmt)).scalar_one_or_none()
     if heat is None:
         raise HTTPException(status_code=404, detail="Заход не найден")
+    event_id = heat.round.event_id
     await db.delete(heat)
     await db.commit()
+    await snapshots.versions.bump(db, event_id)
@@ -3,16 +3,21 @@ from typing import List
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .. import crud
+from .. import crud, reads
 from ..database import get_db
+from ..query_budget import query_budget
 from ..schemas import ScoreCreate, ScoreRead
+from ..serialization import dumps, json_response
+from ..services import events
+from ..services.results import leaderboards
 
 router = APIRouter(prefix="/scores", tags=["scores"])
 
 
 @router.post("", response_model=ScoreRead)
+@query_budget(8)
 async def create_score(payload: ScoreCreate, db: AsyncSession = Depends(get_db)):
-    score = await crud.upsert_score(
+    score, version = await crud.upsert_score(
         db,
         participant_id=payload.participant_id,
         judge_id=payload.judge_id,
@@ -21,10 +26,12 @@ async def create_score(payload: ScoreCreate, db: AsyncSession = Depends(get_db))
         criterion_id=payload.criterion_id,
         value=payload.score,
     )
+    changes = await leaderboards.record(db, payload.round_id, version, [score])
+    events.publish_scores([score], changes)
     return ScoreRead.from_orm(score)
 
 
 @router.get("/heats/{heat_id}", response_model=List[ScoreRead])
+@query_budget(2)
 async def get_scores_for_heat(heat_id: int, db: AsyncSession = Depends(get_db)):
-    scores = await crud.get_scores_by_heat(db, heat_id=heat_id)
-    return [ScoreRead.from_orm(score) for score in scores]
+    return json_response(dumps(await reads.heat_scores(db, heat_id)))
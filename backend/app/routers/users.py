@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import crud
 from ..database import get_db
+from ..pagination import LIST_RESPONSES, CursorQuery, FieldsQuery, LimitQuery, page_response, parse_fields
 from ..schemas import UserCreate, UserRead
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -23,10 +24,14 @@ async def create_user(payload: UserCreate, db: AsyncSession = Depends(get_db)):
     return UserRead.from_orm(user)
 
 
-@router.get("", response_model=List[UserRead])
-async def list_users(db: AsyncSession = Depends(get_db)):
-    users = await crud.get_users(db)
-    return [UserRead.from_orm(user) for user in users]
+@router.get("", response_model=List[UserRead], responses=LIST_RESPONSES)
+async def list_users(
+    limit: int | None = LimitQuery,
+    cursor: str | None = CursorQuery,
+    fields: str | None = FieldsQuery,
+    db: AsyncSession = Depends(get_db),
+):
+    return page_response(await crud.get_users(db, parse_fields(fields, crud.USER_COLUMNS), cursor, limit))
 
 
 @router.get("/me", response_model=UserRead)
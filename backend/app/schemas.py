@@ -1,4 +1,5 @@
-from typing import Dict, List, Optional, Literal
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Literal
 
 from pydantic import BaseModel, Field
 
@@ -8,6 +9,54 @@ class HealthResponse(BaseModel):
     version: str = "1.0.0"
 
 
+class CacheStatsRead(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+    class Config:
+        from_attributes = True
+
+
+class ReportRendererStatsRead(BaseModel):
+    workers: int
+    queue_limit: int
+    queue_depth: int
+    rendered: int
+    cache_hits: int
+    deduplicated: int
+    rejected: int
+    failed: int
+
+    class Config:
+        from_attributes = True
+
+
+class DurationStatsRead(BaseModel):
+    count: int
+    total_seconds: float
+    max_seconds: float
+
+    class Config:
+        from_attributes = True
+
+
+class DatabasePoolStats(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    connects: int
+    invalidations: int
+    timeouts: int
+    checkout_wait: DurationStatsRead
+    connection_hold: DurationStatsRead
+    session_lifetime: DurationStatsRead
+
+
 class UserBase(BaseModel):
     first_name: str
     last_name: str
@@ -95,6 +144,20 @@ class ParticipantRead(BaseModel):
         from_attributes = True
 
 
+class ParticipantImportError(BaseModel):
+    row: int
+    message: str
+
+
+class ParticipantImportReport(BaseModel):
+    total_rows: int
+    imported: int
+    error_count: int
+    errors: List[ParticipantImportError] = Field(default_factory=list)
+    # Ids of the imported participants in file order; empty when nothing was imported.
+    participant_ids: List[int] = Field(default_factory=list)
+
+
 class RoundCreate(BaseModel):
     event_id: int
     category_id: int
@@ -130,6 +193,17 @@ class ScoreRead(ScoreCreate):
         from_attributes = True
 
 
+class ScoreSheetEntry(BaseModel):
+    participant_id: int
+    criterion_id: int
+    score: float
+
+
+class ScoreSheetCreate(BaseModel):
+    judge_id: int
+    scores: List[ScoreSheetEntry] = Field(..., min_length=1)
+
+
 class HeatParticipantRead(BaseModel):
     participant_id: int
     participant_name: str
@@ -152,14 +226,40 @@ class HeatDetailRead(HeatRead):
     criteria: List[CriterionRead] = Field(default_factory=list)
 
 
+class DashboardRound(BaseModel):
+    id: int
+    category_id: int
+    round_type: str
+    stage_format: Optional[str] = None
+    heats: List[HeatRead] = Field(default_factory=list)
+
+
+class DashboardCompetition(BaseModel):
+    id: int
+    title: str
+    date: Optional[str] = None
+    location: Optional[str] = None
+    rounds: List[DashboardRound] = Field(default_factory=list)
+
+
+class JudgeDashboard(BaseModel):
+    judge_id: int
+    competitions: List[DashboardCompetition] = Field(default_factory=list)
+
+
 class HeatDistributionRequest(BaseModel):
     max_in_heat: int = Field(..., gt=0)
+    strategy: Optional[Literal["balanced", "paired", "snake"]] = Field(
+        None, description="По умолчанию paired для заходов по двое, иначе balanced"
+    )
+    seed_round_id: Optional[int] = Field(None, description="Раунд, по местам которого посеять участников (snake)")
 
 
 class HeatDistributionResponse(BaseModel):
     status: str = "ok"
     round_id: int
     heats_created: int
+    heat_ids: List[int] = Field(default_factory=list)
 
 
 class HeatStatusUpdate(BaseModel):
@@ -175,20 +275,135 @@ class ManualHeatCreate(BaseModel):
     participant_ids: List[int] = Field(..., min_length=1)
 
 
+class CriterionResult(BaseModel):
+    criterion_id: Optional[int]
+    criterion_name: Optional[str]
+    total_score: float
+    average_score: float
+
+
 class ResultRow(BaseModel):
     participant_id: int
     participant_name: str
     total_score: float
+    average_score: float = 0.0
     placement: int
+    criteria: List[CriterionResult] = Field(default_factory=list)
 
 
 class CategoryRoundResult(BaseModel):
+    round_id: int
     category_id: int
     category_name: str
     round: str
     scores: List[ResultRow]
 
 
+class FinalPlacesRequest(BaseModel):
+    tie_breaks: List[Literal["last_tour", "penalty", "head_judge"]] = Field(
+        default_factory=lambda: ["last_tour", "penalty", "head_judge"],
+        description="Порядок тай-брейков при равной сумме мест",
+    )
+    penalty_from: Optional[int] = Field(None, gt=0, description="Место, начиная с которого оценка считается штрафной")
+    head_judge_order: List[int] = Field(default_factory=list, description="Решение главного судьи: id участников по порядку")
+
+
+class FinalPlaceRead(BaseModel):
+    participant_id: int
+    participant_name: str
+    place: int
+    sum_places: float
+    last_tour_places: Optional[float] = None
+    penalty_places: Optional[int] = None
+
+
+class SkatingDanceRow(BaseModel):
+    participant_id: int
+    marks: List[int]
+    counts: List[int] = Field(..., description="Число оценок «1», «1-2», … «1-N»")
+    sums: List[int] = Field(..., description="Сумма этих оценок для тех же колонок")
+    place: float
+
+
+class SkatingDanceSheet(BaseModel):
+    dance_id: int
+    dance_name: Optional[str] = None
+    judge_ids: List[int]
+    rows: List[SkatingDanceRow]
+
+
+class SkatingSummaryRow(BaseModel):
+    participant_id: int
+    participant_name: str
+    dance_places: List[float]
+    total: float
+    place: float
+    rule: Optional[str] = Field(None, description="Правило скейтинга, разрешившее равенство (10 или 11)")
+
+
+class SkatingSheet(BaseModel):
+    round_id: int
+    dances: List[SkatingDanceSheet]
+    summary: List[SkatingSummaryRow]
+
+
+class SnapshotCategory(CategoryRead):
+    participants: List[ParticipantRead] = Field(default_factory=list)
+
+
+class SnapshotRound(RoundRead):
+    heats: List[HeatRead] = Field(default_factory=list)
+
+
+class CompetitionSnapshot(BaseModel):
+    id: int
+    title: str
+    date: Optional[str] = None
+    location: Optional[str] = None
+    version: int
+    categories: List[SnapshotCategory] = Field(default_factory=list)
+    rounds: List[SnapshotRound] = Field(default_factory=list)
+
+
+JobType = Literal["distribute_heats", "final_places", "results_report"]
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+class JobCreate(BaseModel):
+    type: JobType
+    params: Dict[str, Any] = Field(default_factory=dict, description="Параметры задачи, как в синхронном эндпоинте")
+
+
+class DistributeHeatsJobParams(HeatDistributionRequest):
+    round_id: int
+
+
+class FinalPlacesJobParams(FinalPlacesRequest):
+    round_id: int
+
+
+class ResultsReportJobParams(BaseModel):
+    event_id: int
+    format: Literal["html", "xlsx"] = "html"
+
+
+class JobRead(BaseModel):
+    id: int
+    type: str
+    status: JobStatus
+    event_id: Optional[int] = None
+    params: Dict[str, Any]
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class ExportLink(BaseModel):
     xls_url: str
     pdf_url: str
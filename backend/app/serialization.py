@@ -0,0 +1,28 @@
+"""Fast response path: plain dicts built from row tuples, encoded with orjson.
+
+A route that returns a :class:`fastapi.Response` skips ``response_model``
+validation and serialization. Routes keep ``response_model`` for the OpenAPI
+schema and return :func:`json_response` with bytes from :func:`dumps`. Rows come
+from column selects in the key order of the schema (see ``crud.*_COLUMNS``), so
+the body matches what ``model_dump_json`` would produce byte for byte.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi import Response
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content)
+
+
+def json_response(body: bytes, status_code: int = 200, headers: dict[str, str] | None = None) -> Response:
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def as_dicts(rows: Iterable[Sequence], keys: Sequence[str]) -> list[dict]:
+    """Rows of a column select as dicts keyed in schema order."""
+    return [dict(zip(keys, row)) for row in rows]
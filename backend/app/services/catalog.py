@@ -0,0 +1,100 @@
+"""Read-through cache of serialized competition trees (events → categories → criteria).
+
+Payloads are stored as ready JSON bytes under keys like ``("competition", 7)`` and
+evicted least-recently-used. Writers call the ``invalidate_*`` helpers after commit;
+a load that raced with an invalidation is returned but not stored. Invalidation only
+reaches the worker that handled the write, so entries also expire after
+``COMPETITION_CACHE_TTL`` seconds: with several workers, a write shows up everywhere
+within that time.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable
+
+from ..config import settings
+
+COMPETITION_LIST = ("competitions",)
+
+
+def competition_key(event_id: int) -> tuple:
+    return ("competition", event_id)
+
+
+def participants_key(event_id: int) -> tuple:
+    return ("participants", event_id)
+
+
+@dataclass
+class CacheStats:
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+
+class PayloadCache:
+    """Process-local LRU of serialized payloads with a TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._generation = 0
+        # key -> (expiry on the monotonic clock, body)
+        self._entries: OrderedDict[Hashable, tuple[float, bytes]] = OrderedDict()
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[bytes]]) -> bytes:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        generation = self._generation
+        body = await load()
+        if generation == self._generation:
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return body
+
+    def invalidate(self, *keys: Hashable) -> None:
+        self._generation += 1
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            maxsize=self.maxsize,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            invalidations=self.invalidations,
+        )
+
+
+competition_cache = PayloadCache(settings.competition_cache_size, settings.competition_cache_ttl)
+
+
+def invalidate_competition(event_id: int) -> None:
+    """Drop the event's tree and the competition list after an event/category/criteria write."""
+    competition_cache.invalidate(competition_key(event_id), COMPETITION_LIST)
+
+
+def invalidate_participants(event_id: int) -> None:
+    """Drop the event's participant list after a participant write."""
+    competition_cache.invalidate(participants_key(event_id))
@@ -0,0 +1,278 @@
+"""Publish/subscribe hub for live updates (SSE and WebSocket).
+
+Subscribers live in the API worker that holds their connection. Events are fanned
+out locally at once and relayed to the other workers through PostgreSQL
+``LISTEN``/``NOTIFY`` by :class:`EventBridge`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Iterable
+from uuid import uuid4
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from .. import models
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "battle_events"
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes and more.
+NOTIFY_PAYLOAD_LIMIT = 7900
+RECONNECT_SECONDS = 2.0
+
+
+def competition_topic(event_id: int) -> str:
+    return f"competition:{event_id}"
+
+
+def round_topic(round_id: int) -> str:
+    return f"round:{round_id}"
+
+
+def heat_topic(heat_id: int) -> str:
+    return f"heat:{heat_id}"
+
+
+def job_topic(job_id: int) -> str:
+    return f"job:{job_id}"
+
+
+class Event:
+    """A published event, serialized once and shared by every subscriber."""
+
+    __slots__ = ("type", "data", "sse")
+
+    def __init__(self, event_type: str, payload: dict) -> None:
+        self.type = event_type
+        self.data = json.dumps({"type": event_type, **payload}, separators=(",", ":"), ensure_ascii=False)
+        self.sse = f"event: {event_type}\ndata: {self.data}\n\n".encode()
+
+
+class Subscription:
+    """A subscriber's bounded queue; ``None`` in the queue means it was dropped."""
+
+    __slots__ = ("topics", "queue", "dropped")
+
+    def __init__(self, topics: frozenset[str], queue_size: int) -> None:
+        self.topics = topics
+        self.queue: asyncio.Queue[Event | None] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+
+class EventHub:
+    """Fan-out of delta events to subscribers of competition/round/heat topics.
+
+    Publishing never blocks: a subscriber whose queue is full is treated as a slow
+    consumer, dropped and sent an end-of-stream marker so the client reconnects and
+    reloads its state.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._topics: dict[str, set[Subscription]] = {}
+        self.published = 0
+        self.dropped = 0
+        self.bridge: EventBridge | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len({subscription for subs in self._topics.values() for subscription in subs})
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(frozenset(topics), self.queue_size)
+        for topic in subscription.topics:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for topic in subscription.topics:
+            subs = self._topics.get(topic)
+            if subs is None:
+                continue
+            subs.discard(subscription)
+            if not subs:
+                del self._topics[topic]
+
+    def publish(self, topics: Iterable[str], event_type: str, payload: dict) -> None:
+        topics = list(topics)
+        self.fan_out(topics, event_type, payload)
+        if self.bridge is not None:
+            self.bridge.forward(topics, event_type, payload)
+
+    def fan_out(self, topics: Iterable[str], event_type: str, payload: dict) -> None:
+        """Deliver an event to this worker's subscribers only."""
+        targets: set[Subscription] = set()
+        for topic in topics:
+            targets.update(self._topics.get(topic, ()))
+        if not targets:
+            return
+
+        event = Event(event_type, payload)
+        self.published += 1
+        for subscription in targets:
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def drop_topics(self, topics: Iterable[str] | None = None) -> None:
+        """Drop the subscribers of ``topics`` (all of them for ``None``) so their clients reload."""
+        if topics is None:
+            topics = list(self._topics)
+        targets = {subscription for topic in topics for subscription in self._topics.get(topic, ())}
+        for subscription in targets:
+            self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        self.dropped += 1
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+
+class EventBridge:
+    """Relays hub events between API workers through PostgreSQL ``LISTEN``/``NOTIFY``.
+
+    Each worker sends its events with ``pg_notify`` on one dedicated connection and
+    fans out the events of the other workers to its own subscribers. An event too
+    large for a notification is relayed as a bare list of topics, and the remote
+    subscribers of those topics are dropped so their clients reload. When the
+    connection is lost, the worker's own subscribers are dropped on reconnect
+    for the same reason, since events may have been missed in between.
+    """
+
+    def __init__(self, event_hub: EventHub) -> None:
+        self._hub = event_hub
+        self._origin = uuid4().hex
+        self._connection: asyncpg.Connection | None = None
+        self._outbox: asyncio.Queue[str] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._hub.bridge = self
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._hub.bridge = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def forward(self, topics: list[str], event_type: str, payload: dict) -> None:
+        if self._connection is None:
+            return
+        message = json.dumps({"o": self._origin, "t": topics, "e": event_type, "p": payload}, separators=(",", ":"))
+        if len(message.encode()) > NOTIFY_PAYLOAD_LIMIT:
+            message = json.dumps({"o": self._origin, "t": topics, "e": None}, separators=(",", ":"))
+        self._outbox.put_nowait(message)
+
+    async def _run(self) -> None:
+        reconnect = False
+        while True:
+            try:
+                await self._serve(reconnect)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event bridge connection failed")
+            reconnect = True
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def _serve(self, reconnect: bool) -> None:
+        connection = await asyncpg.connect(**_listen_connect_args())
+        try:
+            await connection.add_listener(NOTIFY_CHANNEL, self._received)
+            if reconnect:
+                self._hub.drop_topics()
+            self._connection = connection
+            while True:
+                try:
+                    message = await asyncio.wait_for(self._outbox.get(), timeout=settings.events_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    await connection.execute("SELECT 1")  # notices a dead connection while idle
+                    continue
+                await connection.execute("SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, message)
+        finally:
+            self._connection = None
+            while not self._outbox.empty():
+                self._outbox.get_nowait()
+            await connection.close(timeout=5)
+
+    def _received(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        message = json.loads(payload)
+        if message["o"] == self._origin:
+            return
+        if message["e"] is None:
+            self._hub.drop_topics(message["t"])
+        else:
+            self._hub.fan_out(message["t"], message["e"], message["p"])
+
+
+def _listen_connect_args() -> dict:
+    """``asyncpg.connect`` arguments parsed the way the engine parses its URL (``?host=`` sockets, ``ssl``)."""
+    url = make_url(settings.events_database_url or str(settings.database_url)).set(drivername="postgresql+asyncpg")
+    _, params = url.get_dialect()().create_connect_args(url)
+    return params
+
+
+hub = EventHub(queue_size=settings.events_queue_size)
+bridge = EventBridge(hub)
+
+
+def publish_heat_status(heat: models.Heat) -> None:
+    hub.publish(
+        [competition_topic(heat.round.event_id), round_topic(heat.round_id), heat_topic(heat.id)],
+        "heat_status",
+        {"heat_id": heat.id, "round_id": heat.round_id, "status": heat.status},
+    )
+
+
+def publish_scores(scores: Iterable[models.Score], changes: Iterable[tuple[int, int, list]]) -> None:
+    """Publish stored scores and the leaderboard rows they moved.
+
+    Scores are sent as ``[judge_id, participant_id, criterion_id, score]`` and moved
+    rows as ``[participant_id, placement, total]`` to keep the frames small.
+    """
+    by_heat: dict[tuple[int, int | None], list[list]] = {}
+    for score in scores:
+        by_heat.setdefault((score.round_id, score.heat_id), []).append(
+            [score.judge_id, score.participant_id, score.criterion_id, score.score]
+        )
+    for board_round_id, event_id, moved in changes:
+        topics = [competition_topic(event_id), round_topic(board_round_id)]
+        for (round_id, heat_id), rows in by_heat.items():
+            if round_id != board_round_id:
+                continue
+            hub.publish(
+                topics + ([heat_topic(heat_id)] if heat_id is not None else []),
+                "score_stored",
+                {"round_id": round_id, "heat_id": heat_id, "scores": rows},
+            )
+        if moved:
+            hub.publish(
+                topics,
+                "leaderboard",
+                {"round_id": board_round_id, "rows": [list(row) for row in moved]},
+            )
+
+
+def publish_job(job_id: int, event_id: int | None, job_type: str, status: str) -> None:
+    hub.publish(
+        [job_topic(job_id)] + ([competition_topic(event_id)] if event_id is not None else []),
+        "job",
+        {"job_id": job_id, "job_type": job_type, "status": status},
+    )
@@ -0,0 +1,222 @@
+"""Final places for pro/master finals (ТЗ §4.3) computed over a NumPy place matrix."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..schemas import FinalPlaceRead
+from . import skating
+
+TIE_BREAKS = ("last_tour", "penalty", "head_judge")
+SKATING = "skating"
+
+
+def ranking_mode(stage_format: str | None) -> str:
+    """Ranking mode of a round: ``skating`` when its stage format says so, otherwise the sum of places."""
+    return SKATING if (stage_format or "").strip().lower() == SKATING else "sum"
+
+
+@dataclass
+class PlaceMatrix:
+    """Judge places of a final round.
+
+    ``places[t, j, p]`` is the place judge ``judge_ids[j]`` gave participant
+    ``participant_ids[p]`` in tour ``t``; missing marks are ``NaN``. Tours are the
+    category criteria in id order (marks without a criterion belong to tour 1).
+    """
+
+    participant_ids: np.ndarray
+    judge_ids: np.ndarray
+    tour_ids: np.ndarray
+    places: np.ndarray
+
+    @classmethod
+    def from_rows(
+        cls,
+        participant_ids: np.ndarray,
+        judge_ids: np.ndarray,
+        tour_ids: np.ndarray,
+        values: np.ndarray,
+    ) -> "PlaceMatrix":
+        participants, p_idx = np.unique(participant_ids, return_inverse=True)
+        judges, j_idx = np.unique(judge_ids, return_inverse=True)
+        tours, t_idx = np.unique(tour_ids, return_inverse=True)
+        places = np.full((len(tours), len(judges), len(participants)), np.nan)
+        places[t_idx, j_idx, p_idx] = values
+        return cls(participant_ids=participants, judge_ids=judges, tour_ids=tours, places=places)
+
+
+@dataclass
+class FinalRanking:
+    participant_ids: np.ndarray
+    places: np.ndarray
+    sum_places: np.ndarray
+    last_tour_places: np.ndarray | None = None
+    penalty_places: np.ndarray | None = None
+
+
+async def load_place_matrix(db: AsyncSession, round_id: int) -> PlaceMatrix:
+    """Load every judge place of the round with one projected query."""
+    result = await db.execute(
+        select(models.Score.participant_id, models.Score.judge_id, models.Score.criterion_id, models.Score.score).filter(
+            models.Score.round_id == round_id
+        )
+    )
+    rows = result.all()
+    if not rows:
+        raise HTTPException(status_code=400, detail="В раунде нет оценок судей")
+    participant_ids, judge_ids, criterion_ids, values = zip(*rows)
+    return PlaceMatrix.from_rows(
+        np.fromiter(participant_ids, dtype=np.int64, count=len(rows)),
+        np.fromiter(judge_ids, dtype=np.int64, count=len(rows)),
+        np.fromiter((criterion_id or 0 for criterion_id in criterion_ids), dtype=np.int64, count=len(rows)),
+        np.fromiter(values, dtype=np.float64, count=len(rows)),
+    )
+
+
+def rank_final(
+    matrix: PlaceMatrix,
+    tie_breaks: Sequence[str] = TIE_BREAKS,
+    penalty_from: int | None = None,
+    head_judge_order: Sequence[int] = (),
+) -> FinalRanking:
+    """Rank by the lowest sum of places over all judges and tours.
+
+    Ties are broken by ``tie_breaks`` in order: ``last_tour`` (lower sum of places
+    in the last tour), ``penalty`` (fewer marks at or below ``penalty_from``, by
+    default the lower half of the final) and ``head_judge`` (position in
+    ``head_judge_order``). Participants still equal on every key share a place.
+    Every judge must have placed every participant in every tour.
+    """
+    places = validated_places(matrix, "Для суммы мест нужны места всех судей во всех турах")
+    participant_count = places.shape[2]
+    sum_places = places.sum(axis=(0, 1), dtype=np.float64)
+    last_tour_places = places[-1].sum(axis=0, dtype=np.float64)
+    if penalty_from is None:
+        penalty_from = participant_count // 2 + 1
+    penalty_places = (places >= penalty_from).sum(axis=(0, 1))
+
+    head_rank = np.full(participant_count, len(head_judge_order), dtype=np.int64)
+    if head_judge_order:
+        order = np.asarray(head_judge_order, dtype=np.int64)
+        positions = np.searchsorted(matrix.participant_ids, order)
+        positions = np.clip(positions, 0, participant_count - 1)
+        known = matrix.participant_ids[positions] == order
+        head_rank[positions[known]] = np.flatnonzero(known)
+
+    tie_keys = {"last_tour": last_tour_places, "penalty": penalty_places, "head_judge": head_rank}
+    keys = [sum_places] + [tie_keys[name] for name in tie_breaks]
+    # np.lexsort sorts by the last key first.
+    order = np.lexsort(keys[::-1])
+
+    sorted_keys = np.stack([np.asarray(key, dtype=np.float64)[order] for key in keys])
+    new_group = np.ones(participant_count, dtype=bool)
+    new_group[1:] = np.any(sorted_keys[:, 1:] != sorted_keys[:, :-1], axis=0)
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(participant_count), 0))
+    final_places = np.empty(participant_count, dtype=np.int64)
+    final_places[order] = group_start + 1
+
+    return FinalRanking(
+        participant_ids=matrix.participant_ids,
+        places=final_places,
+        sum_places=sum_places,
+        last_tour_places=last_tour_places,
+        penalty_places=penalty_places,
+    )
+
+
+def validated_places(matrix: PlaceMatrix, incomplete_detail: str) -> np.ndarray:
+    """The matrix as integer places, or 400 when a mark is missing or not a place from 1 to the number of couples."""
+    places = matrix.places
+    if np.isnan(places).any():
+        raise HTTPException(status_code=400, detail=incomplete_detail)
+    if (places != np.floor(places)).any() or places.min() < 1 or places.max() > places.shape[2]:
+        raise HTTPException(status_code=400, detail="Места должны быть целыми числами от 1 до числа пар")
+    return places.astype(np.int64)
+
+
+def skate_matrix(matrix: PlaceMatrix) -> skating.SkatingResult:
+    """Run the skating system with every tour of the matrix treated as a dance."""
+    marks = validated_places(matrix, "Для системы скейтинг нужны места всех судей во всех танцах")
+    return skating.skate_final(marks)
+
+
+def rank_skating(matrix: PlaceMatrix) -> FinalRanking:
+    result = skate_matrix(matrix)
+    return FinalRanking(
+        participant_ids=matrix.participant_ids,
+        places=skating.competition_places(result.places),
+        sum_places=result.totals,
+    )
+
+
+async def save_final_places(db: AsyncSession, round_id: int, ranking: FinalRanking) -> None:
+    """Replace the round's ``final_places`` with one multi-row INSERT."""
+    await db.execute(delete(models.FinalPlace).where(models.FinalPlace.round_id == round_id))
+    await db.execute(
+        pg_insert(models.FinalPlace).values(
+            [
+                {"round_id": round_id, "participant_id": participant_id, "place": place, "sum_places": sum_places}
+                for participant_id, place, sum_places in zip(
+                    ranking.participant_ids.tolist(), ranking.places.tolist(), ranking.sum_places.tolist()
+                )
+            ]
+        )
+    )
+    await db.commit()
+
+
+async def calculate_final_places(
+    db: AsyncSession,
+    round_obj: models.Round,
+    tie_breaks: Sequence[str] = TIE_BREAKS,
+    penalty_from: int | None = None,
+    head_judge_order: Sequence[int] = (),
+) -> FinalRanking:
+    round_id = round_obj.id
+    matrix = await load_place_matrix(db, round_id)
+    if ranking_mode(round_obj.stage_format) == SKATING:
+        ranking = rank_skating(matrix)
+    else:
+        ranking = rank_final(matrix, tie_breaks, penalty_from, head_judge_order)
+    await save_final_places(db, round_id, ranking)
+    return ranking
+
+
+async def load_participant_names(db: AsyncSession, participant_ids: list[int]) -> dict[int, str]:
+    result = await db.execute(
+        select(models.Participant.id, models.Participant.first_name, models.Participant.last_name).filter(
+            models.Participant.id.in_(participant_ids)
+        )
+    )
+    return {participant_id: f"{first_name} {last_name}" for participant_id, first_name, last_name in result.all()}
+
+
+async def final_place_rows(db: AsyncSession, ranking: FinalRanking) -> list[FinalPlaceRead]:
+    """The ranking as response rows with participant names, ordered by place."""
+    participant_ids = ranking.participant_ids.tolist()
+    names = await load_participant_names(db, participant_ids)
+    last_tour_places = ranking.last_tour_places.tolist() if ranking.last_tour_places is not None else None
+    penalty_places = ranking.penalty_places.tolist() if ranking.penalty_places is not None else None
+    rows = [
+        FinalPlaceRead(
+            participant_id=participant_id,
+            participant_name=names.get(participant_id, ""),
+            place=place,
+            sum_places=sum_places,
+            last_tour_places=last_tour_places[idx] if last_tour_places is not None else None,
+            penalty_places=penalty_places[idx] if penalty_places is not None else None,
+        )
+        for idx, (participant_id, place, sum_places) in enumerate(
+            zip(participant_ids, ranking.places.tolist(), ranking.sum_places.tolist())
+        )
+    ]
+    return sorted(rows, key=lambda row: (row.place, row.participant_id))
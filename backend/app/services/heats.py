@@ -1,69 +1,150 @@
 import math
 
-from sqlalchemy import delete, select
+import numpy as np
+from sqlalchemy import delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from .. import crud, models
 from ..crud import get_or_404
-from .. import models
+from . import notifications, snapshots
+from .results import leaderboards
 
 
-async def distribute_heats(db: AsyncSession, round_id: int, max_in_heat: int) -> int:
-    """Rebuilds heats for the requested round with a maximum size."""
+def split_balanced(ids: np.ndarray, max_in_heat: int) -> list[np.ndarray]:
+    """Split into the fewest heats whose sizes differ by at most one (30 / 8 → 8, 8, 7, 7)."""
+    heat_count = math.ceil(len(ids) / max_in_heat)
+    return np.array_split(ids, heat_count)
+
+
+def plan_balanced(ids: np.ndarray, max_in_heat: int) -> list[np.ndarray]:
+    return split_balanced(ids, max_in_heat)
+
+
+def plan_paired(ids: np.ndarray, genders: np.ndarray, max_in_heat: int) -> list[np.ndarray]:
+    """Keep male/female couples together and spread whole couples evenly over the heats.
+
+    Couples are formed in id order; unmatched dancers are paired among themselves.
+    A couple does not fit a heat of one, so ``max_in_heat < 2`` falls back to
+    :func:`plan_balanced`.
+    """
+    if max_in_heat < 2:
+        return plan_balanced(ids, max_in_heat)
+    male = ids[genders == "male"]
+    female = ids[genders == "female"]
+    others = ids[(genders != "male") & (genders != "female")]
+    couples = min(len(male), len(female))
+    paired = np.column_stack([male[:couples], female[:couples]]).ravel()
+    rest = np.concatenate([male[couples:], female[couples:], others])
+    ordered = np.concatenate([paired, rest]).astype(ids.dtype)
+
+    unit_count = math.ceil(len(ordered) / 2)
+    units_per_heat = max_in_heat // 2
+    heat_count = math.ceil(unit_count / units_per_heat)
+    unit_bounds = np.cumsum([len(chunk) for chunk in np.array_split(np.arange(unit_count), heat_count)])
+    return np.split(ordered, np.minimum(unit_bounds[:-1] * 2, len(ordered)))
+
+
+def plan_snake(seeded_ids: np.ndarray, max_in_heat: int) -> list[np.ndarray]:
+    """Deal participants in seed order across heats as a snake (1→N, N→1, ...)."""
+    heat_count = math.ceil(len(seeded_ids) / max_in_heat)
+    positions = np.arange(len(seeded_ids))
+    row, column = np.divmod(positions, heat_count)
+    heat_index = np.where(row % 2 == 0, column, heat_count - 1 - column)
+    order = np.argsort(heat_index, kind="stable")
+    bounds = np.searchsorted(heat_index[order], np.arange(1, heat_count))
+    return np.split(seeded_ids[order], bounds)
+
+
+async def seed_order(db: AsyncSession, ids: np.ndarray, numbers: np.ndarray, seed_round_id: int | None) -> np.ndarray:
+    """Participants ordered by placement in ``seed_round_id`` (if given), then by start number."""
+    placement = np.full(len(ids), np.iinfo(np.int64).max)
+    if seed_round_id is not None:
+        board = await leaderboards.get(db, seed_round_id)
+        places = board.placements()
+        placement = np.fromiter((places.get(pid, placement[0]) for pid in ids.tolist()), dtype=np.int64, count=len(ids))
+    return ids[np.lexsort((ids, numbers, placement))]
+
+
+async def distribute_heats(
+    db: AsyncSession,
+    round_id: int,
+    max_in_heat: int,
+    strategy: str | None = None,
+    seed_round_id: int | None = None,
+) -> list[int]:
+    """Rebuilds heats for the requested round with a maximum size and returns the new heat ids in heat order.
+
+    ``strategy`` is ``balanced`` (the default), ``paired`` (the default for heats of
+    two) or ``snake``. Heats and heat participants are written with one multi-row
+    INSERT each.
+    """
 
     stmt_round = select(models.Round).filter(models.Round.id == round_id)
     round_obj = await get_or_404(db, stmt_round, "Round not found")
 
     stmt_participants = (
-        select(models.Participant)
+        select(models.Participant.id, models.Participant.gender, models.Participant.number)
         .filter(models.Participant.category_id == round_obj.category_id)
         .order_by(models.Participant.id)
     )
-    result = await db.execute(stmt_participants)
-    participants = result.scalars().all()
-    if not participants:
-        return 0
-
-    if max_in_heat == 2:
-        male = [participant for participant in participants if participant.gender == "male"]
-        female = [participant for participant in participants if participant.gender == "female"]
-        others = [participant for participant in participants if participant.gender not in {"male", "female"}]
-
-        paired: list[models.Participant] = []
-        for man, woman in zip(male, female):
-            paired.extend([man, woman])
+    rows = (await db.execute(stmt_participants)).all()
+    if not rows:
+        return []
 
-        leftovers = male[len(female):] if len(male) > len(female) else female[len(male):]
-        participants = paired + leftovers + others
-
-    heat_count = math.ceil(len(participants) / max_in_heat)
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    if strategy is None:
+        strategy = "paired" if max_in_heat == 2 else "balanced"
+    if strategy == "paired":
+        genders = np.array([row[1] or "" for row in rows], dtype=object)
+        plan = plan_paired(ids, genders, max_in_heat)
+    elif strategy == "snake":
+        numbers = np.fromiter(
+            (row[2] if row[2] is not None else np.iinfo(np.int64).max for row in rows), dtype=np.int64, count=len(rows)
+        )
+        plan = plan_snake(await seed_order(db, ids, numbers, seed_round_id), max_in_heat)
+    else:
+        plan = plan_balanced(ids, max_in_heat)
 
     heat_ids_stmt = select(models.Heat.id).filter(models.Heat.round_id == round_id)
     await db.execute(delete(models.HeatParticipant).where(models.HeatParticipant.heat_id.in_(heat_ids_stmt)))
     await db.execute(delete(models.Heat).where(models.Heat.round_id == round_id))
 
-    for idx in range(heat_count):
-        status = "in_progress" if idx == 0 else "waiting"
-        heat = models.Heat(round_id=round_id, heat_number=idx + 1, status=status)
-        db.add(heat)
-        await db.flush()
-        start = idx * max_in_heat
-        end = min(start + max_in_heat, len(participants))
-        for participant in participants[start:end]:
-            db.add(models.HeatParticipant(heat_id=heat.id, participant_id=participant.id))
+    heat_result = await db.execute(
+        insert(models.Heat)
+        .values(
+            [
+                {"round_id": round_id, "heat_number": idx + 1, "status": "in_progress" if idx == 0 else "waiting"}
+                for idx in range(len(plan))
+            ]
+        )
+        .returning(models.Heat.heat_number, models.Heat.id)
+    )
+    heat_ids = dict(heat_result.all())
+    await db.execute(
+        insert(models.HeatParticipant).values(
+            [
+                {"heat_id": heat_ids[idx + 1], "participant_id": participant_id}
+                for idx, heat in enumerate(plan)
+                for participant_id in heat.tolist()
+            ]
+        )
+    )
 
     await db.commit()
-    return heat_count
+    await snapshots.versions.bump(db, round_obj.event_id)
+    return [heat_ids[number] for number in sorted(heat_ids)]
 
 
-async def get_heats_with_participants(db: AsyncSession, round_id: int) -> list[models.Heat]:
-    stmt = (
-        select(models.Heat)
-        .options(
-            selectinload(models.Heat.participants).selectinload(models.HeatParticipant.participant)
-        )
-        .filter(models.Heat.round_id == round_id)
-        .order_by(models.Heat.heat_number)
+async def update_heat_status(db: AsyncSession, heat_id: int, status: str) -> models.Heat:
+    """Set a heat's status; finishing it queues the Telegram notice in the same transaction."""
+    heat = await crud.get_heat_with_round(db, heat_id)
+    finished_now = status == "finished" and heat.status != "finished"
+    heat.status = status
+    if finished_now:
+        await notifications.enqueue_heat_finished(db, heat)
+    await db.commit()
+    await db.refresh(
+        heat,
+        attribute_names=["round"],
     )
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    return heat
@@ -0,0 +1,347 @@
+"""Background jobs for long admin operations: heat distribution, final places, result sheets.
+
+A job is a row in ``jobs``. ``POST /jobs`` inserts it, wakes the local
+:class:`JobRunner` and returns at once. The client then polls ``GET /jobs/{id}``
+or listens for ``job`` events on ``/events/stream?job_id=``. Runners claim
+queued rows with ``FOR UPDATE SKIP LOCKED`` and a lease that they renew while
+the job runs. Several API workers can therefore share the queue, and a job
+whose worker died is picked up again once its lease expires, at most
+``JOB_MAX_ATTEMPTS`` times. Each job type has its own concurrency limit per
+worker, and every job runs in its own session. A resubmission with the same
+``Idempotency-Key`` returns the existing job instead of queueing another one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from .. import crud, models
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..schemas import (
+    DistributeHeatsJobParams,
+    FinalPlacesJobParams,
+    HeatDistributionResponse,
+    ResultsReportJobParams,
+)
+from . import final_places as final_places_service
+from . import heats as heats_service
+from . import reports
+from .events import publish_job
+
+logger = logging.getLogger(__name__)
+
+JOB_LEASE = timedelta(seconds=60)
+FINISHED = ("succeeded", "failed", "cancelled")
+
+
+async def _distribute_heats(db: AsyncSession, params: DistributeHeatsJobParams) -> dict:
+    heat_ids = await heats_service.distribute_heats(
+        db,
+        round_id=params.round_id,
+        max_in_heat=params.max_in_heat,
+        strategy=params.strategy,
+        seed_round_id=params.seed_round_id,
+    )
+    return HeatDistributionResponse(round_id=params.round_id, heats_created=len(heat_ids), heat_ids=heat_ids).model_dump()
+
+
+async def _final_places(db: AsyncSession, params: FinalPlacesJobParams) -> list[dict]:
+    round_obj = await crud.get_round(db, round_id=params.round_id)
+    ranking = await final_places_service.calculate_final_places(
+        db,
+        round_obj,
+        tie_breaks=params.tie_breaks,
+        penalty_from=params.penalty_from,
+        head_judge_order=params.head_judge_order,
+    )
+    return [row.model_dump() for row in await final_places_service.final_place_rows(db, ranking)]
+
+
+async def _results_report(db: AsyncSession, params: ResultsReportJobParams) -> dict:
+    await reports.renderer.get(params.event_id, params.format)
+    return {"url": f"/export/competition/{params.event_id}/results?format={params.format}"}
+
+
+@dataclass(frozen=True)
+class JobType:
+    params: type[BaseModel]
+    handler: Callable[[AsyncSession, Any], Awaitable[Any]]
+    concurrency: int
+
+
+JOB_TYPES: dict[str, JobType] = {
+    "distribute_heats": JobType(DistributeHeatsJobParams, _distribute_heats, settings.job_concurrency),
+    "final_places": JobType(FinalPlacesJobParams, _final_places, settings.job_concurrency),
+    # Rendering is bounded by the report process pool anyway.
+    "results_report": JobType(ResultsReportJobParams, _results_report, settings.report_workers),
+}
+
+
+async def _job_event_id(db: AsyncSession, params: BaseModel) -> int:
+    if isinstance(params, ResultsReportJobParams):
+        event_id = await db.scalar(select(models.Event.id).filter(models.Event.id == params.event_id))
+        if event_id is None:
+            raise HTTPException(status_code=404, detail="Competition not found")
+        return event_id
+    event_id = await db.scalar(select(models.Round.event_id).filter(models.Round.id == params.round_id))
+    if event_id is None:
+        raise HTTPException(status_code=404, detail="Round not found")
+    return event_id
+
+
+async def submit_job(db: AsyncSession, job_type: str, raw_params: dict, idempotency_key: str | None) -> models.Job:
+    """Queue a job, or return the job already queued under ``idempotency_key``."""
+    try:
+        params = JOB_TYPES[job_type].params.model_validate(raw_params)
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors(include_url=False))
+    stored = params.model_dump(mode="json")
+    event_id = await _job_event_id(db, params)
+
+    job = await db.scalar(
+        pg_insert(models.Job)
+        .values(type=job_type, event_id=event_id, params=stored, idempotency_key=idempotency_key)
+        .on_conflict_do_nothing(index_elements=["type", "idempotency_key"])
+        .returning(models.Job)
+    )
+    if job is None:
+        job = await db.scalar(
+            select(models.Job).filter(models.Job.type == job_type, models.Job.idempotency_key == idempotency_key)
+        )
+        if job.params != stored:
+            raise HTTPException(status_code=409, detail="Ключ идемпотентности уже использован с другими параметрами")
+        return job
+    await db.commit()
+    publish_job(job.id, job.event_id, job.type, job.status)
+    runner.wake()
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: int) -> models.Job:
+    job = await db.get(models.Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return job
+
+
+async def cancel_job(db: AsyncSession, job_id: int) -> models.Job:
+    """Cancel a queued job at once; a running one is cancelled by the worker that runs it."""
+    job = await get_job(db, job_id)
+    if job.status in FINISHED:
+        raise HTTPException(status_code=409, detail="Задача уже завершена")
+    dequeued = await db.execute(
+        update(models.Job)
+        .where(models.Job.id == job_id, models.Job.status == "queued")
+        .values(status="cancelled", finished_at=func.now())
+    )
+    if not dequeued.rowcount:
+        await db.execute(update(models.Job).where(models.Job.id == job_id).values(cancel_requested=True))
+    await db.commit()
+    if dequeued.rowcount:
+        publish_job(job.id, job.event_id, job.type, "cancelled")
+    else:
+        # Runs here: cancel now. Runs in another worker: its next heartbeat sees the flag.
+        runner.cancel_local(job_id)
+    await db.refresh(job)
+    return job
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    type: str
+    event_id: int | None
+    params: dict
+    attempts: int
+    cancel_requested: bool
+
+
+class JobRunner:
+    """Claims due jobs and runs each one as a task on the event loop.
+
+    Every poll renews the leases of the jobs running here and picks up
+    cancellations requested through another worker. On shutdown the running
+    jobs are cancelled and handed back to the queue.
+    """
+
+    def __init__(self, session_factory: sessionmaker = AsyncSessionLocal) -> None:
+        self._session_factory = session_factory
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._running: dict[int, tuple[ClaimedJob, asyncio.Task]] = {}
+        self._cancelled: set[int] = set()
+
+    def running(self, job_type: str) -> int:
+        return sum(1 for job, _ in self._running.values() if job.type == job_type)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        tasks = [task for _, task in self._running.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def wake(self) -> None:
+        """Claim now instead of waiting for the next poll."""
+        self._wake.set()
+
+    def cancel_local(self, job_id: int) -> bool:
+        running = self._running.get(job_id)
+        if running is None:
+            return False
+        self._cancelled.add(job_id)
+        running[1].cancel()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.heartbeat()
+                claimed = await self.claim_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job queue poll failed")
+                claimed = 0
+            if claimed:
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.job_poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def heartbeat(self) -> None:
+        if not self._running:
+            return
+        job = models.Job
+        async with self._session_factory() as db:
+            rows = (
+                await db.execute(
+                    update(job)
+                    .where(job.id.in_(list(self._running)), job.status == "running")
+                    .values(lease_until=datetime.now(timezone.utc) + JOB_LEASE)
+                    .returning(job.id, job.cancel_requested)
+                )
+            ).all()
+            await db.commit()
+        for job_id, cancel_requested in rows:
+            if cancel_requested:
+                self.cancel_local(job_id)
+
+    async def claim_once(self) -> int:
+        """Claim due jobs up to the free slots of each type and start them."""
+        job = models.Job
+        now = datetime.now(timezone.utc)
+        claimed: list[ClaimedJob] = []
+        async with self._session_factory() as db:
+            for job_type, kind in JOB_TYPES.items():
+                free = kind.concurrency - self.running(job_type)
+                if free <= 0:
+                    continue
+                due = (
+                    select(job.id)
+                    .filter(
+                        job.type == job_type,
+                        or_(job.status == "queued", and_(job.status == "running", job.lease_until < now)),
+                    )
+                    .order_by(job.id)
+                    .limit(free)
+                    .with_for_update(skip_locked=True)
+                )
+                claim = (
+                    update(job)
+                    .where(job.id.in_(due.scalar_subquery()))
+                    .values(status="running", started_at=now, lease_until=now + JOB_LEASE, attempts=job.attempts + 1)
+                    .returning(job.id, job.type, job.event_id, job.params, job.attempts, job.cancel_requested)
+                )
+                claimed += [ClaimedJob(*row) for row in (await db.execute(claim)).all()]
+            await db.commit()
+
+        for item in claimed:
+            if item.cancel_requested:
+                await self._finish(item, "cancelled")
+            elif item.attempts > settings.job_max_attempts:
+                await self._finish(item, "failed", error="Задача прервана: превышено число попыток")
+            else:
+                task = asyncio.create_task(self._execute(item))
+                task.add_done_callback(lambda _, job_id=item.id: self._done(job_id))
+                self._running[item.id] = (item, task)
+        return len(claimed)
+
+    async def _execute(self, item: ClaimedJob) -> None:
+        kind = JOB_TYPES[item.type]
+        publish_job(item.id, item.event_id, item.type, "running")
+        try:
+            async with self._session_factory() as db:
+                result = await kind.handler(db, kind.params.model_validate(item.params))
+        except asyncio.CancelledError:
+            if item.id not in self._cancelled:
+                await self._release(item)  # shutdown: another worker (or the next start) runs it
+                raise
+            await self._finish(item, "cancelled")
+        except HTTPException as exc:
+            await self._finish(item, "failed", error=str(exc.detail))
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", item.id, item.type)
+            await self._finish(item, "failed", error=f"{type(exc).__name__}: {exc}")
+        else:
+            await self._finish(item, "succeeded", result=result)
+
+    def _done(self, job_id: int) -> None:
+        # A callback rather than ``finally``: a task cancelled before its first step never runs its body.
+        # Such a job keeps status "running" until its lease expires and the next claim finishes it.
+        self._running.pop(job_id, None)
+        self._cancelled.discard(job_id)
+        self.wake()
+
+    async def _finish(self, item: ClaimedJob, status: str, result: Any = None, error: str | None = None) -> None:
+        async with self._session_factory() as db:
+            await db.execute(
+                update(models.Job)
+                .where(models.Job.id == item.id, models.Job.status == "running")
+                .values(
+                    status=status,
+                    result=result,
+                    error=error[:255] if error else None,
+                    lease_until=None,
+                    finished_at=func.now(),
+                )
+            )
+            await db.commit()
+        publish_job(item.id, item.event_id, item.type, status)
+
+    async def _release(self, item: ClaimedJob) -> None:
+        async with self._session_factory() as db:
+            await db.execute(
+                update(models.Job)
+                .where(models.Job.id == item.id, models.Job.status == "running")
+                .values(status="queued", lease_until=None, attempts=models.Job.attempts - 1)
+            )
+            await db.commit()
+
+
+runner = JobRunner()
@@ -1,27 +1,32 @@
-"""Notification helpers (Telegram, etc.)."""
+"""Notification helpers (Telegram, etc.).
+
+Messages are written to ``notification_outbox`` in the same transaction as the
+change that triggers them and delivered afterwards by :class:`NotificationWorker`.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
 import httpx
-from sqlalchemy import select
+from sqlalchemy import insert, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
 from .. import models
 from ..config import settings
+from ..database import AsyncSessionLocal
 
+logger = logging.getLogger(__name__)
 
-async def notify_heat_finished(db: AsyncSession, heat: models.Heat) -> None:
-    """Broadcast a Telegram notification when a heat is finished."""
-
-    if not settings.telegram_bot_token:
-        return
+MAX_BACKOFF_SECONDS = 300.0
+CLAIM_LEASE = timedelta(seconds=60)
 
-    stmt = select(models.User.telegram_id).filter(models.User.telegram_id.is_not(None))
-    result = await db.execute(stmt)
-    chat_ids: list[int] = [telegram_id for (telegram_id,) in result.all() if telegram_id]
-    if not chat_ids:
-        return
 
+def build_heat_finished_message(heat: models.Heat) -> str:
     round_obj = heat.round
     event = round_obj.event if round_obj else None
     category = round_obj.category if round_obj else None
@@ -34,10 +39,221 @@ async def notify_heat_finished(db: AsyncSession, heat: models.Heat) -> None:
     message = " ".join(part for part in message_parts if part).strip()
     if settings.admin_link_base:
         message = f"{message}\nПодробнее: {settings.admin_link_base}"
+    return message
+
+
+async def enqueue_heat_finished(db: AsyncSession, heat: models.Heat) -> None:
+    """Queue a "heat finished" message for every user with a Telegram ID.
+
+    Runs a single ``INSERT ... SELECT`` and does not commit: the rows become visible
+    together with the caller's status change.
+    """
+
+    if not settings.telegram_bot_token:
+        return
+
+    message = build_heat_finished_message(heat)
+    recipients = select(models.User.telegram_id, literal(message)).filter(models.User.telegram_id.is_not(None))
+    await db.execute(
+        insert(models.NotificationOutbox).from_select(
+            [models.NotificationOutbox.chat_id, models.NotificationOutbox.text], recipients
+        )
+    )
+
+
+class RateLimiter:
+    """Spaces acquisitions so that at most ``rate`` happen per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def idle(self) -> bool:
+        """No acquisition is spacing out the next one any more."""
+        return self._next_slot <= asyncio.get_running_loop().time()
+
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for chat_id in chat_ids:
-            await client.post(
-                f"https://api.telegram.org/bot{settings.telegram_bot_token}/sendMessage",
-                json={"chat_id": chat_id, "text": message},
+@dataclass
+class Delivery:
+    id: int
+    chat_id: int
+    text: str
+    attempts: int
+
+
+class NotificationWorker:
+    """Drains ``notification_outbox`` in the background.
+
+    Due rows are claimed in batches with ``FOR UPDATE SKIP LOCKED`` and a lease that
+    is renewed while the batch is being sent, so several API workers can run side by
+    side and a crashed worker's rows are picked up again once the lease expires.
+    Messages are sent through one pooled HTTP client with bounded concurrency,
+    Telegram's global and per-chat rate limits and exponential backoff (or
+    ``retry_after``) on 429, 5xx and network errors.
+    """
+
+    def __init__(self, session_factory: sessionmaker = AsyncSessionLocal) -> None:
+        self._session_factory = session_factory
+        self._client: httpx.AsyncClient | None = None
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(settings.notify_concurrency)
+        self._global_limit = RateLimiter(settings.notify_global_rate)
+        self._chat_limits: dict[int, RateLimiter] = {}
+
+    async def start(self) -> None:
+        if not settings.telegram_bot_token or self._task is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=settings.telegram_api_base,
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=settings.notify_concurrency,
+                max_keepalive_connections=settings.notify_concurrency,
+            ),
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def wake(self) -> None:
+        """Start draining now instead of waiting for the next poll."""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification outbox drain failed")
+                claimed = 0
+            if claimed:
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.notify_poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain_once(self) -> int:
+        """Claim one batch of due messages, send them and record the outcome."""
+        outbox = models.NotificationOutbox
+        async with self._session_factory() as db:
+            due = (
+                select(outbox.id)
+                .filter(outbox.status == "pending", outbox.next_attempt_at <= datetime.now(timezone.utc))
+                .order_by(outbox.id)
+                .limit(settings.notify_batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            claim = (
+                update(outbox)
+                .where(outbox.id.in_(due.scalar_subquery()))
+                .values(next_attempt_at=datetime.now(timezone.utc) + CLAIM_LEASE)
+                .returning(outbox.id, outbox.chat_id, outbox.text, outbox.attempts)
             )
+            rows = (await db.execute(claim)).all()
+            await db.commit()
+        if not rows:
+            return 0
+
+        deliveries = [Delivery(*row) for row in rows]
+        lease = asyncio.create_task(self._renew_lease([delivery.id for delivery in deliveries]))
+        try:
+            outcomes = await asyncio.gather(*(self._deliver(delivery) for delivery in deliveries))
+        finally:
+            lease.cancel()
+        async with self._session_factory() as db:
+            await db.execute(update(outbox), outcomes)
+            await db.commit()
+        # Nothing is being sent now; drop the limiters of chats that have no pending slot.
+        self._chat_limits = {chat_id: limit for chat_id, limit in self._chat_limits.items() if not limit.idle()}
+        return len(rows)
+
+    async def _renew_lease(self, ids: list[int]) -> None:
+        """Keep the batch claimed while it is being sent, so a slow batch is not claimed and sent again."""
+        outbox = models.NotificationOutbox
+        while True:
+            await asyncio.sleep(CLAIM_LEASE.total_seconds() / 3)
+            try:
+                async with self._session_factory() as db:
+                    await db.execute(
+                        update(outbox)
+                        .where(outbox.id.in_(ids), outbox.status == "pending")
+                        .values(next_attempt_at=datetime.now(timezone.utc) + CLAIM_LEASE)
+                    )
+                    await db.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification lease renewal failed")
+
+    async def _deliver(self, delivery: Delivery) -> dict:
+        chat_limit = self._chat_limits.get(delivery.chat_id)
+        if chat_limit is None:
+            chat_rate = 1.0 / settings.notify_chat_interval if settings.notify_chat_interval > 0 else 0.0
+            chat_limit = self._chat_limits[delivery.chat_id] = RateLimiter(chat_rate)
+        await chat_limit.acquire()
+
+        async with self._semaphore:
+            await self._global_limit.acquire()
+            try:
+                response = await self._client.post(
+                    f"/bot{settings.telegram_bot_token}/sendMessage",
+                    json={"chat_id": delivery.chat_id, "text": delivery.text},
+                )
+            except httpx.HTTPError as exc:
+                return self._retry(delivery, None, f"{type(exc).__name__}: {exc}")
+
+        if response.status_code == 200:
+            return self._outcome(delivery, "sent", None)
+        error = f"HTTP {response.status_code}: {response.text[:200]}"
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.json().get("parameters", {}).get("retry_after"))
+            except (TypeError, ValueError):
+                retry_after = None
+            return self._retry(delivery, retry_after, error)
+        if response.status_code >= 500:
+            return self._retry(delivery, None, error)
+        # 400/403 (chat not found, bot blocked) will not succeed on retry.
+        return self._outcome(delivery, "failed", error)
+
+    def _retry(self, delivery: Delivery, retry_after: float | None, error: str) -> dict:
+        attempts = delivery.attempts + 1
+        if attempts >= settings.notify_max_attempts:
+            return self._outcome(delivery, "failed", error)
+        delay = retry_after if retry_after is not None else min(2.0**attempts, MAX_BACKOFF_SECONDS)
+        return self._outcome(delivery, "pending", error, delay)
+
+    @staticmethod
+    def _outcome(delivery: Delivery, status: str, error: str | None, delay: float = 0.0) -> dict:
+        return {
+            "id": delivery.id,
+            "status": status,
+            "attempts": delivery.attempts + 1,
+            "last_error": error[:255] if error else None,
+            "next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=delay),
+        }
+
+
+worker = NotificationWorker()
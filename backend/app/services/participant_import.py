@@ -0,0 +1,277 @@
+"""Bulk participant import from an uploaded CSV or XLSX entry list.
+
+The file is read row by row: ``csv`` over the spooled upload, or openpyxl in
+read-only mode. Rows are validated in chunks of :data:`CHUNK_SIZE`. Each chunk
+checks the name, gender and category against the event's categories, and checks
+start numbers against the file and, in one query, against the participants
+already stored for the event. Reading and validating a chunk is CPU-bound, so it
+runs in a worker thread and only the queries run on the event loop. Valid rows
+go into the open transaction with one multi-row ``INSERT`` per chunk, which
+returns the new ids in file order. The import is all-or-nothing: if any row is
+invalid, the transaction is rolled back and only the error report is returned.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import csv
+from itertools import islice
+from typing import IO, Iterable, Iterator
+
+from fastapi import HTTPException
+from openpyxl import load_workbook
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..schemas import ParticipantImportError, ParticipantImportReport
+
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 500
+
+# Accepted header names (lower-case) for each field.
+COLUMNS = {
+    "full_name": ("full_name", "фио", "участник"),
+    "first_name": ("first_name", "имя"),
+    "last_name": ("last_name", "фамилия"),
+    "number": ("number", "номер"),
+    "gender": ("gender", "пол"),
+    "category": ("category", "категория"),
+    "category_id": ("category_id",),
+    "role": ("role", "роль"),
+}
+GENDERS = {
+    "male": "male",
+    "m": "male",
+    "м": "male",
+    "муж": "male",
+    "female": "female",
+    "f": "female",
+    "ж": "female",
+    "жен": "female",
+}
+
+
+def split_full_name(full_name: str) -> tuple[str, str] | None:
+    """``("Анна Мария", "Иванова")`` from ``"Анна Мария Иванова"``; ``None`` without a last name."""
+    parts = full_name.strip().split()
+    if len(parts) < 2:
+        return None
+    return " ".join(parts[:-1]), parts[-1]
+
+
+def _header_map(header: Iterable) -> dict[str, int]:
+    aliases = {alias: field for field, names in COLUMNS.items() for alias in names}
+    positions = {}
+    for idx, title in enumerate(header):
+        field = aliases.get(str(title or "").strip().lower())
+        if field and field not in positions:
+            positions[field] = idx
+    if "full_name" not in positions and not {"first_name", "last_name"} <= positions.keys():
+        raise HTTPException(status_code=400, detail="Нужна колонка full_name (или first_name и last_name)")
+    if "gender" not in positions:
+        raise HTTPException(status_code=400, detail="Нужна колонка gender")
+    if "category" not in positions and "category_id" not in positions:
+        raise HTTPException(status_code=400, detail="Нужна колонка category или category_id")
+    return positions
+
+
+def _records(rows: Iterator[tuple], first_row: int) -> Iterator[tuple[int, dict]]:
+    """``(row number, {field: value})`` for every non-empty row after the header."""
+    header = next(rows, None)
+    if header is None:
+        raise HTTPException(status_code=400, detail="Файл пуст")
+    positions = _header_map(header)
+    for row_number, row in enumerate(rows, start=first_row + 1):
+        if not any(value not in (None, "") for value in row):
+            continue
+        yield row_number, {field: row[idx] if idx < len(row) else None for field, idx in positions.items()}
+
+
+def _csv_rows(stream: IO[bytes]) -> Iterator[tuple]:
+    text = codecs.getreader("utf-8-sig")(stream)
+    try:
+        sample = text.readline()
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield tuple(next(csv.reader([sample], dialect), ()))
+        for row in csv.reader(text, dialect):
+            yield tuple(row)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV-файл должен быть в кодировке UTF-8")
+
+
+def _xlsx_rows(stream: IO[bytes]) -> Iterator[tuple]:
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Не удалось прочитать XLSX-файл")
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_records(stream: IO[bytes], filename: str) -> Iterator[tuple[int, dict]]:
+    """Rows of an uploaded entry list; the format is chosen by the file extension."""
+    name = filename.lower()
+    if name.endswith(".xlsx"):
+        return _records(_xlsx_rows(stream), first_row=1)
+    if name.endswith((".csv", ".txt")):
+        return _records(_csv_rows(stream), first_row=1)
+    raise HTTPException(status_code=400, detail="Поддерживаются файлы .csv и .xlsx")
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _validate(
+    fields: dict, categories_by_name: dict[str, int], category_ids: set[int]
+) -> tuple[dict | None, list[str]]:
+    problems = []
+    if "full_name" in fields:
+        names = split_full_name(_text(fields["full_name"]))
+    else:
+        first_name, last_name = _text(fields.get("first_name")), _text(fields.get("last_name"))
+        names = (first_name, last_name) if first_name and last_name else None
+    if names is None:
+        problems.append("Укажите имя и фамилию")
+
+    number = None
+    raw_number = _text(fields.get("number"))
+    if raw_number:
+        if raw_number.isdigit():
+            number = int(raw_number)
+        else:
+            problems.append(f"Некорректный номер: {raw_number}")
+
+    gender = GENDERS.get(_text(fields.get("gender")).lower())
+    if gender is None:
+        problems.append(f"Некорректный пол: {_text(fields.get('gender')) or 'не указан'}")
+
+    category_id = None
+    raw_category_id = _text(fields.get("category_id"))
+    if raw_category_id:
+        if raw_category_id.isdigit() and int(raw_category_id) in category_ids:
+            category_id = int(raw_category_id)
+    else:
+        category_id = categories_by_name.get(_text(fields.get("category")).lower())
+    if category_id is None:
+        problems.append(f"Категория не найдена: {raw_category_id or _text(fields.get('category')) or 'не указана'}")
+
+    if problems:
+        return None, problems
+    return {
+        "category_id": category_id,
+        "first_name": names[0],
+        "last_name": names[1],
+        "number": number,
+        "role": _text(fields.get("role")) or None,
+        "gender": gender,
+    }, []
+
+
+def _validate_chunk(
+    records: Iterator[tuple[int, dict]],
+    categories_by_name: dict[str, int],
+    category_ids: set[int],
+    seen_numbers: dict[int, int],
+) -> tuple[int, list[tuple[int, dict]], list[tuple[int, str]]]:
+    """Read the next chunk; return its size, the valid rows and ``(row number, problem)`` pairs."""
+    chunk = list(islice(records, CHUNK_SIZE))
+    valid: list[tuple[int, dict]] = []
+    problems: list[tuple[int, str]] = []
+    for row_number, fields in chunk:
+        values, row_problems = _validate(fields, categories_by_name, category_ids)
+        problems.extend((row_number, problem) for problem in row_problems)
+        if values is None:
+            continue
+        number = values["number"]
+        if number is not None:
+            if number in seen_numbers:
+                problems.append((row_number, f"Номер {number} уже указан в строке {seen_numbers[number]}"))
+                continue
+            seen_numbers[number] = row_number
+        valid.append((row_number, values))
+    return len(chunk), valid, problems
+
+
+async def import_participants(
+    db: AsyncSession, event_id: int, records: Iterator[tuple[int, dict]]
+) -> ParticipantImportReport:
+    """Validate and insert ``records`` in one transaction; nothing is stored if any row is invalid."""
+    category_rows = await db.execute(
+        select(models.Category.id, models.Category.name).filter(models.Category.event_id == event_id)
+    )
+    categories_by_name = {}
+    category_ids = set()
+    for category_id, name in category_rows:
+        categories_by_name[name.strip().lower()] = category_id
+        category_ids.add(category_id)
+    if not category_ids:
+        raise HTTPException(status_code=404, detail="У соревнования нет категорий")
+
+    seen_numbers: dict[int, int] = {}
+    errors: list[ParticipantImportError] = []
+    error_count = total = 0
+    participant_ids: list[int] = []
+
+    def report(row_number: int, message: str) -> None:
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(ParticipantImportError(row=row_number, message=message))
+
+    while True:
+        size, valid, problems = await asyncio.to_thread(
+            _validate_chunk, records, categories_by_name, category_ids, seen_numbers
+        )
+        if not size:
+            break
+        total += size
+        for row_number, problem in problems:
+            report(row_number, problem)
+
+        numbers = [values["number"] for _, values in valid if values["number"] is not None]
+        taken = set()
+        if numbers:
+            taken = set(
+                (
+                    await db.execute(
+                        select(models.Participant.number).filter(
+                            models.Participant.event_id == event_id, models.Participant.number.in_(numbers)
+                        )
+                    )
+                ).scalars()
+            )
+        rows = []
+        for row_number, values in valid:
+            if values["number"] in taken:
+                report(row_number, f"Номер {values['number']} уже занят в соревновании")
+                continue
+            rows.append({"event_id": event_id, **values})
+
+        if rows and not error_count:
+            stmt = insert(models.Participant).returning(models.Participant.id, sort_by_parameter_order=True)
+            participant_ids.extend((await db.scalars(stmt, rows)).all())
+
+    if error_count or not participant_ids:
+        await db.rollback()
+        participant_ids = []
+    else:
+        await db.commit()
+    return ParticipantImportReport(
+        total_rows=total,
+        imported=len(participant_ids),
+        error_count=error_count,
+        errors=errors,
+        participant_ids=participant_ids,
+    )
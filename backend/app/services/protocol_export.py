@@ -0,0 +1,276 @@
+"""Competition protocol export (ТЗ §14.8) streamed as CSV or XLSX.
+
+The protocol has three sections: every judge mark by heat, per-criterion totals
+per participant and round, and final places. Each section is read through a
+server-side cursor in partitions of :data:`PARTITION_SIZE` rows. Each partition
+is encoded and handed to the ``StreamingResponse`` before the next one is
+fetched, so memory stays flat and the first bytes go out while the cursor is
+still open.
+
+XLSX is written by hand as a zip stream with inline-string cells: the
+workbook, relationships and content types are static, and each section is one
+worksheet entry. ``zipfile`` writes to an unseekable sink with data
+descriptors, so no temporary file is needed.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import zipfile
+from typing import AsyncIterator, Iterable, Sequence
+from xml.sax.saxutils import escape
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..database import AsyncSessionLocal
+
+PARTITION_SIZE = 1000
+
+
+def _name(model):
+    return model.first_name + " " + model.last_name
+
+
+def marks_statement(event_id: int) -> Select:
+    Score, Round, Category = models.Score, models.Round, models.Category
+    return (
+        select(
+            Category.name,
+            Round.round_type,
+            models.Heat.heat_number,
+            models.Participant.number,
+            _name(models.Participant),
+            _name(models.User),
+            models.Criterion.name,
+            Score.score,
+        )
+        .select_from(Score)
+        .join(Round, Round.id == Score.round_id)
+        .join(Category, Category.id == Round.category_id)
+        .join(models.Participant, models.Participant.id == Score.participant_id)
+        .join(models.User, models.User.id == Score.judge_id)
+        .outerjoin(models.Heat, models.Heat.id == Score.heat_id)
+        .outerjoin(models.Criterion, models.Criterion.id == Score.criterion_id)
+        .filter(Round.event_id == event_id)
+        .order_by(
+            Category.id,
+            Round.id,
+            models.Heat.heat_number,
+            models.Participant.number.asc().nullsfirst(),
+            Score.participant_id,
+            Score.judge_id,
+            Score.criterion_id,
+        )
+    )
+
+
+def totals_statement(event_id: int) -> Select:
+    Score, Round, Category = models.Score, models.Round, models.Category
+    return (
+        select(
+            Category.name,
+            Round.round_type,
+            models.Participant.number,
+            _name(models.Participant),
+            models.Criterion.name,
+            func.sum(Score.score),
+            func.avg(Score.score),
+            func.count(),
+        )
+        .select_from(Score)
+        .join(Round, Round.id == Score.round_id)
+        .join(Category, Category.id == Round.category_id)
+        .join(models.Participant, models.Participant.id == Score.participant_id)
+        .outerjoin(models.Criterion, models.Criterion.id == Score.criterion_id)
+        .filter(Round.event_id == event_id)
+        .group_by(
+            Category.id,
+            Category.name,
+            Round.id,
+            Round.round_type,
+            models.Participant.id,
+            models.Participant.number,
+            models.Participant.first_name,
+            models.Participant.last_name,
+            Score.criterion_id,
+            models.Criterion.name,
+        )
+        .order_by(Category.id, Round.id, models.Participant.number.asc().nullsfirst(), models.Participant.id, Score.criterion_id)
+    )
+
+
+def final_places_statement(event_id: int) -> Select:
+    FinalPlace, Round, Category = models.FinalPlace, models.Round, models.Category
+    return (
+        select(
+            Category.name,
+            Round.round_type,
+            FinalPlace.place,
+            models.Participant.number,
+            _name(models.Participant),
+            FinalPlace.sum_places,
+        )
+        .select_from(FinalPlace)
+        .join(Round, Round.id == FinalPlace.round_id)
+        .join(Category, Category.id == Round.category_id)
+        .join(models.Participant, models.Participant.id == FinalPlace.participant_id)
+        .filter(Round.event_id == event_id)
+        .order_by(Category.id, Round.id, FinalPlace.place, models.Participant.id)
+    )
+
+
+SECTIONS = (
+    ("Оценки", ("Категория", "Тур", "Заход", "Номер", "Участник", "Судья", "Критерий", "Оценка"), marks_statement),
+    ("Итоги по критериям", ("Категория", "Тур", "Номер", "Участник", "Критерий", "Сумма", "Среднее", "Оценок"), totals_statement),
+    ("Места", ("Категория", "Тур", "Место", "Номер", "Участник", "Сумма мест"), final_places_statement),
+)
+
+
+async def _partitions(session: AsyncSession, stmt: Select) -> AsyncIterator[Sequence[Sequence]]:
+    result = await session.stream(stmt.execution_options(yield_per=PARTITION_SIZE))
+    async for partition in result.partitions():
+        yield partition
+
+
+async def event_exists(db: AsyncSession, event_id: int) -> bool:
+    return await db.scalar(select(models.Event.id).filter(models.Event.id == event_id)) is not None
+
+
+async def csv_chunks(event_id: int) -> AsyncIterator[bytes]:
+    """The sections one after another, each with its title and header row, separated by a blank line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")  # BOM, so Excel opens the file as UTF-8
+    async with AsyncSessionLocal() as session:
+        for idx, (title, header, statement) in enumerate(SECTIONS):
+            if idx:
+                writer.writerow(())
+            writer.writerow((title,))
+            writer.writerow(header)
+            async for rows in _partitions(session, statement(event_id)):
+                writer.writerows(rows)
+                yield _drain_text(buffer)
+    yield _drain_text(buffer)
+
+
+def _drain_text(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, unseekable target for ``zipfile``; written bytes are collected until drained."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    "{sheets}</Types>"
+)
+SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{number}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    "<sheets>{sheets}</sheets></workbook>"
+)
+WORKBOOK_SHEET = '<sheet name="{name}" sheetId="{number}" r:id="rId{number}"/>'
+WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    "{sheets}</Relationships>"
+)
+WORKBOOK_REL = (
+    '<Relationship Id="rId{number}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{number}.xml"/>'
+)
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = "</sheetData></worksheet>"
+
+
+def _xml_row(values: Iterable) -> str:
+    cells = []
+    for value in values:
+        if value is None:
+            cells.append("<c/>")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            cells.append(f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+    return "<row>" + "".join(cells) + "</row>"
+
+
+async def xlsx_chunks(event_id: int) -> AsyncIterator[bytes]:
+    """One worksheet per section, written into the zip stream as rows arrive."""
+    async for chunk in _xlsx_parts(event_id):
+        if chunk:  # the deflate stream holds small partitions back until it has a block
+            yield chunk
+
+
+async def _xlsx_parts(event_id: int) -> AsyncIterator[bytes]:
+    sink = _Sink()
+    numbers = range(1, len(SECTIONS) + 1)
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            "[Content_Types].xml", CONTENT_TYPES.format(sheets="".join(SHEET_CONTENT_TYPE.format(number=n) for n in numbers))
+        )
+        archive.writestr("_rels/.rels", ROOT_RELS)
+        archive.writestr(
+            "xl/workbook.xml",
+            WORKBOOK.format(
+                sheets="".join(
+                    WORKBOOK_SHEET.format(name=escape(title), number=n) for n, (title, _, _) in zip(numbers, SECTIONS)
+                )
+            ),
+        )
+        archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS.format(sheets="".join(WORKBOOK_REL.format(number=n) for n in numbers)))
+        yield sink.drain()
+
+        async with AsyncSessionLocal() as session:
+            for number, (_, header, statement) in zip(numbers, SECTIONS):
+                with archive.open(f"xl/worksheets/sheet{number}.xml", "w", force_zip64=True) as entry:
+                    entry.write((SHEET_START + _xml_row(header)).encode())
+                    async for rows in _partitions(session, statement(event_id)):
+                        entry.write("".join(_xml_row(row) for row in rows).encode())
+                        yield sink.drain()
+                    entry.write(SHEET_END.encode())
+                yield sink.drain()
+    yield sink.drain()
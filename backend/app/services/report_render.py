@@ -0,0 +1,166 @@
+"""Result sheet renderers that run in report worker processes.
+
+Everything here is plain data in and a file out: no database, settings or ORM
+imports. That way the spawned worker processes import only this module, and the
+arguments are cheap to pickle. :func:`render_report` writes the result to a
+temporary name and then renames it, so a half-written file is never served.
+"""
+
+from __future__ import annotations
+
+import html
+import os
+from dataclasses import dataclass
+from io import BytesIO
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font
+
+ROUND_TYPE_LABELS = {
+    "preliminary": "Отборочный",
+    "semifinal": "Полуфинал",
+    "final": "Финал",
+}
+
+
+@dataclass(frozen=True)
+class RoundReport:
+    category: str
+    round_type: str
+    stage_format: str | None
+    # (number, name, criterion or None, sum of marks), one row per participant and criterion.
+    scores: tuple[tuple, ...]
+    # (place, number, name, sum of places), ordered by place.
+    places: tuple[tuple, ...]
+
+    @property
+    def label(self) -> str:
+        base = ROUND_TYPE_LABELS.get(self.round_type, self.round_type)
+        return f"{base} · {self.stage_format}" if self.stage_format else base
+
+
+@dataclass(frozen=True)
+class ReportData:
+    title: str
+    date: str | None
+    location: str | None
+    rounds: tuple[RoundReport, ...]
+
+
+def score_table(round_: RoundReport) -> tuple[list[str], list[list]]:
+    """Header and rows ``[rank, number, name, per-criterion sums..., total]``, best total first."""
+    criteria: list[str] = []
+    participants: dict[tuple, dict] = {}
+    for number, name, criterion, total in round_.scores:
+        criterion = criterion or "—"
+        if criterion not in criteria:
+            criteria.append(criterion)
+        participants.setdefault((number, name), {})[criterion] = total
+
+    rows = []
+    for (number, name), sums in participants.items():
+        rows.append([None, number, name, *(sums.get(criterion) for criterion in criteria), sum(sums.values())])
+    rows.sort(key=lambda row: -row[-1])
+    for idx, row in enumerate(rows):
+        # Equal totals share the better place.
+        row[0] = rows[idx - 1][0] if idx and row[-1] == rows[idx - 1][-1] else idx + 1
+    return ["Место", "Номер", "Участник", *criteria, "Сумма"], rows
+
+
+PLACES_HEADER = ["Место", "Номер", "Участник", "Сумма мест"]
+
+
+def _subtitle(data: ReportData) -> str:
+    return " · ".join(part for part in (data.date, data.location) if part)
+
+
+def render_xlsx(data: ReportData) -> bytes:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Результаты"
+    sheet.append([data.title])
+    sheet["A1"].font = Font(bold=True, size=14)
+    sheet.append([_subtitle(data)])
+    widths: dict[int, int] = {}
+
+    def table(header: list[str], rows: list) -> None:
+        sheet.append(header)
+        for cell in sheet[sheet.max_row]:
+            cell.font = Font(bold=True)
+            cell.alignment = Alignment(horizontal="center")
+        for row in rows:
+            sheet.append([round(value, 2) if isinstance(value, float) else value for value in row])
+        for row in [header, *rows]:
+            for idx, value in enumerate(row, start=1):
+                widths[idx] = max(widths.get(idx, 0), len(str(value or "")))
+
+    for round_ in data.rounds:
+        sheet.append([])
+        sheet.append([f"{round_.category} — {round_.label}"])
+        sheet.cell(row=sheet.max_row, column=1).font = Font(bold=True, size=12)
+        if round_.places:
+            table(PLACES_HEADER, [list(row) for row in round_.places])
+            sheet.append([])
+        if round_.scores:
+            table(*score_table(round_))
+
+    for idx, width in widths.items():
+        sheet.column_dimensions[sheet.cell(row=1, column=idx).column_letter].width = min(width + 2, 40)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+HTML_STYLE = """
+body { font-family: "DejaVu Sans", Arial, sans-serif; font-size: 11pt; margin: 1.5cm; }
+h1 { font-size: 16pt; margin: 0; }
+h2 { font-size: 12pt; margin: 1.2em 0 0.4em; page-break-after: avoid; }
+table { border-collapse: collapse; margin-bottom: 0.8em; page-break-inside: avoid; }
+th, td { border: 1px solid #444; padding: 2px 6px; }
+th { background: #eee; }
+td.num { text-align: right; }
+@page { size: A4; margin: 1cm; }
+"""
+
+
+def _html_table(header: list[str], rows: list) -> str:
+    head = "".join(f"<th>{html.escape(title)}</th>" for title in header)
+    body = []
+    for row in rows:
+        cells = []
+        for value in row:
+            if isinstance(value, (int, float)):
+                text = f"{value:.2f}".rstrip("0").rstrip(".") if isinstance(value, float) else str(value)
+                cells.append(f'<td class="num">{text}</td>')
+            else:
+                cells.append(f"<td>{html.escape(str(value)) if value is not None else ''}</td>")
+        body.append("<tr>" + "".join(cells) + "</tr>")
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{''.join(body)}</tbody></table>"
+
+
+def render_html(data: ReportData) -> bytes:
+    """Printable result sheet; the browser's print dialog turns it into a PDF."""
+    parts = [
+        '<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8">',
+        f"<title>{html.escape(data.title)}</title><style>{HTML_STYLE}</style></head><body>",
+        f"<h1>{html.escape(data.title)}</h1><p>{html.escape(_subtitle(data))}</p>",
+    ]
+    for round_ in data.rounds:
+        parts.append(f"<h2>{html.escape(round_.category)} — {html.escape(round_.label)}</h2>")
+        if round_.places:
+            parts.append(_html_table(PLACES_HEADER, round_.places))
+        if round_.scores:
+            parts.append(_html_table(*score_table(round_)))
+    parts.append("</body></html>")
+    return "".join(parts).encode()
+
+
+RENDERERS = {"xlsx": render_xlsx, "html": render_html}
+
+
+def render_report(report_format: str, data: ReportData, path: str) -> None:
+    body = RENDERERS[report_format](data)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(body)
+    os.replace(temporary, path)
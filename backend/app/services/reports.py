@@ -0,0 +1,267 @@
+"""Result sheets rendered off the event loop, cached on disk per data fingerprint.
+
+The data for a report is gathered here in four aggregated queries and packed
+into the plain dataclasses of :mod:`.report_render`. Rendering happens in a
+bounded ``ProcessPoolExecutor``, so a large protocol never blocks judges'
+score submissions. The file name is a fingerprint of the data the sheet shows:
+the competition version (see :mod:`.snapshots`), which changes with the event
+tree, and aggregates of the event's scores and final places, which change with
+every mark and every recomputation. Once rendered, a report is served from disk
+until that fingerprint changes, on any worker. Superseded files are removed
+after :data:`STALE_REPORT_SECONDS`, so a file that is still being sent is not
+deleted from under its response. A request for a report that is already
+being rendered waits for that render instead of starting a second one. The
+number of renders in flight is capped, and it is exposed as the queue depth in
+``/health/reports`` and ``/metrics``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..config import settings
+from ..database import AsyncSessionLocal
+from .report_render import RENDERERS, ReportData, RoundReport, render_report
+
+REPORT_FORMATS = tuple(RENDERERS)
+STALE_REPORT_SECONDS = 300
+
+
+async def report_fingerprint(db: AsyncSession, event_id: int) -> str:
+    """Changes whenever the event tree, a score or the final places of the event change."""
+    scores = (
+        select(
+            func.count().label("score_count"),
+            func.sum(models.Score.score).label("score_sum"),
+            # Weighted by id, so corrections that cancel out in the plain sum still change it.
+            func.sum(models.Score.score * models.Score.id).label("score_weighted_sum"),
+        )
+        .join(models.Round, models.Round.id == models.Score.round_id)
+        .filter(models.Round.event_id == event_id)
+        .subquery()
+    )
+    places = (
+        select(
+            func.count().label("place_count"),
+            # Final places are deleted and re-inserted on every recomputation, so the last id moves.
+            func.max(models.FinalPlace.id).label("place_last_id"),
+        )
+        .join(models.Round, models.Round.id == models.FinalPlace.round_id)
+        .filter(models.Round.event_id == event_id)
+        .subquery()
+    )
+    row = (
+        await db.execute(
+            select(models.Event.version, scores, places)
+            .select_from(models.Event)
+            .join(scores, true())
+            .join(places, true())
+            .filter(models.Event.id == event_id)
+        )
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Competition not found")
+    return hashlib.sha1(repr(tuple(row)).encode()).hexdigest()[:16]
+
+
+async def collect_report_data(db: AsyncSession, event_id: int) -> ReportData:
+    event_row = (
+        await db.execute(
+            select(models.Event.title, models.Event.date, models.Event.location).filter(models.Event.id == event_id)
+        )
+    ).one_or_none()
+    if event_row is None:
+        raise HTTPException(status_code=404, detail="Competition not found")
+    title, event_date, location = event_row
+
+    round_rows = (
+        await db.execute(
+            select(models.Round.id, models.Category.name, models.Round.round_type, models.Round.stage_format)
+            .join(models.Category, models.Category.id == models.Round.category_id)
+            .filter(models.Round.event_id == event_id)
+            .order_by(models.Category.id, models.Round.id)
+        )
+    ).all()
+
+    scores: dict[int, list[tuple]] = {round_id: [] for round_id, *_ in round_rows}
+    score_rows = await db.execute(
+        select(
+            models.Score.round_id,
+            models.Participant.number,
+            models.Participant.first_name + " " + models.Participant.last_name,
+            models.Criterion.name,
+            func.sum(models.Score.score),
+        )
+        .join(models.Round, models.Round.id == models.Score.round_id)
+        .join(models.Participant, models.Participant.id == models.Score.participant_id)
+        .outerjoin(models.Criterion, models.Criterion.id == models.Score.criterion_id)
+        .filter(models.Round.event_id == event_id)
+        .group_by(
+            models.Score.round_id,
+            models.Participant.id,
+            models.Participant.number,
+            models.Participant.first_name,
+            models.Participant.last_name,
+            models.Score.criterion_id,
+            models.Criterion.name,
+        )
+        .order_by(models.Score.round_id, models.Participant.number.asc().nullsfirst(), models.Participant.id)
+    )
+    for round_id, *row in score_rows:
+        scores[round_id].append(tuple(row))
+
+    places: dict[int, list[tuple]] = {round_id: [] for round_id, *_ in round_rows}
+    place_rows = await db.execute(
+        select(
+            models.FinalPlace.round_id,
+            models.FinalPlace.place,
+            models.Participant.number,
+            models.Participant.first_name + " " + models.Participant.last_name,
+            models.FinalPlace.sum_places,
+        )
+        .join(models.Round, models.Round.id == models.FinalPlace.round_id)
+        .join(models.Participant, models.Participant.id == models.FinalPlace.participant_id)
+        .filter(models.Round.event_id == event_id)
+        .order_by(models.FinalPlace.round_id, models.FinalPlace.place)
+    )
+    for round_id, *row in place_rows:
+        places[round_id].append(tuple(row))
+
+    return ReportData(
+        title=title,
+        date=str(event_date) if event_date else None,
+        location=location,
+        rounds=tuple(
+            RoundReport(
+                category=category,
+                round_type=round_type,
+                stage_format=stage_format,
+                scores=tuple(scores[round_id]),
+                places=tuple(places[round_id]),
+            )
+            for round_id, category, round_type, stage_format in round_rows
+        ),
+    )
+
+
+@dataclass
+class RendererStats:
+    workers: int
+    queue_limit: int
+    queue_depth: int
+    rendered: int
+    cache_hits: int
+    deduplicated: int
+    rejected: int
+    failed: int
+
+
+class ReportRenderer:
+    """Renders reports in a process pool and keeps the latest version of each on disk."""
+
+    def __init__(self, workers: int, queue_limit: int, cache_dir: str) -> None:
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.cache_dir = Path(cache_dir or Path(tempfile.gettempdir()) / "battle-reports")
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight: dict[Path, asyncio.Task] = {}
+        self.rendered = self.cache_hits = self.deduplicated = self.rejected = self.failed = 0
+
+    def path(self, event_id: int, report_format: str, fingerprint: str) -> Path:
+        return self.cache_dir / f"{event_id}-{fingerprint}.{report_format}"
+
+    async def get(self, event_id: int, report_format: str) -> Path:
+        """Path of the current report, rendering it unless it is on disk or already being rendered."""
+        async with AsyncSessionLocal() as session:
+            fingerprint = await report_fingerprint(session, event_id)
+        path = self.path(event_id, report_format, fingerprint)
+        if path.exists():
+            self.cache_hits += 1
+            return path
+        task = self._in_flight.get(path)
+        if task is not None:
+            self.deduplicated += 1
+        else:
+            if len(self._in_flight) >= self.queue_limit:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Очередь отчётов переполнена, повторите позже")
+            # A task of its own, so a client that disconnects does not cancel the render for the others.
+            task = self._in_flight[path] = asyncio.create_task(self._render(event_id, report_format, path))
+            task.add_done_callback(lambda done: self._finished(path, done))
+        return await asyncio.shield(task)
+
+    async def _render(self, event_id: int, report_format: str, path: Path) -> Path:
+        async with AsyncSessionLocal() as session:
+            data = await collect_report_data(session, event_id)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        executor = self._pool()
+        try:
+            await asyncio.get_running_loop().run_in_executor(executor, render_report, report_format, data, str(path))
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); the next render starts a fresh pool.
+            if self._executor is executor:
+                self._executor = None
+            raise
+        self._sweep(event_id, report_format, path)
+        return path
+
+    def _sweep(self, event_id: int, report_format: str, current: Path) -> None:
+        """Remove superseded renders of the report once no response can still be opening them."""
+        cutoff = time.time() - STALE_REPORT_SECONDS
+        for stale in self.cache_dir.glob(f"{event_id}-*.{report_format}"):
+            try:
+                if stale != current and stale.stat().st_mtime < cutoff:
+                    stale.unlink()
+            except FileNotFoundError:
+                pass  # swept by another worker sharing the directory
+
+    def _finished(self, path: Path, task: asyncio.Task) -> None:
+        del self._in_flight[path]
+        if task.cancelled():
+            return
+        error = task.exception()  # retrieved here, so a render nobody waits for any more does not log a warning
+        if error is None:
+            self.rendered += 1
+        elif not isinstance(error, HTTPException):
+            self.failed += 1
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn": forking would copy the event loop and open database connections into the workers.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> RendererStats:
+        return RendererStats(
+            workers=self.workers,
+            queue_limit=self.queue_limit,
+            queue_depth=len(self._in_flight),
+            rendered=self.rendered,
+            cache_hits=self.cache_hits,
+            deduplicated=self.deduplicated,
+            rejected=self.rejected,
+            failed=self.failed,
+        )
+
+
+renderer = ReportRenderer(settings.report_workers, settings.report_queue_limit, settings.report_cache_dir)
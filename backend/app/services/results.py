@@ -0,0 +1,346 @@
+"""Live per-round results kept in memory and updated on every stored score."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..schemas import CategoryRoundResult, CriterionResult, ResultRow
+
+
+@dataclass
+class ParticipantTotals:
+    participant_id: int
+    name: str | None = None
+    total: float = 0.0
+    count: int = 0
+    criterion_totals: dict[int | None, float] = field(default_factory=dict)
+    criterion_counts: dict[int | None, int] = field(default_factory=dict)
+    marks: dict[tuple[int, int | None], float] = field(default_factory=dict)
+
+    @property
+    def sort_key(self) -> tuple[float, int]:
+        return (-self.total, self.participant_id)
+
+
+class RoundLeaderboard:
+    """Running totals of one round.
+
+    Every judge mark is remembered by ``(participant, judge, criterion)`` so that
+    re-submitting a score replaces the previous value instead of adding to it.
+    Totals are recomputed from the participant's marks with ``math.fsum`` rather
+    than adjusted by deltas, so corrections never accumulate rounding error and
+    the total depends only on the marks, not on the order they arrived in.
+    The ranking is a sorted list of ``(-total, participant_id)`` keys which is
+    repositioned with ``bisect`` when a participant's total changes.
+    """
+
+    def __init__(
+        self,
+        round_id: int,
+        event_id: int,
+        category_id: int,
+        category_name: str,
+        round_type: str,
+        criteria: dict[int, str],
+    ) -> None:
+        self.round_id = round_id
+        self.event_id = event_id
+        self.category_id = category_id
+        self.category_name = category_name
+        self.round_type = round_type
+        self.criteria = criteria
+        self._rows: dict[int, ParticipantTotals] = {}
+        self._order: list[tuple[float, int]] = []
+        self._unnamed: set[int] = set()
+        self._snapshot: CategoryRoundResult | None = None
+        self.version = 0
+
+    def apply(self, participant_id: int, judge_id: int, criterion_id: int | None, value: float) -> list[int]:
+        """Record a stored score and return the participants whose total or placement changed.
+
+        Re-applying the same mark is a no-op.
+        """
+        key = (judge_id, criterion_id)
+        row = self._rows.get(participant_id)
+        previous_total: float | None = None
+        if row is None:
+            row = self._rows[participant_id] = ParticipantTotals(participant_id=participant_id)
+            self._unnamed.add(participant_id)
+        elif row.marks.get(key) == value:
+            return []
+        else:
+            previous_total = row.total
+            del self._order[bisect_left(self._order, row.sort_key)]
+
+        row.marks[key] = value
+        criterion_marks = [mark for (_, criterion), mark in row.marks.items() if criterion == criterion_id]
+        row.total = math.fsum(row.marks.values())
+        row.count = len(row.marks)
+        row.criterion_totals[criterion_id] = math.fsum(criterion_marks)
+        row.criterion_counts[criterion_id] = len(criterion_marks)
+        insort(self._order, row.sort_key)
+        self._snapshot = None
+        if previous_total == row.total:
+            return []
+        return [participant_id, *self._overtaken(previous_total, row.total, participant_id)]
+
+    def _overtaken(self, previous: float | None, current: float, participant_id: int) -> list[int]:
+        """Other participants whose placement changed when one total went from ``previous`` to ``current``.
+
+        A placement is one plus the number of higher totals, so it changes exactly
+        for the totals the moved one crossed: ``[previous, current)`` on the way up,
+        ``[current, previous)`` on the way down, and everything below a new row.
+        """
+        if previous is None:
+            low, high = -math.inf, current
+        else:
+            low, high = min(previous, current), max(previous, current)
+        start = bisect_right(self._order, (-high, math.inf))
+        end = bisect_right(self._order, (-low, math.inf)) if low > -math.inf else len(self._order)
+        return [other for _, other in self._order[start:end] if other != participant_id]
+
+    def placement(self, participant_id: int) -> int:
+        """Competition ranking of one participant: the position of the first row with the same total."""
+        return bisect_left(self._order, (self._rows[participant_id].sort_key[0],)) + 1
+
+    def rename(self, participant_id: int, name: str) -> None:
+        row = self._rows.get(participant_id)
+        if row is not None and row.name != name:
+            row.name = name
+            self._unnamed.discard(participant_id)
+            self._snapshot = None
+
+    def missing_names(self) -> list[int]:
+        return list(self._unnamed)
+
+    def apply_many(self, marks: Iterable[tuple[int, int, int | None, float]]) -> list[tuple[int, int, float]]:
+        """Apply several marks and return ``(participant_id, placement, total)`` of rows that moved."""
+        touched: set[int] = set()
+        for mark in marks:
+            touched.update(self.apply(*mark))
+        moved = [
+            (participant_id, self.placement(participant_id), self._rows[participant_id].total)
+            for participant_id in touched
+        ]
+        return sorted(moved, key=lambda row: (row[1], row[0]))
+
+    def moved_since(self, previous: RoundLeaderboard) -> list[tuple[int, int, float]]:
+        """``(participant_id, placement, total)`` of rows whose placement or total differs from ``previous``."""
+        before = previous.placements()
+        moved = []
+        for participant_id, place in self.placements().items():
+            total = self._rows[participant_id].total
+            old = previous._rows.get(participant_id)
+            if old is None or old.total != total or before[participant_id] != place:
+                moved.append((participant_id, place, total))
+        return sorted(moved, key=lambda row: (row[1], row[0]))
+
+    def placements(self) -> dict[int, int]:
+        """Competition ranking (1, 2, 2, 4) of every scored participant."""
+        places: dict[int, int] = {}
+        previous_total: float | None = None
+        place = 0
+        for position, (negative_total, participant_id) in enumerate(self._order, start=1):
+            if negative_total != previous_total:
+                place = position
+                previous_total = negative_total
+            places[participant_id] = place
+        return places
+
+    def result(self) -> CategoryRoundResult:
+        if self._snapshot is not None:
+            return self._snapshot
+
+        places = self.placements()
+        rows = []
+        for _, participant_id in self._order:
+            row = self._rows[participant_id]
+            rows.append(
+                ResultRow(
+                    participant_id=participant_id,
+                    participant_name=row.name or "",
+                    total_score=row.total,
+                    average_score=row.total / row.count if row.count else 0.0,
+                    placement=places[participant_id],
+                    criteria=[
+                        CriterionResult(
+                            criterion_id=criterion_id,
+                            criterion_name=self.criteria.get(criterion_id) if criterion_id is not None else None,
+                            total_score=total,
+                            average_score=total / row.criterion_counts[criterion_id],
+                        )
+                        for criterion_id, total in sorted(
+                            row.criterion_totals.items(), key=lambda item: (item[0] is None, item[0] or 0)
+                        )
+                    ],
+                )
+            )
+        self._snapshot = CategoryRoundResult(
+            round_id=self.round_id,
+            category_id=self.category_id,
+            category_name=self.category_name,
+            round=self.round_type,
+            scores=rows,
+        )
+        return self._snapshot
+
+
+class LeaderboardRegistry:
+    """Process-wide registry of round leaderboards.
+
+    A board is built from the ``scores`` table the first time its round is read
+    and is kept current afterwards: writers apply their marks after committing.
+    A write never loads a board; the marks of a round nobody has read yet are
+    picked up from the table by the first read.
+
+    Each board remembers the ``rounds.scores_version`` it reflects. Every score
+    transaction bumps that counter, so a write whose version directly follows the
+    board's is applied in place, while a gap means another worker (or an earlier
+    request of this one that has not applied yet) wrote in between and the board
+    is reloaded instead. Reads compare the board against the current version, so
+    scores written through other API workers show up on the next read.
+    """
+
+    def __init__(self) -> None:
+        self._boards: dict[int, RoundLeaderboard] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._event_ids: dict[int, int] = {}
+
+    async def record(
+        self, db: AsyncSession, round_id: int, version: int, scores: Iterable[models.Score]
+    ) -> list[tuple[int, int, list]]:
+        """Apply scores stored in one round at ``version``; returns ``[(round_id, event_id, moved rows)]``."""
+        lock = self._locks.setdefault(round_id, asyncio.Lock())
+        async with lock:
+            board = self._boards.get(round_id)
+            if board is None:
+                return [(round_id, await self._event_id(db, round_id), [])]
+            if version <= board.version:
+                # A reload after the commit already picked these marks up.
+                return [(round_id, board.event_id, [])]
+            if version == board.version + 1:
+                moved = board.apply_many(
+                    (score.participant_id, score.judge_id, score.criterion_id, score.score) for score in scores
+                )
+                board.version = version
+            else:
+                stale = board
+                board = await self._load(db, round_id)
+                moved = board.moved_since(stale)
+            if board.missing_names():
+                await self._fill_names(db, board)
+        return [(round_id, board.event_id, moved)]
+
+    async def _event_id(self, db: AsyncSession, round_id: int) -> int:
+        event_id = self._event_ids.get(round_id)
+        if event_id is None:
+            event_id = await db.scalar(select(models.Round.event_id).filter(models.Round.id == round_id))
+            if event_id is None:
+                raise HTTPException(status_code=404, detail="Round not found")
+            self._event_ids[round_id] = event_id
+        return event_id
+
+    def rename_participant(self, participant_id: int, name: str) -> None:
+        for board in self._boards.values():
+            board.rename(participant_id, name)
+
+    async def get(self, db: AsyncSession, round_id: int) -> RoundLeaderboard:
+        """The round's board, reloaded when ``rounds.scores_version`` moved past it."""
+        board = self._boards.get(round_id)
+        if board is not None:
+            version = await db.scalar(select(models.Round.scores_version).filter(models.Round.id == round_id))
+            if version is None:
+                raise HTTPException(status_code=404, detail="Round not found")
+            if version <= board.version:
+                if board.missing_names():
+                    await self._fill_names(db, board)
+                return board
+
+        lock = self._locks.setdefault(round_id, asyncio.Lock())
+        async with lock:
+            current = self._boards.get(round_id)
+            if current is board:
+                current = await self._load(db, round_id)
+            board = current
+        if board.missing_names():
+            await self._fill_names(db, board)
+        return board
+
+    async def _load(self, db: AsyncSession, round_id: int) -> RoundLeaderboard:
+        stmt_round = (
+            select(
+                models.Round.event_id,
+                models.Round.category_id,
+                models.Round.round_type,
+                models.Round.scores_version,
+                models.Category.name,
+            )
+            .join(models.Category, models.Category.id == models.Round.category_id)
+            .filter(models.Round.id == round_id)
+        )
+        result = await db.execute(stmt_round)
+        round_row = result.one_or_none()
+        if round_row is None:
+            raise HTTPException(status_code=404, detail="Round not found")
+        event_id, category_id, round_type, version, category_name = round_row
+
+        criteria_result = await db.execute(
+            select(models.Criterion.id, models.Criterion.name).filter(models.Criterion.category_id == category_id)
+        )
+        board = RoundLeaderboard(
+            round_id=round_id,
+            event_id=event_id,
+            category_id=category_id,
+            category_name=category_name,
+            round_type=round_type,
+            criteria=dict(criteria_result.all()),
+        )
+
+        # The version is read in the same statement as the marks, so both come from
+        # one snapshot; the round row's version only counts when there are no marks.
+        version_subquery = (
+            select(models.Round.scores_version).filter(models.Round.id == round_id).scalar_subquery()
+        )
+        stmt_scores = (
+            select(
+                models.Score.participant_id,
+                models.Score.judge_id,
+                models.Score.criterion_id,
+                models.Score.score,
+                models.Participant.first_name,
+                models.Participant.last_name,
+                version_subquery,
+            )
+            .join(models.Participant, models.Participant.id == models.Score.participant_id)
+            .filter(models.Score.round_id == round_id)
+        )
+        scores_result = await db.execute(stmt_scores)
+        for participant_id, judge_id, criterion_id, value, first_name, last_name, version in scores_result.all():
+            board.apply(participant_id, judge_id, criterion_id, value)
+            board.rename(participant_id, f"{first_name} {last_name}")
+        board.version = version
+
+        self._boards[round_id] = board
+        self._event_ids[round_id] = event_id
+        return board
+
+    async def _fill_names(self, db: AsyncSession, board: RoundLeaderboard) -> None:
+        result = await db.execute(
+            select(models.Participant.id, models.Participant.first_name, models.Participant.last_name).filter(
+                models.Participant.id.in_(board.missing_names())
+            )
+        )
+        for participant_id, first_name, last_name in result.all():
+            board.rename(participant_id, f"{first_name} {last_name}")
+
+
+leaderboards = LeaderboardRegistry()
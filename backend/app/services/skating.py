@@ -0,0 +1,156 @@
+"""Skating system (rules 5–11) over a judge × couple place matrix.
+
+Cumulative majority counts and sums for every couple and place column are
+computed at once with NumPy; the Python loops only walk the places being
+awarded and the couples still tied for them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class DanceTabulation:
+    """Tabulation of one dance: ``counts[p, k]``/``sums[p, k]`` cover marks ``1..k+1``."""
+
+    marks: np.ndarray
+    counts: np.ndarray
+    sums: np.ndarray
+    places: np.ndarray
+
+
+@dataclass
+class SkatingResult:
+    dances: list[DanceTabulation]
+    dance_places: np.ndarray
+    totals: np.ndarray
+    places: np.ndarray
+    rules: list[str | None]
+
+
+def cumulative_tables(marks: np.ndarray, columns: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return cumulative mark counts and sums per couple for columns ``1``, ``1-2``, ... ``1-columns``.
+
+    ``marks`` has one row per judge (or per judge and dance) and one column per couple.
+    """
+    couples = marks.shape[1]
+    flat = np.arange(couples)[None, :] * columns + (marks - 1)
+    counts = np.bincount(flat.ravel(), minlength=couples * columns).reshape(couples, columns)
+    cumulative_counts = np.cumsum(counts, axis=1)
+    cumulative_sums = np.cumsum(counts * np.arange(1, columns + 1), axis=1)
+    return cumulative_counts, cumulative_sums
+
+
+def order_by_columns(candidates: np.ndarray, counts: np.ndarray, sums: np.ndarray, column: int) -> list[np.ndarray]:
+    """Order couples by larger majority, then lower sum, looking at later columns for ties (rules 6–7)."""
+    keys = np.stack([-counts[candidates, column], sums[candidates, column]])
+    order = np.lexsort(keys[::-1])
+    ranked = candidates[order]
+    sorted_keys = keys[:, order]
+    boundaries = np.flatnonzero(np.any(sorted_keys[:, 1:] != sorted_keys[:, :-1], axis=0)) + 1
+    groups = []
+    for group in np.split(ranked, boundaries):
+        if len(group) > 1 and column + 1 < counts.shape[1]:
+            groups.extend(order_by_columns(group, counts, sums, column + 1))
+        else:
+            groups.append(group)
+    return groups
+
+
+def allocate_by_majority(counts: np.ndarray, sums: np.ndarray, majority: int, first_place: int = 1,
+                         couples: np.ndarray | None = None) -> dict[int, float]:
+    """Award places ``first_place...`` to ``couples`` by majority (rules 5–8).
+
+    Couples that stay equal on every column share the places (e.g. ``2.5``).
+    """
+    columns = counts.shape[1]
+    remaining = np.arange(counts.shape[0]) if couples is None else couples
+    places: dict[int, float] = {}
+    place = first_place
+    while len(remaining):
+        column = min(place, columns) - 1
+        has_majority = counts[remaining, column:] >= majority
+        column += int(np.argmax(has_majority.any(axis=0)))
+        candidates = remaining[counts[remaining, column] >= majority]
+        if not len(candidates):
+            candidates = remaining
+        for group in order_by_columns(candidates, counts, sums, column):
+            shared = place + (len(group) - 1) / 2
+            for couple in group.tolist():
+                places[couple] = shared
+            place += len(group)
+        remaining = np.setdiff1d(remaining, candidates, assume_unique=True)
+    return places
+
+
+def skate_dance(marks: np.ndarray) -> DanceTabulation:
+    """Places in a single dance; ``marks[j, p]`` is judge ``j``'s place for couple ``p``."""
+    judges, couples = marks.shape
+    counts, sums = cumulative_tables(marks, couples)
+    allocated = allocate_by_majority(counts, sums, judges // 2 + 1)
+    places = np.array([allocated[couple] for couple in range(couples)])
+    return DanceTabulation(marks=marks, counts=counts, sums=sums, places=places)
+
+
+def skate_final(marks: np.ndarray) -> SkatingResult:
+    """Final result over several dances; ``marks[d, j, p]`` is a judge's place in dance ``d``.
+
+    Totals of dance places decide first (rule 9). Equal totals are split by the
+    number and sum of dance places at or better than the place under review
+    (rule 10), then by treating every mark of every dance as one dance (rule 11).
+    """
+    dances, judges, couples = marks.shape
+    tabulations = [skate_dance(marks[dance]) for dance in range(dances)]
+    dance_places = np.stack([tabulation.places for tabulation in tabulations])
+    totals = dance_places.sum(axis=0)
+
+    all_marks = marks.reshape(dances * judges, couples)
+    all_counts, all_sums = cumulative_tables(all_marks, couples)
+    all_majority = dances * judges // 2 + 1
+
+    places = np.zeros(couples)
+    rules: list[str | None] = [None] * couples
+    remaining = np.arange(couples)
+    place = 1
+    while len(remaining):
+        tied = remaining[totals[remaining] == totals[remaining].min()]
+        if len(tied) == 1:
+            winners, rule = tied, None
+        else:
+            winners, rule = _rule_10(dance_places, tied, place, couples), "10"
+            if len(winners) > 1:
+                allocated = allocate_by_majority(all_counts, all_sums, all_majority, place, winners)
+                best = min(allocated.values())
+                winners = np.array([couple for couple in winners.tolist() if allocated[couple] == best])
+                rule = "11"
+        shared = place + (len(winners) - 1) / 2
+        places[winners] = shared
+        for couple in winners.tolist():
+            rules[couple] = rule
+        place += len(winners)
+        remaining = np.setdiff1d(remaining, winners, assume_unique=True)
+
+    return SkatingResult(dances=tabulations, dance_places=dance_places, totals=totals, places=places, rules=rules)
+
+
+def _rule_10(dance_places: np.ndarray, tied: np.ndarray, place: int, couples: int) -> np.ndarray:
+    """Couples among ``tied`` that win the place under review by rule 10."""
+    candidates = dance_places[:, tied]
+    for review in range(place, couples + 1):
+        within = candidates <= review
+        counts = within.sum(axis=0)
+        if counts.max() == 0:
+            continue
+        best = counts == counts.max()
+        sums = np.where(within, candidates, 0).sum(axis=0)
+        best &= sums == sums[best].min()
+        return tied[best]
+    return tied
+
+
+def competition_places(places: np.ndarray) -> np.ndarray:
+    """Integer places where shared places take the best one (``2.5, 2.5`` → ``2, 2``)."""
+    return np.searchsorted(np.sort(places), places, side="left") + 1
@@ -0,0 +1,183 @@
+"""Versioned, pre-serialized competition snapshots for spectators."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..crud import PARTICIPANT_COLUMNS
+from ..schemas import (
+    CompetitionSnapshot,
+    CriterionRead,
+    HeatParticipantRead,
+    HeatRead,
+    ParticipantRead,
+    SnapshotCategory,
+    SnapshotRound,
+)
+
+
+class CompetitionVersions:
+    """Per-competition version counters kept in ``events.version``.
+
+    Every write to the competition tree bumps the counter in the database, so all
+    API workers see the same version and drop their cached copies of the
+    competition, whichever worker handled the write.
+    """
+
+    async def get(self, db: AsyncSession, event_id: int) -> int:
+        version = await db.scalar(select(models.Event.version).filter(models.Event.id == event_id))
+        return version or 0
+
+    async def bump(self, db: AsyncSession, event_id: int) -> None:
+        """Bump after the write committed; a snapshot read in between is already superseded."""
+        await db.execute(
+            update(models.Event).where(models.Event.id == event_id).values(version=models.Event.version + 1)
+        )
+        await db.commit()
+
+
+versions = CompetitionVersions()
+
+
+@dataclass
+class Snapshot:
+    version: int
+    etag: str
+    body: bytes
+
+
+_snapshots: dict[int, Snapshot] = {}
+
+
+def make_etag(event_id: int, version: int) -> str:
+    return f'"{event_id}-{version}"'
+
+
+async def get_snapshot(db: AsyncSession, event_id: int, version: int) -> Snapshot:
+    """Serialized snapshot of the competition at ``version``, rebuilt only after the version changed.
+
+    ``version`` is read with :meth:`CompetitionVersions.get` before the tree, so a
+    snapshot may hold data newer than its version but never older: a write that
+    lands meanwhile bumps the version and the next request rebuilds.
+    """
+    snapshot = _snapshots.get(event_id)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    document = await build_snapshot(db, event_id, version)
+    snapshot = Snapshot(version=version, etag=make_etag(event_id, version), body=document.model_dump_json().encode())
+    current = _snapshots.get(event_id)
+    if current is None or current.version <= version:
+        _snapshots[event_id] = snapshot
+    return snapshot
+
+
+async def build_snapshot(db: AsyncSession, event_id: int, version: int) -> CompetitionSnapshot:
+    event_row = (
+        await db.execute(
+            select(models.Event.title, models.Event.date, models.Event.location).filter(models.Event.id == event_id)
+        )
+    ).one_or_none()
+    if event_row is None:
+        raise HTTPException(status_code=404, detail="Competition not found")
+    title, event_date, location = event_row
+
+    categories: dict[int, SnapshotCategory] = {}
+    stmt_categories = (
+        select(
+            models.Category.id,
+            models.Category.name,
+            models.Category.type,
+            models.Criterion.id,
+            models.Criterion.name,
+            models.Criterion.scale_min,
+            models.Criterion.scale_max,
+        )
+        .outerjoin(models.Criterion, models.Criterion.category_id == models.Category.id)
+        .filter(models.Category.event_id == event_id)
+        .order_by(models.Category.id, models.Criterion.id)
+    )
+    for category_id, name, type_, criterion_id, criterion_name, scale_min, scale_max in (
+        await db.execute(stmt_categories)
+    ).all():
+        category = categories.get(category_id)
+        if category is None:
+            category = categories[category_id] = SnapshotCategory(id=category_id, name=name, type=type_)
+        if criterion_id is not None:
+            category.criteria.append(
+                CriterionRead(id=criterion_id, name=criterion_name, scale_min=scale_min, scale_max=scale_max)
+            )
+
+    stmt_participants = (
+        select(models.Participant.category_id, *(getattr(models.Participant, name) for name in PARTICIPANT_COLUMNS))
+        .filter(models.Participant.event_id == event_id)
+        .order_by(models.Participant.number.asc().nullsfirst(), models.Participant.last_name)
+    )
+    for category_id, *values in (await db.execute(stmt_participants)).all():
+        category = categories.get(category_id)
+        if category is not None:
+            category.participants.append(ParticipantRead(**dict(zip(PARTICIPANT_COLUMNS, values))))
+
+    rounds: dict[int, SnapshotRound] = {}
+    stmt_rounds = (
+        select(
+            models.Round.id,
+            models.Round.category_id,
+            models.Round.round_type,
+            models.Round.stage_format,
+        )
+        .filter(models.Round.event_id == event_id)
+        .order_by(models.Round.stage_format, models.Round.round_type)
+    )
+    for round_id, category_id, round_type, stage_format in (await db.execute(stmt_rounds)).all():
+        rounds[round_id] = SnapshotRound(
+            id=round_id,
+            event_id=event_id,
+            category_id=category_id,
+            round_type=round_type,
+            stage_format=stage_format,
+        )
+
+    heats: dict[int, HeatRead] = {}
+    if rounds:
+        stmt_heats = (
+            select(
+                models.Heat.id,
+                models.Heat.round_id,
+                models.Heat.heat_number,
+                models.Heat.status,
+                models.HeatParticipant.participant_id,
+                models.Participant.first_name,
+                models.Participant.last_name,
+            )
+            .outerjoin(models.HeatParticipant, models.HeatParticipant.heat_id == models.Heat.id)
+            .outerjoin(models.Participant, models.Participant.id == models.HeatParticipant.participant_id)
+            .filter(models.Heat.round_id.in_(list(rounds)))
+            .order_by(models.Heat.round_id, models.Heat.heat_number, models.HeatParticipant.participant_id)
+        )
+        for heat_id, round_id, heat_number, status, participant_id, first_name, last_name in (
+            await db.execute(stmt_heats)
+        ).all():
+            heat = heats.get(heat_id)
+            if heat is None:
+                heat = heats[heat_id] = HeatRead(id=heat_id, heat_number=heat_number, status=status)
+                rounds[round_id].heats.append(heat)
+            if participant_id is not None:
+                heat.participants.append(
+                    HeatParticipantRead(participant_id=participant_id, participant_name=f"{first_name} {last_name}")
+                )
+
+    return CompetitionSnapshot(
+        id=event_id,
+        title=title,
+        date=str(event_date) if event_date else None,
+        location=location,
+        version=version,
+        categories=list(categories.values()),
+        rounds=list(rounds.values()),
+    )
@@ -0,0 +1 @@
+"""Standalone performance benchmarks; run from ``backend/`` as ``python -m benchmarks.<name>``."""
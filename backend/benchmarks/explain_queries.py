@@ -0,0 +1,151 @@
+"""Fail when a hot query in ``crud.py``, ``reads.py`` or ``services/heats.py`` needs a sequential scan.
+
+The read and write helpers are called against ``DATABASE_URL`` inside a
+transaction that is rolled back at the end. Every statement they send is
+captured, then ``EXPLAIN (FORMAT JSON)`` runs on it with ``enable_seqscan`` off.
+With that setting the planner still picks a ``Seq Scan`` only when no index can
+serve the filter, so the check works on a small database too. The script exits
+with status 1 if any plan scans one of the large tables sequentially.
+
+Usage: ``python -m benchmarks.explain_queries`` (run ``python -m app.migrations`` first)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, reads
+from app.database import engine
+from app.services import heats
+
+LARGE_TABLES = {
+    "scores",
+    "participants",
+    "heat_participants",
+    "heats",
+    "rounds",
+    "categories",
+    "criteria",
+    "final_places",
+}
+
+
+async def sample_ids(db: AsyncSession) -> dict[str, int]:
+    """Existing ids to query with; ``1`` where a table is empty."""
+    ids = {}
+    for name, column in {
+        "event": models.Event.id,
+        "category": models.Category.id,
+        "participant": models.Participant.id,
+        "round": models.Round.id,
+        "heat": models.Heat.id,
+        "criterion": models.Criterion.id,
+        "judge": models.User.id,
+    }.items():
+        ids[name] = (await db.scalar(select(func.min(column)))) or 1
+    return ids
+
+
+async def run_queries(db: AsyncSession, ids: dict[str, int]) -> None:
+    calls = [
+        lambda: crud.list_competition_trees(db),
+        lambda: crud.list_competition_trees(db, ids["event"]),
+        lambda: crud.list_categories(db, ids["event"]),
+        lambda: crud.list_participants(db, ids["category"]),
+        lambda: crud.list_all_participants_by_event(db, ids["event"]),
+        lambda: crud.list_all_participants_by_event(db, ids["event"], limit=50),
+        lambda: crud.get_participant(db, ids["participant"], ids["event"]),
+        lambda: crud.list_rounds(db, ids["event"]),
+        lambda: crud.get_round(db, ids["round"]),
+        lambda: crud.get_users(db),
+        lambda: crud.get_user_by_telegram(db, 0),
+        lambda: crud.upsert_score(
+            db,
+            participant_id=ids["participant"],
+            judge_id=ids["judge"],
+            round_id=ids["round"],
+            heat_id=ids["heat"],
+            criterion_id=None,
+            value=1,
+        ),
+        lambda: crud.upsert_scores(
+            db,
+            judge_id=ids["judge"],
+            round_id=ids["round"],
+            heat_id=ids["heat"],
+            entries=[(ids["participant"], ids["criterion"], 1.0)],
+        ),
+        lambda: reads.heat_detail(db, ids["heat"]),
+        lambda: reads.round_heats(db, ids["round"]),
+        lambda: reads.heat_scores(db, ids["heat"]),
+        lambda: heats.distribute_heats(db, ids["round"], 8),
+    ]
+    for call in calls:
+        try:
+            await call()
+        except HTTPException:
+            pass
+        except Exception as exc:  # e.g. foreign keys on an empty database; the SQL was still captured
+            print(f"  note: {type(exc).__name__}: {str(exc).splitlines()[0]}")
+            await db.rollback()
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def main() -> int:
+    captured: list[tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+            captured.append((statement, parameters))
+
+    async with engine.connect() as conn:
+        outer = await conn.begin()
+        db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        ids = await sample_ids(db)
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await run_queries(db, ids)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+            await db.close()
+            await outer.rollback()
+
+    failures = 0
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        seen = set()
+        for statement, parameters in captured:
+            if statement in seen:
+                continue
+            seen.add(statement)
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scanned = seq_scans(plan[0]["Plan"])
+            status = "SEQ SCAN " + ", ".join(sorted(set(scanned))) if scanned else "ok"
+            print(f"{status:<30} {' '.join(statement.split())[:110]}")
+            failures += bool(scanned)
+        await conn.rollback()
+    await engine.dispose()
+
+    print(f"\n{len(seen)} statements checked, {failures} with sequential scans on large tables")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,72 @@
+"""Local fake of the Telegram Bot API ``sendMessage`` method.
+
+Point the backend at it with ``TELEGRAM_API_BASE=http://127.0.0.1:8081`` (and any
+``TELEGRAM_BOT_TOKEN``) to exercise the notification outbox worker without
+Telegram. It can add latency, answer ``429`` with ``retry_after`` and fail with
+``500`` at the given rates; ``GET /stats`` reports what it received, including
+the shortest gap between two messages to the same chat.
+
+Usage: ``python -m benchmarks.fake_telegram [--port 8081] [--latency 0.2] [--rate-limit 0.1] [--error-rate 0.05]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+
+def create_app(latency: float, rate_limit: float, error_rate: float) -> FastAPI:
+    app = FastAPI(title="Fake Telegram Bot API")
+    stats = {"delivered": 0, "rate_limited": 0, "errors": 0, "chats": {}, "min_chat_gap": None}
+
+    @app.post("/bot{token}/sendMessage")
+    async def send_message(token: str, payload: dict):
+        if latency:
+            await asyncio.sleep(latency)
+        roll = random.random()
+        if roll < rate_limit:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                content={"ok": False, "error_code": 429, "description": "Too Many Requests", "parameters": {"retry_after": 1}},
+            )
+        if roll < rate_limit + error_rate:
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"ok": False, "error_code": 500, "description": "Internal"})
+
+        now = time.monotonic()
+        chat_id = payload.get("chat_id")
+        previous = stats["chats"].get(chat_id)
+        if previous is not None:
+            gap = now - previous
+            stats["min_chat_gap"] = gap if stats["min_chat_gap"] is None else min(stats["min_chat_gap"], gap)
+        stats["chats"][chat_id] = now
+        stats["delivered"] += 1
+        return {"ok": True, "result": {"message_id": stats["delivered"], "chat": {"id": chat_id}, "text": payload.get("text")}}
+
+    @app.get("/stats")
+    async def get_stats():
+        return {key: value for key, value in stats.items() if key != "chats"} | {"chat_count": len(stats["chats"])}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.rate_limit, args.error_rate), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
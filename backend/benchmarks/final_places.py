@@ -0,0 +1,58 @@
+"""Benchmark the final-places engine at the ТЗ limit of 100 judges × 1,000 participants.
+
+Usage: ``python -m benchmarks.final_places [--judges 100] [--participants 1000] [--tours 2]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.final_places import PlaceMatrix, rank_final
+
+
+def synthetic_rows(judges: int, participants: int, tours: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    tour_ids, judge_ids = np.meshgrid(np.arange(1, tours + 1), np.arange(1, judges + 1), indexing="ij")
+    tour_ids = np.repeat(tour_ids.ravel(), participants)
+    judge_ids = np.repeat(judge_ids.ravel(), participants)
+    participant_ids = np.tile(np.arange(1, participants + 1), tours * judges)
+    # Every judge ranks every participant 1..N in each tour.
+    values = np.concatenate([rng.permutation(participants) + 1 for _ in range(tours * judges)]).astype(np.float64)
+    return participant_ids, judge_ids, tour_ids, values
+
+
+def timed(label: str, func, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<28} {best * 1000:9.2f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--judges", type=int, default=100)
+    parser.add_argument("--participants", type=int, default=1000)
+    parser.add_argument("--tours", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.judges, args.participants, args.tours)
+    print(f"{args.judges} judges × {args.participants} participants × {args.tours} tours = {len(rows[0]):,} marks")
+    matrix = timed("build place matrix", lambda: PlaceMatrix.from_rows(*rows), args.repeat)
+    ranking = timed("rank with tie-breaks", lambda: rank_final(matrix), args.repeat)
+    timed(
+        "build bulk insert rows",
+        lambda: list(zip(ranking.participant_ids.tolist(), ranking.places.tolist(), ranking.sum_places.tolist())),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark heat distribution for a 1,000-participant category.
+
+Without arguments only the in-memory planning step of every strategy is timed.
+With ``--database`` a scratch competition is created in ``DATABASE_URL`` and the
+full ``distribute_heats`` call (read participants, delete old heats, two bulk
+inserts, commit) is timed, then the scratch competition is deleted.
+
+Usage: ``python -m benchmarks.heat_distribution [--participants 1000] [--max-in-heat 8] [--database]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from sqlalchemy import delete, insert
+
+from app import models
+from app.database import AsyncSessionLocal
+from app.services.heats import distribute_heats, plan_balanced, plan_paired, plan_snake
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_planning(participants: int, max_in_heat: int, repeat: int) -> None:
+    ids = np.arange(1, participants + 1, dtype=np.int64)
+    genders = np.where(ids % 2 == 0, "female", "male").astype(object)
+    plans = {
+        "balanced": lambda: plan_balanced(ids, max_in_heat),
+        "paired": lambda: plan_paired(ids, genders, max_in_heat),
+        "snake": lambda: plan_snake(ids, max_in_heat),
+    }
+    for name, plan in plans.items():
+        print(f"plan {name:<10} {best_of(plan, repeat) * 1000:9.3f} ms")
+
+
+async def bench_database(participants: int, max_in_heat: int, repeat: int) -> None:
+    async with AsyncSessionLocal() as db:
+        event = models.Event(title="benchmark: heat distribution")
+        db.add(event)
+        await db.flush()
+        category = models.Category(event_id=event.id, name="benchmark", type="amateur")
+        db.add(category)
+        await db.flush()
+        round_ = models.Round(event_id=event.id, category_id=category.id, round_type="preliminary")
+        db.add(round_)
+        await db.flush()
+        await db.execute(
+            insert(models.Participant).values(
+                [
+                    {
+                        "event_id": event.id,
+                        "category_id": category.id,
+                        "first_name": "Участник",
+                        "last_name": str(idx),
+                        "number": idx,
+                        "gender": "male" if idx % 2 else "female",
+                    }
+                    for idx in range(1, participants + 1)
+                ]
+            )
+        )
+        await db.commit()
+        event_id, round_id = event.id, round_.id
+
+    try:
+        for strategy in ("balanced", "paired", "snake"):
+            best = float("inf")
+            for _ in range(repeat):
+                async with AsyncSessionLocal() as db:
+                    started = time.perf_counter()
+                    await distribute_heats(db, round_id, max_in_heat, strategy=strategy)
+                    best = min(best, time.perf_counter() - started)
+            print(f"distribute {strategy:<10} {best * 1000:9.3f} ms")
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.Event).where(models.Event.id == event_id))
+            await db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--participants", type=int, default=1000)
+    parser.add_argument("--max-in-heat", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--database", action="store_true", help="also time distribute_heats against DATABASE_URL")
+    args = parser.parse_args()
+
+    bench_planning(args.participants, args.max_in_heat, args.repeat)
+    if args.database:
+        asyncio.run(bench_database(args.participants, args.max_in_heat, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""End-to-end load test of a running API: one simulated competition day.
+
+An event is seeded through the public API: categories with criteria,
+participants, judges, one preliminary round per category, and ``distribute``.
+Then every category is run heat by heat on its own floor. The head judge sets
+the heat ``in_progress``, the category's judges each submit a full score sheet
+after a random think time, and the head judge sets the heat ``finished``.
+Meanwhile spectators poll the heat, the round's heats, the heat's scores,
+results and the competition snapshot.
+
+Per endpoint (route template) the run reports the request count, errors,
+throughput and p50/p95/p99 latency. ``--output`` stores the report as JSON, and
+``--baseline`` compares the run with a stored report. Data and think times come
+from ``--seed``, so runs with the same arguments are comparable.
+
+Usage: ``python -m benchmarks.load_test [--base-url http://localhost:8000] [--judges 100]
+[--participants 1000] [--output run.json] [--baseline baseline.json]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timezone
+
+import httpx
+import numpy as np
+
+CRITERIA = ["Техника", "Музыкальность", "Образ"]
+
+
+class Recorder:
+    """Latencies and errors per endpoint label."""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.samples[label].append(time.perf_counter() - started)
+            self.errors[label] += 1
+            return None
+        self.samples[label].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+    def report(self, seconds: float) -> dict[str, dict]:
+        report = {}
+        for label, samples in sorted(self.samples.items()):
+            latencies = np.asarray(samples) * 1000
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            report[label] = {
+                "count": len(samples),
+                "errors": self.errors[label],
+                "rps": len(samples) / seconds if seconds else 0.0,
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+            }
+        return report
+
+
+def print_report(report: dict[str, dict], baseline: dict[str, dict] | None = None) -> None:
+    header = f"{'endpoint':<42} {'count':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    if baseline:
+        header += f" {'Δp95':>7} {'Δrps':>7}"
+    print(header)
+    for label, row in report.items():
+        line = (
+            f"{label:<42} {row['count']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+        base = (baseline or {}).get(label)
+        if base:
+            line += f" {_delta(row['p95_ms'], base['p95_ms']):>7} {_delta(row['rps'], base['rps']):>7}"
+        print(line)
+
+
+def _delta(value: float, base: float) -> str:
+    return f"{(value - base) / base * 100:+.0f}%" if base else "n/a"
+
+
+async def gather_limited(limit: int, coroutines) -> list:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(coroutine) for coroutine in coroutines))
+
+
+async def seed_event(client: httpx.AsyncClient, recorder: Recorder, args, rng: random.Random) -> dict:
+    """Create the event through the API and return ids needed to drive the traffic."""
+
+    async def post(label: str, url: str, payload: dict) -> dict:
+        response = await recorder.request(client, label, "POST", url, json=payload)
+        if response is None or response.status_code >= 400:
+            raise SystemExit(f"Seeding failed at {label}: {response.status_code if response else 'no response'}")
+        return response.json()
+
+    event = await post(
+        "POST /competitions",
+        "/competitions",
+        {"title": f"Load test {datetime.now(timezone.utc):%Y-%m-%d %H:%M:%S}", "date": str(date.today()), "location": "benchmark"},
+    )
+    event_id = event["id"]
+
+    categories = [
+        await post(
+            "POST /competitions/{competition_id}/categories",
+            f"/competitions/{event_id}/categories",
+            {"name": f"Категория {idx + 1}", "type": "amateur", "criteria": CRITERIA},
+        )
+        for idx in range(args.categories)
+    ]
+
+    await gather_limited(
+        args.concurrency,
+        (
+            post(
+                "POST /competitions/{competition_id}/participants",
+                f"/competitions/{event_id}/participants",
+                {
+                    "full_name": f"Участник {number}",
+                    "number": number,
+                    "gender": rng.choice(["male", "female"]),
+                    "category_id": categories[number % len(categories)]["id"],
+                },
+            )
+            for number in range(1, args.participants + 1)
+        ),
+    )
+
+    judges = await gather_limited(
+        args.concurrency,
+        (
+            post("POST /users", "/users", {"first_name": "Судья", "last_name": str(idx + 1), "role": "judge"})
+            for idx in range(args.judges)
+        ),
+    )
+
+    floors = []
+    for idx, category in enumerate(categories):
+        round_ = await post(
+            "POST /rounds",
+            "/rounds",
+            {"event_id": event_id, "category_id": category["id"], "round_type": "preliminary"},
+        )
+        await post(
+            "POST /rounds/{round_id}/distribute",
+            f"/rounds/{round_['id']}/distribute",
+            {"max_in_heat": args.max_in_heat},
+        )
+        heats = (await recorder.request(client, "GET /rounds/{round_id}/heats", "GET", f"/rounds/{round_['id']}/heats")).json()
+        floors.append(
+            {
+                "round_id": round_["id"],
+                "criteria": [criterion["id"] for criterion in category["criteria"]],
+                "heats": heats[: args.heats] if args.heats else heats,
+                "judges": [judge["id"] for judge in judges[idx :: len(categories)]],
+            }
+        )
+    return {"event_id": event_id, "floors": floors}
+
+
+async def run_floor(client: httpx.AsyncClient, recorder: Recorder, floor: dict, state: dict, args, rng: random.Random) -> None:
+    for heat in floor["heats"]:
+        heat_id = heat["id"]
+        state["current"][floor["round_id"]] = heat_id
+        await recorder.request(
+            client, "PATCH /heats/{heat_id}/status", "PATCH", f"/heats/{heat_id}/status", json={"status": "in_progress"}
+        )
+        participant_ids = [participant["participant_id"] for participant in heat["participants"]]
+
+        async def submit(judge_id: int, delay: float, sheet: list[dict]) -> None:
+            await asyncio.sleep(delay)
+            await recorder.request(
+                client,
+                "POST /heats/{heat_id}/scores:batch",
+                "POST",
+                f"/heats/{heat_id}/scores:batch",
+                json={"judge_id": judge_id, "scores": sheet},
+            )
+
+        # Marks and delays are drawn before any submission starts, so the run does not
+        # depend on the order in which the concurrent submissions wake up.
+        submissions = [
+            (
+                judge_id,
+                rng.uniform(0, args.think),
+                [
+                    {"participant_id": participant_id, "criterion_id": criterion_id, "score": rng.randint(0, 10)}
+                    for participant_id in participant_ids
+                    for criterion_id in floor["criteria"]
+                ],
+            )
+            for judge_id in floor["judges"]
+        ]
+        await asyncio.gather(*(submit(*submission) for submission in submissions))
+        await recorder.request(
+            client, "PATCH /heats/{heat_id}/status", "PATCH", f"/heats/{heat_id}/status", json={"status": "finished"}
+        )
+
+
+async def spectate(client: httpx.AsyncClient, recorder: Recorder, seeded: dict, state: dict, args, rng: random.Random) -> None:
+    event_id = seeded["event_id"]
+    while not state["done"]:
+        floor = rng.choice(seeded["floors"])
+        round_id = floor["round_id"]
+        heat_id = state["current"].get(round_id)
+        choice = rng.random()
+        if heat_id is not None and choice < 0.4:
+            await recorder.request(client, "GET /heats/{heat_id}", "GET", f"/heats/{heat_id}")
+        elif heat_id is not None and choice < 0.6:
+            await recorder.request(client, "GET /scores/heats/{heat_id}", "GET", f"/scores/heats/{heat_id}")
+        elif choice < 0.8:
+            await recorder.request(client, "GET /rounds/{round_id}/heats", "GET", f"/rounds/{round_id}/heats")
+        elif choice < 0.9:
+            await recorder.request(client, "GET /rounds/{round_id}/results", "GET", f"/rounds/{round_id}/results")
+        else:
+            await recorder.request(
+                client, "GET /competitions/{competition_id}/snapshot", "GET", f"/competitions/{event_id}/snapshot"
+            )
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * args.poll_interval)
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    seed_recorder = Recorder()
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.judges + args.spectators + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        seed_started = time.perf_counter()
+        seeded = await seed_event(client, seed_recorder, args, rng)
+        seed_seconds = time.perf_counter() - seed_started
+
+        state = {"current": {}, "done": False}
+        started = time.perf_counter()
+        spectators = [
+            asyncio.create_task(spectate(client, recorder, seeded, state, args, random.Random(args.seed + idx + 1)))
+            for idx in range(args.spectators)
+        ]
+        await asyncio.gather(
+            *(
+                run_floor(client, recorder, floor, state, args, random.Random(args.seed * 1000 + idx))
+                for idx, floor in enumerate(seeded["floors"])
+            )
+        )
+        state["done"] = True
+        await asyncio.gather(*spectators)
+        seconds = time.perf_counter() - started
+
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "event_id": seeded["event_id"],
+            "seed_seconds": seed_seconds,
+            "traffic_seconds": seconds,
+            "args": vars(args),
+        },
+        "seed": seed_recorder.report(seed_seconds),
+        "traffic": recorder.report(seconds),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--judges", type=int, default=100)
+    parser.add_argument("--participants", type=int, default=1000)
+    parser.add_argument("--categories", type=int, default=4)
+    parser.add_argument("--max-in-heat", type=int, default=8)
+    parser.add_argument("--heats", type=int, default=0, help="heats per floor to run (0 = all)")
+    parser.add_argument("--spectators", type=int, default=50)
+    parser.add_argument("--think", type=float, default=2.0, help="max seconds a judge takes to submit a sheet")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=20, help="parallel requests while seeding")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--baseline", help="compare with a report written by --output")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    print(f"Seeding ({result['meta']['seed_seconds']:.1f} s)")
+    print_report(result["seed"], baseline and baseline.get("seed"))
+    print(f"\nCompetition traffic ({result['meta']['traffic_seconds']:.1f} s)")
+    print_report(result["traffic"], baseline and baseline.get("traffic"))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Time a bulk participant import against a running API.
+
+A fresh event with one category is created through the API. A generated
+entry list of ``--participants`` rows is then uploaded to
+``POST /competitions/{id}/participants:import`` as CSV or XLSX.
+
+Usage: ``python -m benchmarks.participant_import [--base-url http://localhost:8000] [--participants 1000] [--format csv]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import time
+from datetime import date
+
+import httpx
+from openpyxl import Workbook
+
+HEADER = ["full_name", "number", "gender", "category"]
+
+
+def entry_list(participants: int, category: str) -> list[list]:
+    return [
+        [f"Участник Фамилия{number}", number, "female" if number % 2 else "male", category]
+        for number in range(1, participants + 1)
+    ]
+
+
+def as_csv(rows: list[list]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def as_xlsx(rows: list[list]) -> bytes:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(HEADER)
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--participants", type=int, default=1000)
+    parser.add_argument("--format", choices=("csv", "xlsx"), default="csv")
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.base_url, timeout=60.0) as client:
+        event = client.post(
+            "/competitions", json={"title": "Import benchmark", "date": str(date.today()), "location": "benchmark"}
+        ).json()
+        client.post(
+            f"/competitions/{event['id']}/categories", json={"name": "Импорт", "type": "amateur", "criteria": ["Техника"]}
+        ).raise_for_status()
+
+        rows = entry_list(args.participants, "Импорт")
+        body = as_csv(rows) if args.format == "csv" else as_xlsx(rows)
+        started = time.perf_counter()
+        response = client.post(
+            f"/competitions/{event['id']}/participants:import",
+            files={"file": (f"entries.{args.format}", body)},
+        )
+        elapsed = time.perf_counter() - started
+
+    report = response.json()
+    print(
+        f"{args.format}: {len(body) / 1024:.0f} KiB, {report.get('total_rows')} rows, "
+        f"{report.get('imported')} imported, {report.get('error_count')} errors in {elapsed:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Replay a recorded request log (``REQUEST_LOG_PATH``) against an API running on a scratch database.
+
+Start the API on an empty, migrated database (``DATABASE_URL=<scratch>``,
+``python -m app.migrations upgrade``). Then replay a log that was recorded from
+before the event was created. Creates run first and rebuild the same event state,
+and ids from the log are mapped to the ids the scratch database assigns. A
+request that uses an id waits until the request creating it has finished.
+Ids that were never created in the log (e.g. judges that existed before
+recording) are used unchanged. A participant import is sent with the recorded
+file, and its participants are mapped by position. A recorded job poll that
+returned the job's created ids is polled again until the replayed job has
+finished too, so the requests that use those ids wait for the job.
+
+``--speed 1`` keeps the recorded timing, ``--speed 10`` compresses it and
+``--speed 0`` sends everything as fast as ``--concurrency`` allows. The report
+shows latency per route next to the recorded latency. It also shows DB time
+per request, taken from the difference in the API's ``/metrics`` before and
+after the run.
+
+Usage: ``python -m benchmarks.replay requests.log [--base-url http://localhost:8000] [--speed 1]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import re
+import time
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+import numpy as np
+
+from app.request_log import result_heat_ids
+
+from .load_test import Recorder
+
+ID_KINDS = {
+    "competition_id": "event",
+    "event_id": "event",
+    "category_id": "category",
+    "participant_id": "participant",
+    "participant_ids": "participant",
+    "judge_id": "user",
+    "round_id": "round",
+    "seed_round_id": "round",
+    "heat_id": "heat",
+    "criterion_id": "criterion",
+    "job_id": "job",
+}
+CREATES = {
+    ("POST", "/competitions"): "event",
+    ("POST", "/competitions/{competition_id}/categories"): "category",
+    ("POST", "/competitions/{competition_id}/participants"): "participant",
+    ("POST", "/competitions/{competition_id}/participants:import"): "participant",
+    ("POST", "/users"): "user",
+    ("POST", "/rounds"): "round",
+    ("POST", "/rounds/{round_id}/heats"): "heat",
+    ("POST", "/jobs"): "job",
+}
+JOB_POLL = ("GET", "/jobs/{job_id}")
+JOB_POLL_SECONDS = 0.2
+PATH_PARAM = re.compile(r"\{(\w+)(?::\w+)?\}")
+METRIC_LINE = re.compile(r'^(\w+)\{method="([^"]*)",route="([^"]*)"[^}]*\} ([-+0-9.eE]+)$')
+
+
+class IdMap:
+    """Recorded id → scratch id per kind; lookups wait for creates that are still in flight."""
+
+    def __init__(self) -> None:
+        self._ids: dict[tuple[str, int], asyncio.Future] = {}
+        self.unmapped = 0
+
+    def expect(self, kind: str, old_id: int) -> None:
+        self._ids.setdefault((kind, old_id), asyncio.get_running_loop().create_future())
+
+    def resolve(self, kind: str, old_id: int, new_id: int) -> None:
+        future = self._ids.get((kind, old_id))
+        if future is not None and not future.done():
+            future.set_result(new_id)
+
+    async def get(self, kind: str, old_id: int) -> int:
+        future = self._ids.get((kind, old_id))
+        if future is None:
+            self.unmapped += 1
+            return old_id
+        return await future
+
+
+def expected_ids(entry: dict) -> list[tuple[str, int]]:
+    ids = entry.get("ids") or {}
+    expected = []
+    kind = CREATES.get((entry["m"], entry["r"]))
+    if kind and "id" in ids:
+        expected.append((kind, ids["id"]))
+    expected += [("criterion", criterion_id) for criterion_id in ids.get("criteria", [])]
+    expected += [("participant", participant_id) for participant_id in ids.get("participant_ids", [])]
+    expected += [("heat", heat_id) for heat_id in ids.get("heat_ids", [])]
+    return expected
+
+
+def created_ids(entry: dict, response: httpx.Response | None) -> list[tuple[str, int, int]]:
+    """Pairs of recorded and new ids from a replayed create response."""
+    if response is None or response.status_code >= 300 or not entry.get("ids"):
+        return []
+    payload = response.json()
+    ids = entry["ids"]
+    pairs = []
+    kind = CREATES.get((entry["m"], entry["r"]))
+    if kind and "id" in ids:
+        pairs.append((kind, ids["id"], payload["id"]))
+    new_criteria = [criterion["id"] for criterion in payload.get("criteria", [])]
+    pairs += [("criterion", old, new) for old, new in zip(ids.get("criteria", []), new_criteria)]
+    # The replayed import uploads the same file, so its participants come back in the same order.
+    pairs += [
+        ("participant", old, new) for old, new in zip(ids.get("participant_ids", []), payload.get("participant_ids", []))
+    ]
+    pairs += [("heat", old, new) for old, new in zip(ids.get("heat_ids", []), result_heat_ids(payload) or [])]
+    return pairs
+
+
+async def wait_for_job(client: httpx.AsyncClient, entry: dict, path: str, response: httpx.Response) -> httpx.Response:
+    """Poll a replayed job until it finishes if the recorded poll saw it finish with created heats."""
+    if (entry["m"], entry["r"]) != JOB_POLL or "heat_ids" not in (entry.get("ids") or {}):
+        return response
+    while response.status_code < 300 and response.json()["status"] in ("queued", "running"):
+        await asyncio.sleep(JOB_POLL_SECONDS)
+        response = await client.get(path)  # not recorded: the replayed client only needs the outcome
+    return response
+
+
+async def remap(value, ids: IdMap, key: str | None = None):
+    if isinstance(value, dict):
+        return {name: await remap(item, ids, name) for name, item in value.items()}
+    if isinstance(value, list):
+        return [await remap(item, ids, key) for item in value]
+    if key in ID_KINDS and isinstance(value, int) and not isinstance(value, bool):
+        return await ids.get(ID_KINDS[key], value)
+    if key in ID_KINDS and isinstance(value, str) and value.isdigit():  # path parameters are logged as strings
+        return str(await ids.get(ID_KINDS[key], int(value)))
+    return value
+
+
+async def build_request(entry: dict, ids: IdMap) -> tuple[str, str, dict]:
+    """Method, remapped path and the ``httpx`` keyword arguments carrying the body."""
+    params = await remap(entry.get("p") or {}, ids)
+    path = PATH_PARAM.sub(lambda match: str(params[match.group(1)]), entry["r"])
+    if entry.get("q"):
+        query = []
+        for name, value in parse_qsl(entry["q"], keep_blank_values=True):
+            if name in ID_KINDS and value.isdigit():
+                value = str(await ids.get(ID_KINDS[name], int(value)))
+            query.append((name, value))
+        path = f"{path}?{urlencode(query)}"
+    if entry.get("raw"):
+        # Uploads are sent byte for byte; ids inside the file (``category_id``) are not remapped.
+        raw = entry["raw"]
+        return entry["m"], path, {"content": base64.b64decode(raw["data"]), "headers": {"content-type": raw["ct"]}}
+    body = await remap(entry.get("b"), ids)
+    return entry["m"], path, {"json": body} if body is not None else {}
+
+
+async def scrape_metrics(client: httpx.AsyncClient) -> dict[tuple[str, str, str], float]:
+    try:
+        response = await client.get("/metrics")
+    except httpx.HTTPError:
+        return {}
+    values: dict[tuple[str, str, str], float] = defaultdict(float)
+    for line in response.text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            name, method, route, value = match.groups()
+            values[(name, method, route)] += float(value)
+    return values
+
+
+async def replay(args) -> None:
+    with open(args.log, encoding="utf-8") as fh:
+        entries = [json.loads(line) for line in fh if line.strip()]
+    if not args.include_failed:
+        entries = [entry for entry in entries if entry["s"] < 400]
+    if not entries:
+        raise SystemExit("Nothing to replay")
+
+    ids = IdMap()
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def send(entry: dict) -> None:
+        expected = expected_ids(entry)
+        response = None
+        try:
+            method, path, kwargs = await build_request(entry, ids)
+            async with semaphore:
+                response = await recorder.request(client, f"{entry['m']} {entry['r']}", method, path, **kwargs)
+            response = await wait_for_job(client, entry, path, response)
+            for kind, old_id, new_id in created_ids(entry, response):
+                ids.resolve(kind, old_id, new_id)
+        finally:
+            # A failed create must not leave dependent requests waiting forever.
+            for kind, old_id in expected:
+                ids.resolve(kind, old_id, old_id)
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        before = await scrape_metrics(client)
+        first = entries[0]["t"]
+        started = loop.time()
+        wall_started = time.perf_counter()
+        tasks = []
+        for entry in entries:
+            if args.speed > 0:
+                delay = started + (entry["t"] - first) / args.speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            for kind, old_id in expected_ids(entry):
+                ids.expect(kind, old_id)
+            tasks.append(asyncio.create_task(send(entry)))
+        await asyncio.gather(*tasks)
+        seconds = time.perf_counter() - wall_started
+        after = await scrape_metrics(client)
+
+    recorded: dict[str, list[float]] = defaultdict(list)
+    for entry in entries:
+        recorded[f"{entry['m']} {entry['r']}"].append(entry["ms"])
+    report = recorder.report(seconds)
+
+    print(f"Replayed {len(entries)} requests in {seconds:.1f} s (speed {args.speed or 'max'}), {ids.unmapped} unmapped ids")
+    print(
+        f"{'endpoint':<46} {'count':>6} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'rec p95':>8} {'db ms/req':>9}"
+    )
+    for label, row in report.items():
+        method, route = label.split(" ", 1)
+        requests = after.get(("http_request_duration_seconds_count", method, route), 0) - before.get(
+            ("http_request_duration_seconds_count", method, route), 0
+        )
+        db_seconds = after.get(("db_query_seconds_total", method, route), 0) - before.get(
+            ("db_query_seconds_total", method, route), 0
+        )
+        db_ms = f"{db_seconds / requests * 1000:9.1f}" if requests else f"{'n/a':>9}"
+        recorded_p95 = float(np.percentile(recorded[label], 95))
+        print(
+            f"{label:<46} {row['count']:>6} {row['errors']:>5} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+            f"{row['p99_ms']:>8.1f} {recorded_p95:>8.1f} {db_ms}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="file written by the API with REQUEST_LOG_PATH")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = recorded pace, 10 = ten times faster, 0 = max")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--include-failed", action="store_true", help="also replay requests that failed when recorded")
+    asyncio.run(replay(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Benchmark response serialization per endpoint: the old model path against orjson from row tuples.
+
+For each list endpoint the same synthetic rows are encoded three ways:
+
+* ``response_model``: build read models per row, then validate them again and
+  encode with ``jsonable_encoder`` + ``json.dumps``. This is what FastAPI does
+  with ``response_model`` when a route returns models.
+* ``model_dump_json``: build read models per row and dump them with pydantic's
+  encoder (the previous cached path).
+* ``orjson rows``: dicts from row tuples encoded with orjson (``app.serialization``).
+
+The script checks that the last two produce identical bytes.
+
+Usage: ``python -m benchmarks.serialization [--participants 1000] [--events 20] [--repeat 20]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import warnings
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.crud import PARTICIPANT_COLUMNS, USER_COLUMNS
+from app.schemas import CategoryRead, CompetitionRead, CriterionRead, ParticipantRead, UserRead
+from app.serialization import as_dicts, dumps
+
+
+def participant_rows(count: int) -> list[tuple]:
+    return [
+        (idx, f"Имя{idx}", f"Фамилия{idx}", idx, None, "female" if idx % 2 else "male")
+        for idx in range(1, count + 1)
+    ]
+
+
+def user_rows(count: int) -> list[tuple]:
+    return [("Судья", f"Номер{idx}", "judge", None, idx, 100000 + idx) for idx in range(1, count + 1)]
+
+
+def competition_trees(events: int, categories: int, criteria: int) -> list[dict]:
+    trees = []
+    for event_id in range(1, events + 1):
+        trees.append(
+            {
+                "title": f"Баттл {event_id}",
+                "date": str(date(2026, 1, 1) + timedelta(days=event_id)),
+                "location": "Москва",
+                "id": event_id,
+                "categories": [
+                    {
+                        "id": event_id * 100 + cat,
+                        "name": f"Категория {cat}",
+                        "type": "amateur",
+                        "criteria": [
+                            {"id": event_id * 1000 + cat * 10 + crit, "name": f"Критерий {crit}", "scale_min": 0, "scale_max": 10}
+                            for crit in range(criteria)
+                        ],
+                    }
+                    for cat in range(categories)
+                ],
+            }
+        )
+    return trees
+
+
+def competition_models(trees: list[dict]) -> list[CompetitionRead]:
+    return [
+        CompetitionRead(
+            id=tree["id"],
+            title=tree["title"],
+            date=tree["date"],
+            location=tree["location"],
+            categories=[
+                CategoryRead(
+                    id=category["id"],
+                    name=category["name"],
+                    type=category["type"],
+                    criteria=[CriterionRead(**criterion) for criterion in category["criteria"]],
+                )
+                for category in tree["categories"]
+            ],
+        )
+        for tree in trees
+    ]
+
+
+def timed(func, repeat: int) -> tuple[float, bytes]:
+    best = float("inf")
+    body = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, body
+
+
+def via_response_model(schema, build):
+    adapter = TypeAdapter(List[schema])
+
+    def run() -> bytes:
+        content = adapter.validate_python(build(), from_attributes=True)
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+
+    return run
+
+
+def via_model_dump(build):
+    return lambda: b"[" + b",".join(item.model_dump_json().encode() for item in build()) + b"]"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--participants", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    participants = participant_rows(args.participants)
+    users = user_rows(args.users)
+    trees = competition_trees(args.events, categories=4, criteria=3)
+
+    # Stand-ins for loaded ORM objects, built once so only serialization is timed.
+    participant_objects = [SimpleNamespace(**row) for row in as_dicts(participants, PARTICIPANT_COLUMNS)]
+    user_objects = [SimpleNamespace(**row) for row in as_dicts(users, USER_COLUMNS)]
+    warnings.filterwarnings("ignore", category=DeprecationWarning)  # from_orm, as the routers use it
+
+    cases = {
+        f"GET /competitions/{{id}}/all-participants ({args.participants})": (
+            via_response_model(ParticipantRead, lambda: [ParticipantRead.from_orm(p) for p in participant_objects]),
+            via_model_dump(lambda: [ParticipantRead.from_orm(p) for p in participant_objects]),
+            lambda: dumps(as_dicts(participants, PARTICIPANT_COLUMNS)),
+        ),
+        f"GET /users ({args.users})": (
+            via_response_model(UserRead, lambda: [UserRead.from_orm(u) for u in user_objects]),
+            via_model_dump(lambda: [UserRead.from_orm(u) for u in user_objects]),
+            lambda: dumps(as_dicts(users, USER_COLUMNS)),
+        ),
+        f"GET /competitions ({args.events} events)": (
+            via_response_model(CompetitionRead, lambda: competition_models(trees)),
+            via_model_dump(lambda: competition_models(trees)),
+            lambda: dumps(trees),
+        ),
+    }
+
+    print(f"{'endpoint':<52} {'response_model':>14} {'model_dump':>11} {'orjson rows':>12} {'speedup':>8}")
+    for label, (old, dumped, fast) in cases.items():
+        old_ms, _ = timed(old, args.repeat)
+        dumped_ms, dumped_body = timed(dumped, args.repeat)
+        fast_ms, fast_body = timed(fast, args.repeat)
+        if fast_body != dumped_body:
+            raise SystemExit(f"{label}: orjson body differs from model_dump_json")
+        print(f"{label:<52} {old_ms:>11.2f} ms {dumped_ms:>8.2f} ms {fast_ms:>9.2f} ms {old_ms / fast_ms:>7.1f}×")
+
+
+if __name__ == "__main__":
+    main()
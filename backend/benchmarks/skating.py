@@ -0,0 +1,52 @@
+"""Benchmark the skating-system calculator.
+
+Times the reference 9-judge, 5-dance, 8-couple final and then scales judges,
+dances and couples one at a time so the growth can be compared.
+
+Usage: ``python -m benchmarks.skating [--repeat 20]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.skating import skate_final
+
+
+def random_marks(dances: int, judges: int, couples: int, rng: np.random.Generator) -> np.ndarray:
+    return np.stack(
+        [np.stack([rng.permutation(couples) + 1 for _ in range(judges)]) for _ in range(dances)]
+    )
+
+
+def best_of(marks: np.ndarray, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        skate_final(marks)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    rng = np.random.default_rng(7)
+
+    cases = [(5, 9, 8)]
+    cases += [(5, judges, 8) for judges in (27, 81, 243)]
+    cases += [(dances, 9, 8) for dances in (10, 20, 40)]
+    cases += [(5, 9, couples) for couples in (16, 32, 64)]
+
+    print(f"{'dances':>6} {'judges':>6} {'couples':>7} {'ms':>9}")
+    for dances, judges, couples in cases:
+        elapsed = best_of(random_marks(dances, judges, couples, rng), args.repeat)
+        print(f"{dances:>6} {judges:>6} {couples:>7} {elapsed * 1000:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
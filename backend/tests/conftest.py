@@ -0,0 +1,31 @@
+"""The app under test runs against ``TEST_DATABASE_URL`` with ``QUERY_BUDGET_MODE=raise``.
+
+Point ``TEST_DATABASE_URL`` at a scratch database; the migrations are applied when
+the app starts. Tests that need the database are skipped when it is not set.
+"""
+
+import os
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+
+# Settings are read when the app is imported, so the environment is set up first.
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ["QUERY_BUDGET_MODE"] = "raise"
+os.environ["SCHEMA_STARTUP_MODE"] = "migrate"
+os.environ["REQUEST_LOG_PATH"] = ""
+os.environ["TELEGRAM_BOT_TOKEN"] = ""
+
+
+@pytest.fixture(scope="session")
+def client():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
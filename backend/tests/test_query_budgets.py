@@ -0,0 +1,145 @@
+"""Every route declared with :func:`app.query_budget.query_budget` stays within its budget.
+
+The app runs with ``QUERY_BUDGET_MODE=raise``, so a request that runs more
+statements than its route allows, or repeats one statement shape, raises
+:class:`app.query_budget.QueryBudgetExceeded` in the test client. Heats hold
+several participants and the sheet scores several criteria, so an N+1 pattern
+shows up as a repeated statement.
+"""
+
+import importlib
+import pkgutil
+
+import pytest
+
+from app.query_budget import QueryBudgetExceeded
+
+BUDGETED_ROUTES = {
+    ("GET", "/competitions"),
+    ("GET", "/competitions/{competition_id}"),
+    ("GET", "/heats/{heat_id}"),
+    ("PATCH", "/heats/{heat_id}/status"),
+    ("POST", "/heats/{heat_id}/scores:batch"),
+    ("GET", "/judges/{judge_id}/dashboard"),
+    ("GET", "/participants/{participant_id}"),
+    ("GET", "/rounds/{round_id}/heats"),
+    ("POST", "/rounds/{round_id}/heats"),
+    ("POST", "/scores"),
+    ("GET", "/scores/heats/{heat_id}"),
+}
+HEAT_SIZE = 4
+
+
+def test_every_budgeted_route_is_checked():
+    import app.routers
+
+    budgeted = set()
+    for module_info in pkgutil.iter_modules(app.routers.__path__):
+        router = importlib.import_module(f"app.routers.{module_info.name}").router
+        for route in router.routes:
+            if getattr(getattr(route, "endpoint", None), "query_budget", None) is not None:
+                budgeted.update((method, route.path) for method in route.methods)
+    assert budgeted == BUDGETED_ROUTES
+
+
+def post(client, url: str, payload: dict) -> dict:
+    response = client.post(url, json=payload)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.fixture(scope="module")
+def event(client) -> dict:
+    judge = post(client, "/users", {"first_name": "Бюджет", "last_name": "Судья", "role": "judge"})
+    competition = post(client, "/competitions", {"title": "Query budget", "date": "2026-01-01", "location": "Test"})
+    category = post(
+        client,
+        f"/competitions/{competition['id']}/categories",
+        {"name": "Дебют", "type": "debut", "criteria": ["Техника", "Музыкальность"]},
+    )
+    participants = [
+        post(
+            client,
+            f"/competitions/{competition['id']}/participants",
+            {"full_name": f"Танцор{index} Тестов", "number": index, "gender": "male", "category_id": category["id"]},
+        )
+        for index in range(1, HEAT_SIZE * 2 + 1)
+    ]
+    round_ = post(
+        client, "/rounds", {"event_id": competition["id"], "category_id": category["id"], "round_type": "final"}
+    )
+    heat = post(
+        client,
+        f"/rounds/{round_['id']}/heats",
+        {"participant_ids": [participant["id"] for participant in participants[:HEAT_SIZE]]},
+    )
+    return {
+        "judge_id": judge["id"],
+        "competition_id": competition["id"],
+        "criterion_ids": [criterion["id"] for criterion in category["criteria"]],
+        "participant_ids": [participant["id"] for participant in participants],
+        "round_id": round_["id"],
+        "heat_id": heat["id"],
+    }
+
+
+def test_create_heat(client, event):
+    post(client, f"/rounds/{event['round_id']}/heats", {"participant_ids": event["participant_ids"][HEAT_SIZE:]})
+
+
+def test_heat_reads(client, event):
+    for url in (f"/rounds/{event['round_id']}/heats", f"/heats/{event['heat_id']}", f"/scores/heats/{event['heat_id']}"):
+        assert client.get(url).status_code == 200, url
+
+
+def test_heat_status(client, event):
+    for status in ("in_progress", "finished"):
+        response = client.patch(f"/heats/{event['heat_id']}/status", json={"status": status})
+        assert response.status_code == 200, response.text
+
+
+def test_score_sheet(client, event):
+    sheet = {
+        "judge_id": event["judge_id"],
+        "scores": [
+            {"participant_id": participant_id, "criterion_id": criterion_id, "score": 5 + position}
+            for position, participant_id in enumerate(event["participant_ids"][:HEAT_SIZE])
+            for criterion_id in event["criterion_ids"]
+        ],
+    }
+    # The first sheet goes to a round nobody has read yet; the second updates a loaded board.
+    post(client, f"/heats/{event['heat_id']}/scores:batch", sheet)
+    assert client.get(f"/rounds/{event['round_id']}/results").status_code == 200
+    post(client, f"/heats/{event['heat_id']}/scores:batch", sheet)
+
+
+def test_single_score(client, event):
+    score = {
+        "participant_id": event["participant_ids"][0],
+        "judge_id": event["judge_id"],
+        "round_id": event["round_id"],
+        "heat_id": event["heat_id"],
+        "criterion_id": event["criterion_ids"][0],
+        "score": 9,
+    }
+    post(client, "/scores", score)
+    post(client, "/scores", {**score, "criterion_id": None, "score": 8})
+    post(client, "/scores", {**score, "criterion_id": None, "score": 7})
+
+
+def test_competition_reads(client, event):
+    for url in (
+        "/competitions",
+        f"/competitions/{event['competition_id']}",
+        f"/judges/{event['judge_id']}/dashboard",
+        f"/participants/{event['participant_ids'][0]}",
+    ):
+        assert client.get(url).status_code == 200, url
+
+
+def test_budget_violation_fails_the_request(client, event, monkeypatch):
+    from app.routers import heats
+
+    monkeypatch.setattr(heats.get_heat_detail, "query_budget", 0)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(f"/heats/{event['heat_id']}")
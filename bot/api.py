@@ -0,0 +1,85 @@
+"""Shared backend API client for the bot: one pooled connection set plus a TTL/LRU cache."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import httpx
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire ``ttl`` seconds after being stored."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class ApiClient:
+    """Long-lived client for the FastAPI backend.
+
+    Keeps connections alive between commands, serves repeated GETs from a TTL
+    cache and lets concurrent callers of the same uncached URL share one request.
+    """
+
+    def __init__(self, base_url: str, cache_ttl: float = 30.0, cache_size: int = 256, timeout: float = 10.0) -> None:
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        )
+        self._cache = TTLCache(cache_size, cache_ttl)
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def get_json(self, path: str, params: dict | None = None, cache: bool = True) -> Any | None:
+        """GET ``path`` and return the decoded body, or ``None`` for a non-200 answer."""
+        key = (path, tuple(sorted((params or {}).items())))
+        if cache:
+            hit, value = self._cache.get(key)
+            if hit:
+                return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, path, params, cache))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # The fetch is never cancelled on behalf of one caller: a caller that is
+        # cancelled stops waiting, the others still get the response.
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, path: str, params: dict | None, cache: bool) -> Any | None:
+        response = await self._client.get(path, params=params)
+        value = response.json() if response.status_code == 200 else None
+        if cache and value is not None:
+            self._cache.set(key, value)
+        return value
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has stopped waiting.
+            task.exception()
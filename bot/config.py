@@ -8,6 +8,7 @@ class BotSettings(BaseSettings):
     telegram_token: str = Field(..., validation_alias="TELEGRAM_BOT_TOKEN")
     api_base_url: str = Field("http://localhost:8000", validation_alias="API_BASE_URL")
     admin_panel_url: str = Field("http://localhost:3003/admin", validation_alias="ADMIN_LINK_BASE")
+    api_cache_ttl: float = Field(30.0, validation_alias="API_CACHE_TTL")
 
     model_config = SettingsConfigDict(
         env_file="bot/.env",
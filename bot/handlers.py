@@ -2,8 +2,9 @@ from aiogram import Router, F
 from aiogram.filters.command import Command
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 
-import httpx
+import asyncio
 
+from .api import ApiClient
 from .config import settings
 
 router = Router()
@@ -22,94 +23,89 @@ async def start_handler(message: Message) -> None:
 
 
 @router.message(Command("battle"))
-async def battle_handler(message: Message) -> None:
+async def battle_handler(message: Message, api: ApiClient) -> None:
     """Показать список всех соревнований."""
-    async with httpx.AsyncClient(base_url=str(settings.api_base_url), timeout=10.0) as client:
-        try:
-            response = await client.get("/competitions")
-            if response.status_code != 200:
-                await message.answer("Ошибка при получении списка соревнований.")
-                return
-
-            competitions = response.json()
-
-            if not competitions:
-                await message.answer("Соревнований пока нет.")
-                return
-
-            # Создаем inline-кнопки для каждого соревнования
-            keyboard_buttons = []
-            for idx, comp in enumerate(competitions, start=1):
-                button = InlineKeyboardButton(
-                    text=f"{idx}. {comp.get('title', 'Без названия')}",
-                    callback_data=f"competition_{comp.get('id')}"
-                )
-                keyboard_buttons.append([button])
-
-            keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
-
-            await message.answer(
-                "📋 <b>Все соревнования:</b>\n\nВыберите соревнование для просмотра деталей:",
-                reply_markup=keyboard
+    try:
+        competitions = await api.get_json("/competitions", params={"fields": "id,title"})
+        if competitions is None:
+            await message.answer("Ошибка при получении списка соревнований.")
+            return
+
+        if not competitions:
+            await message.answer("Соревнований пока нет.")
+            return
+
+        # Создаем inline-кнопки для каждого соревнования
+        keyboard_buttons = []
+        for idx, comp in enumerate(competitions, start=1):
+            button = InlineKeyboardButton(
+                text=f"{idx}. {comp.get('title', 'Без названия')}",
+                callback_data=f"competition_{comp.get('id')}"
             )
+            keyboard_buttons.append([button])
+
+        keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
 
-        except Exception as e:
-            await message.answer(f"Ошибка подключения к серверу: {str(e)}")
+        await message.answer(
+            "📋 <b>Все соревнования:</b>\n\nВыберите соревнование для просмотра деталей:",
+            reply_markup=keyboard
+        )
+
+    except Exception as e:
+        await message.answer(f"Ошибка подключения к серверу: {str(e)}")
 
 
 @router.callback_query(F.data.startswith("competition_"))
-async def competition_detail_handler(callback: CallbackQuery) -> None:
+async def competition_detail_handler(callback: CallbackQuery, api: ApiClient) -> None:
     """Показать детали выбранного соревнования."""
     if not callback.data:
         return
 
     competition_id = callback.data.split("_")[1]
 
-    async with httpx.AsyncClient(base_url=str(settings.api_base_url), timeout=10.0) as client:
-        try:
-            # Получаем детали соревнования
-            comp_response = await client.get(f"/competitions/{competition_id}")
-            if comp_response.status_code != 200:
-                await callback.message.answer("Ошибка при получении данных соревнования.")
-                await callback.answer()
-                return
-
-            competition = comp_response.json()
-
-            # Получаем участников
-            participants_response = await client.get(f"/competitions/{competition_id}/all-participants")
-            participants = participants_response.json() if participants_response.status_code == 200 else []
-
-            # Формируем сообщение
-            title = competition.get('title', 'Без названия')
-            date = competition.get('date', 'Дата не указана')
-            location = competition.get('location', 'Место не указано')
-
-            message_text = f"🏆 <b>{title}</b>\n\n"
-            message_text += f"📅 <b>Дата:</b> {date}\n"
-            message_text += f"📍 <b>Место:</b> {location}\n\n"
-
-            if participants:
-                message_text += f"👥 <b>Участники ({len(participants)}):</b>\n"
-                for idx, participant in enumerate(participants, start=1):
-                    first_name = participant.get('first_name', '')
-                    last_name = participant.get('last_name', '')
-                    number = participant.get('number')
-                    gender = participant.get('gender', '')
-                    gender_icon = '👨' if gender == 'male' else '👩' if gender == 'female' else '👤'
-
-                    full_name = f"{first_name} {last_name}".strip()
-                    number_str = f"#{number} " if number else ""
-                    message_text += f"{idx}. {gender_icon} {number_str}{full_name}\n"
-            else:
-                message_text += "👥 <b>Участников пока нет</b>"
-
-            await callback.message.answer(message_text)
+    try:
+        # Получаем детали соревнования и участников параллельно
+        competition, participants = await asyncio.gather(
+            api.get_json(f"/competitions/{competition_id}"),
+            api.get_json(f"/competitions/{competition_id}/all-participants"),
+        )
+        if competition is None:
+            await callback.message.answer("Ошибка при получении данных соревнования.")
             await callback.answer()
+            return
 
-        except Exception as e:
-            await callback.message.answer(f"Ошибка: {str(e)}")
-            await callback.answer()
+        participants = participants or []
+
+        # Формируем сообщение
+        title = competition.get('title', 'Без названия')
+        date = competition.get('date', 'Дата не указана')
+        location = competition.get('location', 'Место не указано')
+
+        message_text = f"🏆 <b>{title}</b>\n\n"
+        message_text += f"📅 <b>Дата:</b> {date}\n"
+        message_text += f"📍 <b>Место:</b> {location}\n\n"
+
+        if participants:
+            message_text += f"👥 <b>Участники ({len(participants)}):</b>\n"
+            for idx, participant in enumerate(participants, start=1):
+                first_name = participant.get('first_name', '')
+                last_name = participant.get('last_name', '')
+                number = participant.get('number')
+                gender = participant.get('gender', '')
+                gender_icon = '👨' if gender == 'male' else '👩' if gender == 'female' else '👤'
+
+                full_name = f"{first_name} {last_name}".strip()
+                number_str = f"#{number} " if number else ""
+                message_text += f"{idx}. {gender_icon} {number_str}{full_name}\n"
+        else:
+            message_text += "👥 <b>Участников пока нет</b>"
+
+        await callback.message.answer(message_text)
+        await callback.answer()
+
+    except Exception as e:
+        await callback.message.answer(f"Ошибка: {str(e)}")
+        await callback.answer()
 
 
 @router.message(Command("login"))
@@ -121,24 +117,23 @@ async def login_handler(message: Message) -> None:
 
 
 @router.message(Command("mytasks"))
-async def mytasks_handler(message: Message) -> None:
+async def mytasks_handler(message: Message, api: ApiClient) -> None:
     telegram_id = message.from_user.id if message.from_user else None
     if not telegram_id:
         await message.answer("Не удалось определить Telegram ID.")
         return
 
-    async with httpx.AsyncClient(base_url=str(settings.api_base_url), timeout=10.0) as client:
-        profile_resp = await client.get("/users/me", params={"telegram_id": telegram_id})
-        if profile_resp.status_code != 200:
-            await message.answer(
-                "Судья не найден. Отправьте /login или обратитесь к администратору."
-            )
-            return
-
-        profile = profile_resp.json()
-        competitions_resp = await client.get("/competitions")
+    profile, competitions = await asyncio.gather(
+        api.get_json("/users/me", params={"telegram_id": telegram_id}, cache=False),
+        api.get_json("/competitions", params={"fields": "title,date", "limit": 3}),
+    )
+    if profile is None:
+        await message.answer(
+            "Судья не найден. Отправьте /login или обратитесь к администратору."
+        )
+        return
 
-    competitions = competitions_resp.json() if competitions_resp.status_code == 200 else []
+    competitions = competitions or []
 
     lines = [
         f"Привет, {profile.get('first_name')}!",
@@ -5,6 +5,7 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
 
+from .api import ApiClient
 from .config import settings
 from .handlers import router
 
@@ -14,12 +15,14 @@ async def main():
         token=settings.telegram_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML)
     )
-    dp = Dispatcher(storage=MemoryStorage())
+    api = ApiClient(str(settings.api_base_url), cache_ttl=settings.api_cache_ttl)
+    dp = Dispatcher(storage=MemoryStorage(), api=api)
     dp.include_router(router)
 
     try:
         await dp.start_polling(bot)
     finally:
+        await api.close()
         await bot.session.close()
 
 
@@ -1,19 +1,18 @@
 import Link from "next/link";
 
-import type { SubmittedScore } from "../../../../components/score-form";
-import { JudgeHeatScoringPanel } from "../../../../components/judge-heat-scoring-panel";
-import type { Criterion, HeatParticipant, Score } from "../../../../lib/api";
-import { fetchHeatDetail, fetchScoresForHeat } from "../../../../lib/api";
-import { formatRoundLabel } from "../../../../lib/rounds";
-
-const DEFAULT_JUDGE_ID = Number(process.env.NEXT_PUBLIC_DEFAULT_JUDGE_ID ?? "1");
+import type { SubmittedScore } from "../../../../../components/score-form";
+import { JudgeHeatScoringPanel } from "../../../../../components/judge-heat-scoring-panel";
+import type { Criterion, HeatParticipant, Score } from "../../../../../lib/api";
+import { fetchHeatDetail, fetchScoresForHeat } from "../../../../../lib/api";
+import { formatRoundLabel } from "../../../../../lib/rounds";
 
 type HeatPageProps = {
-  params: Promise<{ heatId: string }>;
+  params: Promise<{ judgeId: string; heatId: string }>;
 };
 
 export default async function HeatPage({ params }: HeatPageProps) {
-  const { heatId: heatIdStr } = await params;
+  const { judgeId: judgeIdStr, heatId: heatIdStr } = await params;
+  const judgeId = Number(judgeIdStr);
   const heatId = Number(heatIdStr);
   const heat = await fetchHeatDetail(heatId);
   const scores = await fetchScoresForHeat(heat.id);
@@ -21,7 +20,7 @@ export default async function HeatPage({ params }: HeatPageProps) {
     scores,
     heat.participants,
     heat.criteria,
-    DEFAULT_JUDGE_ID,
+    judgeId,
   );
 
   return (
@@ -47,7 +46,7 @@ export default async function HeatPage({ params }: HeatPageProps) {
           Здесь можно внести индивидуальные оценки по критериям. Все данные моментально сохраняются и
           доступны главному судье.
         </p>
-        <Link href="/judge" className="material-button secondary" style={{ width: "fit-content" }}>
+        <Link href={`/judge/${judgeId}`} className="material-button secondary" style={{ width: "fit-content" }}>
           ← Назад к журналу
         </Link>
       </section>
@@ -57,7 +56,7 @@ export default async function HeatPage({ params }: HeatPageProps) {
         roundId={heat.round_id}
         participants={heat.participants}
         criteria={heat.criteria}
-        defaultJudgeId={DEFAULT_JUDGE_ID}
+        defaultJudgeId={judgeId}
         initialStatus={heat.status}
         initialSubmitted={initialSubmitted}
       />
@@ -1,6 +1,6 @@
 import Link from "next/link";
 
-import { fetchCompetitionById, fetchHeats, fetchParticipants, fetchRounds } from "../../../lib/api";
+import { fetchCompetitionSnapshot } from "../../../lib/api";
 import { formatRoundLabel } from "../../../lib/rounds";
 
 type SpectatorPageProps = {
@@ -10,24 +10,13 @@ type SpectatorPageProps = {
 export default async function SpectatorPage({ params }: SpectatorPageProps) {
   const { id } = await params;
   const competitionId = Number(id);
-  const competition = await fetchCompetitionById(competitionId);
-  const rounds = await fetchRounds(competitionId);
+  const competition = await fetchCompetitionSnapshot(competitionId);
 
-  const roundsWithHeats = await Promise.all(
-    rounds.map(async (round) => ({
-      round,
-      heats: await fetchHeats(round.id),
-    })),
-  );
-
-  const allParticipants = competition.categories.length > 0
-    ? await Promise.all(
-        competition.categories.map(async (category) => ({
-          category,
-          participants: await fetchParticipants(competitionId, category.id),
-        })),
-      )
-    : [];
+  const roundsWithHeats = competition.rounds.map((round) => ({ round, heats: round.heats }));
+  const allParticipants = competition.categories.map((category) => ({
+    category,
+    participants: category.participants,
+  }));
 
   return (
     <div className="page-shell">
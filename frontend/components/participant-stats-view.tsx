@@ -43,6 +43,10 @@ export function ParticipantStatsView({ stats }: ParticipantStatsViewProps) {
     return stats.scores.filter((score) => score.heat_id === heatId);
   };
 
+  const getRoundStats = (roundId: number) => {
+    return stats.rounds.find((round) => round.round_id === roundId);
+  };
+
   return (
     <div className="page-shell">
       <div className="section-meta">
@@ -177,6 +181,7 @@ export function ParticipantStatsView({ stats }: ParticipantStatsViewProps) {
                 <div style={{ display: "flex", flexDirection: "column", gap: "0.75rem", marginTop: "1rem" }}>
                   {eventData.heats.map((heat) => {
                     const heatScores = getScoresForHeat(heat.id);
+                    const roundStats = getRoundStats(heat.round_id);
                     const isExpanded = expandedHeatId === heat.id;
 
                     return (
@@ -195,6 +200,12 @@ export function ParticipantStatsView({ stats }: ParticipantStatsViewProps) {
                             </div>
                             <div style={{ display: "flex", gap: "0.5rem", alignItems: "center" }}>
                               <span className="chip">Оценок: {heatScores.length}</span>
+                              {roundStats && (
+                                <span className="chip">
+                                  Место {roundStats.rank} из {roundStats.ranked_participants} · Σ{" "}
+                                  {roundStats.total_score}
+                                </span>
+                              )}
                               <span className={`chip ${heat.status === "in_progress" ? "chip-live" : ""}`}>
                                 {heat.status === "finished"
                                   ? "Завершён"
@@ -2,7 +2,7 @@
 
 import { useEffect, useMemo, useState } from "react";
 
-import { Criterion, HeatParticipant, HeatStatus, submitScore, updateHeatStatus } from "../lib/api";
+import { Criterion, HeatParticipant, HeatStatus, submitScoreSheet, updateHeatStatus } from "../lib/api";
 
 export type SubmittedScore = {
   participantId: number;
@@ -120,18 +120,14 @@ export function ScoreForm({
     setFormStatus("saving");
     setError(null);
     try {
-      await Promise.all(
-        criteria.map((criterion) =>
-          submitScore({
-            participant_id: selectedParticipant,
-            judge_id: judgeId,
-            round_id: roundId,
-            heat_id: heatId,
-            criterion_id: criterion.id,
-            score: Number(values[criterion.id] ?? criterion.scale_max ?? 10),
-          })
-        )
-      );
+      await submitScoreSheet(heatId, {
+        judge_id: judgeId,
+        scores: criteria.map((criterion) => ({
+          participant_id: selectedParticipant,
+          criterion_id: criterion.id,
+          score: Number(values[criterion.id] ?? criterion.scale_max ?? 10),
+        })),
+      });
       const participantName =
         participantOptions.find((option) => option.value === selectedParticipant)?.label ?? "Участник";
       const submittedScores = criteria.map((criterion) => ({
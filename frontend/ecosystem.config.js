@@ -8,7 +8,6 @@ module.exports = {
       env: {
         NODE_ENV: 'production',
         BACKEND_URL: 'http://localhost:8000',
-        NEXT_PUBLIC_DEFAULT_JUDGE_ID: '1',
       },
     },
   ],
@@ -20,6 +20,12 @@ export type Competition = {
   categories: Category[];
 };
 
+export type CompetitionSnapshot = Omit<Competition, "categories"> & {
+  version: number;
+  categories: (Category & { participants: Participant[] })[];
+  rounds: (Round & { heats: Heat[] })[];
+};
+
 export type CompetitionPayload = {
   title: string;
   date?: string | null;
@@ -65,6 +71,34 @@ export type HeatDetail = Heat & {
   criteria: Criterion[];
 };
 
+export type DashboardRound = {
+  id: number;
+  category_id: number;
+  round_type: string;
+  stage_format?: string | null;
+  heats: Heat[];
+};
+
+export type DashboardCompetition = {
+  id: number;
+  title: string;
+  date?: string | null;
+  location?: string | null;
+  rounds: DashboardRound[];
+};
+
+export type JudgeDashboard = {
+  judge_id: number;
+  competitions: DashboardCompetition[];
+};
+
+export type User = {
+  id: number;
+  first_name: string;
+  last_name: string;
+  role: string;
+};
+
 export type Participant = {
   id: number;
   first_name: string;
@@ -120,6 +154,23 @@ export type HeatDistributionResponse = {
   status: string;
   round_id: number;
   heats_created: number;
+  heat_ids: number[];
+};
+
+export type JobStatus = "queued" | "running" | "succeeded" | "failed" | "cancelled";
+
+export type Job<T = unknown> = {
+  id: number;
+  type: string;
+  status: JobStatus;
+  event_id: number | null;
+  params: Record<string, unknown>;
+  result: T | null;
+  error: string | null;
+  attempts: number;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
 };
 
 // Server-side: используем прямой URL к backend
@@ -190,6 +241,10 @@ export async function fetchCompetitionById(competitionId: number): Promise<Compe
   return request<Competition>(`/competitions/${competitionId}`);
 }
 
+export async function fetchCompetitionSnapshot(competitionId: number): Promise<CompetitionSnapshot> {
+  return request<CompetitionSnapshot>(`/competitions/${competitionId}/snapshot`);
+}
+
 export async function fetchRound(roundId: number): Promise<Round> {
   return request<Round>(`/rounds/${roundId}`);
 }
@@ -198,11 +253,44 @@ export async function fetchHeats(roundId: number): Promise<Heat[]> {
   return request<Heat[]>(`/rounds/${roundId}/heats`);
 }
 
-export async function distributeHeats(roundId: number, maxInHeat: number) {
-  return request<HeatDistributionResponse>(`/rounds/${roundId}/distribute`, {
+export async function fetchJudges(): Promise<User[]> {
+  const users = await request<User[]>("/users?fields=id,first_name,last_name,role");
+  return users.filter((user) => user.role === "judge");
+}
+
+export async function fetchJudgeDashboard(judgeId: number): Promise<JudgeDashboard> {
+  return request<JudgeDashboard>(`/judges/${judgeId}/dashboard`);
+}
+
+export async function submitJob<T>(type: string, params: Record<string, unknown>): Promise<Job<T>> {
+  return request<Job<T>>("/jobs", {
     method: "POST",
-    body: JSON.stringify({ max_in_heat: maxInHeat }),
+    body: JSON.stringify({ type, params }),
+  });
+}
+
+export async function fetchJob<T>(jobId: number): Promise<Job<T>> {
+  return request<Job<T>>(`/jobs/${jobId}`);
+}
+
+export async function waitForJob<T>(job: Job<T>, intervalMs = 500): Promise<T> {
+  let current = job;
+  while (current.status === "queued" || current.status === "running") {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    current = await fetchJob<T>(current.id);
+  }
+  if (current.status !== "succeeded") {
+    throw new Error(current.error ?? "Задача отменена");
+  }
+  return current.result as T;
+}
+
+export async function distributeHeats(roundId: number, maxInHeat: number) {
+  const job = await submitJob<HeatDistributionResponse>("distribute_heats", {
+    round_id: roundId,
+    max_in_heat: maxInHeat,
   });
+  return waitForJob(job);
 }
 
 export async function updateHeatStatus(heatId: number, status: HeatStatus) {
@@ -292,6 +380,18 @@ export async function submitScore(payload: ScorePayload) {
   });
 }
 
+export type ScoreSheetPayload = {
+  judge_id: number;
+  scores: { participant_id: number; criterion_id: number; score: number }[];
+};
+
+export async function submitScoreSheet(heatId: number, payload: ScoreSheetPayload): Promise<Score[]> {
+  return request<Score[]>(`/heats/${heatId}/scores:batch`, {
+    method: "POST",
+    body: JSON.stringify(payload),
+  });
+}
+
 export type ScoreDetail = {
   id: number;
   score: number;
@@ -312,6 +412,27 @@ export type HeatDetailStats = {
   event_title: string;
 };
 
+export type CriterionStats = {
+  criterion_id: number | null;
+  criterion_name: string | null;
+  total_score: number;
+  average_score: number;
+  score_count: number;
+};
+
+export type RoundStats = {
+  round_id: number;
+  round_type: string;
+  stage_format: string | null;
+  category_name: string;
+  total_score: number;
+  average_score: number;
+  score_count: number;
+  rank: number;
+  ranked_participants: number;
+  criteria: CriterionStats[];
+};
+
 export type ParticipantStats = {
   id: number;
   first_name: string;
@@ -327,6 +448,7 @@ export type ParticipantStats = {
   event_location: string | null;
   scores: ScoreDetail[];
   heats: HeatDetailStats[];
+  rounds: RoundStats[];
 };
 
 export async function fetchParticipantStats(participantId: number): Promise<ParticipantStats> {